@@ -0,0 +1,51 @@
+"""Alembic 마이그레이션 환경
+
+데이터베이스 URL과 메타데이터는 애플리케이션 설정/모델을 사용한다.
+API 프로세스 여러 개가 동시에 시작해도(`init_db`) 어드바이저리 잠금으로 한 프로세스만 마이그레이션을 적용한다.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool, text
+
+from src.core.database import DATABASE_URL, Base
+
+config = context.config
+
+# `init_db`에서 호출하면 애플리케이션 로깅 설정을 유지
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# 마이그레이션 직렬화용 어드바이저리 잠금 키
+MIGRATION_LOCK_ID = 7234001
+
+
+def run_migrations_offline():
+    """SQL 스크립트 출력 (`alembic upgrade head --sql`)"""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """데이터베이스에 직접 적용"""
+    connectable = create_engine(DATABASE_URL, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            # 잠금을 얻은 뒤 현재 리비전을 읽으므로 늦게 시작한 프로세스는 적용된 마이그레이션을 건너뜀
+            connection.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,94 @@
+"""기준 스키마 (파티셔닝 이전)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Alembic 도입 전 `Base.metadata.create_all`로 만든 스키마다. 이미 테이블이 있는 데이터베이스는
+그대로 두고 리비전만 기록한다(이전 업그레이드 스크립트 `backfill_chat_counters.py`,
+`add_cancelled_status.py`를 먼저 실행해 둔다).
+"""
+from alembic import op, context
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+chat_status = sa.Enum("ACTIVE", "ARCHIVED", name="chatstatus")
+message_type = sa.Enum("USER", "ASSISTANT", "SYSTEM", "ERROR", name="messagetype")
+message_status = sa.Enum("PENDING", "PROCESSING", "STREAMING", "COMPLETED", "FAILED", "CANCELLED",
+                         name="messagestatus")
+
+
+def _schema_exists() -> bool:
+    if context.is_offline_mode():
+        return False
+    return sa.inspect(op.get_bind()).has_table("chats")
+
+
+def upgrade():
+    if _schema_exists():
+        return
+
+    op.create_table(
+        "chats",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("status", chat_status, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("message_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_message_preview", sa.String(100), nullable=True),
+    )
+    op.create_index("idx_chat_status", "chats", ["status"])
+    op.create_index("idx_chat_updated_at", "chats", ["updated_at"])
+    op.create_index("idx_chat_status_updated", "chats", ["status", "updated_at", "id"])
+
+    op.create_table(
+        "messages",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("chat_id", postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey("chats.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("task_id", sa.String(255), nullable=False),
+        sa.Column("type", message_type, nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("status", message_status, nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_messages_task_id", "messages", ["task_id"], unique=True)
+    op.create_index("idx_message_chat_created", "messages", ["chat_id", "created_at", "id"])
+    op.create_index("idx_message_task_id", "messages", ["task_id"])
+    op.create_index("idx_message_status", "messages", ["status"])
+
+    op.create_table(
+        "message_chunks",
+        sa.Column("task_id", sa.String(255),
+                  sa.ForeignKey("messages.task_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("seq", sa.Integer(), primary_key=True),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+    op.create_table(
+        "task_outbox",
+        sa.Column("task_id", sa.String(255), primary_key=True),
+        sa.Column("task_name", sa.String(255), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("idx_outbox_created", "task_outbox", ["created_at"])
+
+
+def downgrade():
+    op.drop_table("task_outbox")
+    op.drop_table("message_chunks")
+    op.drop_table("messages")
+    op.drop_table("chats")
+    for enum in (message_status, message_type, chat_status):
+        enum.drop(op.get_bind(), checkfirst=True)
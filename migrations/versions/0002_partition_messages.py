@@ -0,0 +1,107 @@
+"""messages 월별 RANGE 파티셔닝
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+기존 messages를 created_at 기준 파티션 테이블로 옮긴다. 가장 오래된 메시지의 달부터
+2개월 뒤까지 월별 파티션과 기본 파티션을 만들고 행을 복사한다. 이후 파티션은 애플리케이션
+(`src/core/partitions.py`)이 만들지만, 마이그레이션은 그 코드나 설정이 바뀌어도 같은 결과를 내도록 구문을 직접 둔다.
+복사하는 동안 테이블이 잠기므로 메시지가 많은 데이터베이스는 점검 시간에 `alembic upgrade head`로 먼저 적용한다.
+
+- 기본 키 (id) → (id, created_at): 파티션 테이블의 유니크 제약은 파티션 키를 포함해야 함
+- task_id 유니크 인덱스 제거 (일반 인덱스만 유지), message_chunks.task_id 외래 키 제거
+"""
+from datetime import datetime
+
+from alembic import op, context
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# 마이그레이션 당시 미리 만드는 다음 달 파티션 수
+PARTITIONS_AHEAD = 2
+
+COLUMNS = "id, chat_id, task_id, type, content, status, error, created_at, updated_at"
+
+COLUMN_DEFINITIONS = """
+    id UUID NOT NULL,
+    chat_id UUID NOT NULL,
+    task_id VARCHAR(255) NOT NULL,
+    type messagetype NOT NULL,
+    content TEXT NOT NULL,
+    status messagestatus NOT NULL,
+    error TEXT,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+"""
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _create_partition(month: datetime):
+    end = _add_months(month, 1)
+    op.execute(f"CREATE TABLE IF NOT EXISTS messages_{month:%Y%m} PARTITION OF messages "
+               f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')")
+
+
+def _months(source: str):
+    """파티션을 만들 달 (가장 오래된 메시지의 달부터, SQL 출력 모드에서는 이번 달부터)"""
+    current = _month_start(datetime.utcnow())
+    month = current
+    if not context.is_offline_mode():
+        oldest = op.get_bind().execute(sa.text(f"SELECT min(created_at) FROM {source}")).scalar()
+        if oldest is not None:
+            month = min(month, _month_start(oldest))
+    last = _add_months(current, PARTITIONS_AHEAD)
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+
+def _create_message_indexes():
+    op.create_index("idx_message_chat_created", "messages", ["chat_id", "created_at", "id"])
+    op.create_index("idx_message_task_id", "messages", ["task_id"])
+    op.create_index("idx_message_status", "messages", ["status"])
+
+
+def upgrade():
+    op.execute("ALTER TABLE message_chunks DROP CONSTRAINT IF EXISTS message_chunks_task_id_fkey")
+    op.rename_table("messages", "messages_unpartitioned")
+
+    op.execute(f"CREATE TABLE messages ({COLUMN_DEFINITIONS}) PARTITION BY RANGE (created_at)")
+    op.execute("CREATE TABLE IF NOT EXISTS messages_default PARTITION OF messages DEFAULT")
+    for month in _months("messages_unpartitioned"):
+        _create_partition(month)
+    op.execute(f"INSERT INTO messages ({COLUMNS}) SELECT {COLUMNS} FROM messages_unpartitioned")
+    op.drop_table("messages_unpartitioned")
+
+    # 행을 옮긴 뒤에 제약과 인덱스 생성 (파티션마다 같은 이름 규칙으로 만들어짐)
+    op.create_primary_key("messages_pkey", "messages", ["id", "created_at"])
+    op.create_foreign_key("messages_chat_id_fkey", "messages", "chats", ["chat_id"], ["id"], ondelete="CASCADE")
+    _create_message_indexes()
+
+
+def downgrade():
+    op.rename_table("messages", "messages_partitioned")
+
+    op.execute(f"CREATE TABLE messages ({COLUMN_DEFINITIONS})")
+    op.execute(f"INSERT INTO messages ({COLUMNS}) SELECT {COLUMNS} FROM messages_partitioned")
+    op.drop_table("messages_partitioned")
+
+    op.create_primary_key("messages_pkey", "messages", ["id"])
+    op.create_foreign_key("messages_chat_id_fkey", "messages", "chats", ["chat_id"], ["id"], ondelete="CASCADE")
+    op.create_index("ix_messages_task_id", "messages", ["task_id"], unique=True)
+    _create_message_indexes()
+    op.create_foreign_key("message_chunks_task_id_fkey", "message_chunks", "messages",
+                          ["task_id"], ["task_id"], ondelete="CASCADE")
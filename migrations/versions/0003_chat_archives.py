@@ -0,0 +1,42 @@
+"""채팅 콜드 스토리지
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+오래 쓰지 않은 채팅의 메시지를 압축해 보관하는 chat_archives 테이블과 채팅의 저장 위치 컬럼을 추가한다.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("chats", sa.Column("cold_since", sa.DateTime(), nullable=True))
+    op.add_column("chats", sa.Column("rehydrated_at", sa.DateTime(), nullable=True))
+    op.create_index("idx_chat_hot_updated", "chats", ["updated_at"],
+                    postgresql_where=sa.text("cold_since IS NULL"))
+
+    op.create_table(
+        "chat_archives",
+        sa.Column("chat_id", postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey("chats.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("message_count", sa.Integer(), nullable=False),
+        sa.Column("raw_bytes", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    # zlib으로 압축한 값이므로 TOAST 압축은 건너뛰고 외부 저장만 사용
+    op.execute("ALTER TABLE chat_archives ALTER COLUMN payload SET STORAGE EXTERNAL")
+
+
+def downgrade():
+    op.drop_table("chat_archives")
+    op.drop_index("idx_chat_hot_updated", table_name="chats")
+    op.drop_column("chats", "rehydrated_at")
+    op.drop_column("chats", "cold_since")
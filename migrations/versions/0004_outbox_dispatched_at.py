@@ -0,0 +1,24 @@
+"""아웃박스 릴레이 발행 시각
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+릴레이가 행 잠금을 잡은 채로 브로커에 발행하지 않도록, 발행할 행에 `dispatched_at`을 먼저 기록하고
+커밋한 뒤 트랜잭션 밖에서 발행한다. 기록된 시각부터 유예 시간 동안 다른 릴레이는 그 행을 건너뛴다.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("task_outbox", sa.Column("dispatched_at", sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("task_outbox", "dispatched_at")
@@ -0,0 +1,43 @@
+"""콜드 스토리지 태스크 ID 목록
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+스트림이 만료된 태스크를 조회할 때 채팅을 복원하지 않고 압축 값에서 메시지를 읽을 수 있도록
+chat_archives에 태스크 ID 목록과 GIN 인덱스를 추가한다. 기존 행은 압축 값(zlib + JSON 배열)을 풀어 채운다.
+"""
+import json
+import zlib
+
+from alembic import op, context
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def _backfill():
+    if context.is_offline_mode():
+        return
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT chat_id, payload FROM chat_archives")).all()
+    for chat_id, payload in rows:
+        task_ids = [row["task_id"] for row in json.loads(zlib.decompress(payload))]
+        conn.execute(sa.text("UPDATE chat_archives SET task_ids = :task_ids WHERE chat_id = :chat_id"),
+                     {"task_ids": task_ids, "chat_id": chat_id})
+
+
+def upgrade():
+    op.add_column("chat_archives", sa.Column("task_ids", postgresql.ARRAY(sa.String(255)),
+                                             nullable=False, server_default="{}"))
+    _backfill()
+    op.create_index("idx_chat_archive_task_ids", "chat_archives", ["task_ids"], postgresql_using="gin")
+
+
+def downgrade():
+    op.drop_index("idx_chat_archive_task_ids", table_name="chat_archives")
+    op.drop_column("chat_archives", "task_ids")
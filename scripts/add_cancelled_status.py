@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""메시지 상태 CANCELLED 추가 스크립트
+
+기존 데이터베이스의 messagestatus 열거형에 취소 상태를 추가한다.
+SQLAlchemy는 열거형 멤버 이름을 값으로 저장하므로 'CANCELLED'를 추가한다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.database import engine, MessageStatus
+from sqlalchemy import text
+
+STATEMENT = f"ALTER TYPE messagestatus ADD VALUE IF NOT EXISTS '{MessageStatus.CANCELLED.name}'"
+
+def main():
+    """메인 함수"""
+    print("메시지 상태 추가 시작...")
+    
+    try:
+        # ALTER TYPE ... ADD VALUE는 트랜잭션 밖에서 실행
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(STATEMENT))
+    except Exception as e:
+        print(f"✗ 상태 추가 실패: {e}")
+        return 1
+    
+    print("✓ 상태 추가 완료")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
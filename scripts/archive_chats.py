@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""채팅 콜드 스토리지 아카이브 스크립트
+
+오래 쓰지 않은 채팅과 아카이브된 채팅의 메시지를 압축해 chat_archives로 옮기고,
+메시지 파티션을 미리 만들고 빈 과거 파티션을 삭제한다. 한 번 실행하고 끝나므로
+cron 등으로 주기 실행하거나 --interval로 반복한다.
+"""
+import sys
+import os
+import time
+import logging
+import argparse
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.archive import chat_archiver
+
+def run() -> bool:
+    """아카이브 작업 한 번 실행"""
+    try:
+        result = chat_archiver.run_once()
+    except Exception as e:
+        print(f"✗ 아카이브 실패: {e}")
+        return False
+
+    partitions = result["partitions"]
+    print(f"✓ 채팅 {result['archived']}개 이동, "
+          f"파티션 생성 {len(partitions['created'])}개, 삭제 {len(partitions['dropped'])}개")
+    return True
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="채팅 콜드 스토리지 아카이브")
+    parser.add_argument("--interval", type=float, default=0,
+                        help="반복 실행 주기(초), 0이면 한 번 실행 후 종료")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    if not args.interval:
+        return 0 if run() else 1
+
+    while True:
+        run()
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    sys.exit(main())
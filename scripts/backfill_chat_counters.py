@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""채팅 목록 비정규화 컬럼 추가 및 백필 스크립트
+
+기존 데이터베이스의 chats 테이블에 message_count, last_message_preview 컬럼과
+목록 조회 인덱스를 추가하고, 메시지 테이블을 한 번 집계해 값을 채운다.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.database import engine, PREVIEW_LENGTH
+from sqlalchemy import text
+
+STATEMENTS = [
+    "ALTER TABLE chats ADD COLUMN IF NOT EXISTS message_count INTEGER NOT NULL DEFAULT 0",
+    f"ALTER TABLE chats ADD COLUMN IF NOT EXISTS last_message_preview VARCHAR({PREVIEW_LENGTH})",
+    "CREATE INDEX IF NOT EXISTS idx_chat_status_updated ON chats (status, updated_at, id)",
+    """
+    UPDATE chats c
+    SET message_count = s.cnt
+    FROM (SELECT chat_id, COUNT(*) AS cnt FROM messages GROUP BY chat_id) s
+    WHERE c.id = s.chat_id
+    """,
+    f"""
+    UPDATE chats c
+    SET last_message_preview = LEFT(REGEXP_REPLACE(m.content, '\\s+', ' ', 'g'), {PREVIEW_LENGTH})
+    FROM (
+        SELECT DISTINCT ON (chat_id) chat_id, content
+        FROM messages
+        WHERE content <> ''
+        ORDER BY chat_id, created_at DESC
+    ) m
+    WHERE c.id = m.chat_id
+    """,
+]
+
+def main():
+    """메인 함수"""
+    print("채팅 목록 컬럼 백필 시작...")
+    
+    try:
+        with engine.begin() as conn:
+            for statement in STATEMENTS:
+                conn.execute(text(statement))
+    except Exception as e:
+        print(f"✗ 백필 실패: {e}")
+        return 1
+    
+    print("✓ 백필 완료")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
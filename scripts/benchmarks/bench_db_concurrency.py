@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""API 데이터베이스 호출 동시성 벤치마크
+
+라우트 핸들러(`async def`) 안에서 동기 `DatabaseChatStore`를 직접 호출하던 기존 방식(sync)과
+`AsyncDatabaseChatStore`(SQLAlchemy asyncio + asyncpg) 방식(async)을 같은 조건에서 비교한다.
+
+PostgreSQL 앞에 지연을 주입하는 TCP 프록시를 띄우고, 한 이벤트 루프 안에서 N개의 가상 클라이언트가
+채팅 조회(`chat_exists` + `get_chat`, 캐시 미스 경로)를 반복한다. 지연별로 처리량, 요청 지연,
+이벤트 루프 지연(같은 루프의 SSE 스트림이 멈추는 시간)을 출력한다.
+
+sync 방식은 쿼리 지연만큼 루프 전체가 멈추므로 DB 지연이 커질수록 처리량이 1/RTT 수준으로 떨어지고,
+async 방식은 커넥션 풀 크기까지 요청이 겹쳐 처리된다.
+
+사용법:
+    python scripts/benchmarks/bench_db_concurrency.py --latencies 0,5,20 --concurrency 50
+    python scripts/benchmarks/bench_db_concurrency.py --mode async --latencies 50 --duration 20
+"""
+import sys
+import os
+import time
+import json
+import asyncio
+import argparse
+import threading
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import create_engine
+
+from src.core.config import settings
+from src.core import database, async_database
+from src.core.database import DatabaseChatStore, MessageType, MessageStatus
+from src.core.async_database import AsyncDatabaseChatStore, async_database_url
+
+
+def percentile(values: List[float], p: float) -> float:
+    """백분위수 계산"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(len(ordered) * p / 100), len(ordered) - 1)
+    return ordered[index]
+
+
+class LatencyProxy:
+    """양방향으로 지정한 지연을 더하는 TCP 프록시 (별도 스레드의 이벤트 루프에서 실행)
+
+    지연은 방향마다 절반씩 적용되므로 왕복 시간이 `latency_ms`만큼 늘어난다.
+    """
+
+    def __init__(self, target_host: str, target_port: int):
+        self.target_host = target_host
+        self.target_port = target_port
+        self.latency_ms = 0.0
+        self.port: Optional[int] = None
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+
+    def start(self) -> int:
+        threading.Thread(target=self._run, name="latency-proxy", daemon=True).start()
+        self._ready.wait()
+        return self.port
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _handle(self, client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection(self.target_host, self.target_port)
+        await asyncio.gather(
+            self._pipe(client_reader, upstream_writer),
+            self._pipe(upstream_reader, client_writer),
+            return_exceptions=True,
+        )
+
+    async def _pipe(self, reader, writer):
+        """읽은 데이터를 순서대로, 도착 시각 + 지연/2 이후에 전달"""
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def deliver():
+            while True:
+                due, data = await queue.get()
+                if data is None:
+                    break
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                writer.write(data)
+                await writer.drain()
+
+        sender = asyncio.ensure_future(deliver())
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                await queue.put((time.monotonic() + self.latency_ms / 2000, data))
+        finally:
+            await queue.put((0, None))
+            await sender
+            writer.close()
+
+
+def proxied_url(url: str, port: int) -> str:
+    """DB URL의 호스트/포트를 프록시 주소로 변경"""
+    parts = urlsplit(url)
+    userinfo = parts.netloc.rsplit("@", 1)[0] + "@" if "@" in parts.netloc else ""
+    return urlunsplit(parts._replace(netloc=f"{userinfo}127.0.0.1:{port}"))
+
+
+def seed(store: DatabaseChatStore, chats: int, messages: int) -> List[str]:
+    """벤치마크용 채팅 생성"""
+    chat_ids = []
+    for i in range(chats):
+        chat = store.create_chat(f"bench-db-{i}")
+        for j in range(messages):
+            store.add_message(str(chat.id), f"bench-db-{chat.id}-{j}", MessageType.USER,
+                              content=f"message {j}", status=MessageStatus.COMPLETED)
+        chat_ids.append(str(chat.id))
+    return chat_ids
+
+
+async def ticker(interval: float, stop: asyncio.Event, lags: List[float]):
+    """이벤트 루프 지연 측정 (예정 시각보다 늦게 깨어난 시간)"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def client(mode: str, store, chat_ids: List[str], offset: int, deadline: float, latencies: List[float]):
+    """가상 클라이언트: 채팅 조회 반복"""
+    i = offset
+    while time.perf_counter() < deadline:
+        chat_id = chat_ids[i % len(chat_ids)]
+        i += 1
+        started = time.perf_counter()
+        if mode == "sync":
+            # 기존 라우트: async def 안에서 동기 저장소 직접 호출
+            if store.chat_exists(chat_id):
+                store.get_chat(chat_id)
+            await asyncio.sleep(0)
+        else:
+            if await store.chat_exists(chat_id):
+                await store.get_chat(chat_id)
+        latencies.append(time.perf_counter() - started)
+
+
+async def run_mode(mode: str, store, chat_ids: List[str], args) -> Dict[str, Any]:
+    """한 가지 방식으로 벤치마크 실행"""
+    latencies: List[float] = []
+    loop_lags: List[float] = []
+    stop = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(0.01, stop, loop_lags))
+
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*[
+        client(mode, store, chat_ids, i, deadline, latencies) for i in range(args.concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "elapsed": elapsed,
+        "requests_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "loop_lag_p99_ms": percentile(loop_lags, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 데이터베이스 호출 동시성 벤치마크")
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    parser.add_argument("--latencies", default="0,5,20", help="추가할 DB 왕복 지연 목록(ms, 쉼표 구분)")
+    parser.add_argument("--concurrency", type=int, default=50, help="동시 클라이언트 수")
+    parser.add_argument("--duration", type=float, default=10.0, help="조건별 실행 시간(초)")
+    parser.add_argument("--chats", type=int, default=20, help="조회할 채팅 수")
+    parser.add_argument("--messages", type=int, default=20, help="채팅당 메시지 수")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    url = database.DATABASE_URL
+    target = urlsplit(url)
+    proxy = LatencyProxy(target.hostname or "localhost", target.port or 5432)
+    port = proxy.start()
+
+    # 두 방식 모두 프록시를 거치도록 엔진 설정 (풀 크기는 API 설정과 동일)
+    sync_engine = create_engine(proxied_url(url, port), pool_pre_ping=True,
+                                pool_size=settings.async_db_pool_size,
+                                max_overflow=settings.async_db_max_overflow)
+    database.SessionLocal.configure(bind=sync_engine)
+    settings.async_database_url = async_database_url(proxied_url(url, port))
+
+    sync_store = DatabaseChatStore()
+    async_store = AsyncDatabaseChatStore()
+    chat_ids = seed(sync_store, args.chats, args.messages)
+
+    modes = ["sync", "async"] if args.mode == "both" else [args.mode]
+    results = []
+    if not args.json:
+        print(f"Database: {target.hostname}:{target.port or 5432} (via proxy :{port})")
+        print(f"concurrency={args.concurrency} duration={args.duration}s "
+              f"pool={settings.async_db_pool_size}+{settings.async_db_max_overflow}")
+        print("-" * 78)
+        print(f"{'+rtt(ms)':>8} {'mode':<6} {'requests':>9} {'req/s':>9} {'p50(ms)':>9} "
+              f"{'p99(ms)':>9} {'loop lag p99(ms)':>17}")
+
+    try:
+        for latency in [float(value) for value in args.latencies.split(",")]:
+            proxy.latency_ms = latency
+            for mode in modes:
+
+                async def run():
+                    try:
+                        return await run_mode(mode, sync_store if mode == "sync" else async_store, chat_ids, args)
+                    finally:
+                        await async_database.dispose_async_engine()
+
+                result = {"added_rtt_ms": latency, **asyncio.run(run())}
+                results.append(result)
+                if not args.json:
+                    print(f"{latency:>8.0f} {result['mode']:<6} {result['requests']:>9} "
+                          f"{result['requests_per_sec']:>9.0f} {result['p50_ms']:>9.1f} "
+                          f"{result['p99_ms']:>9.1f} {result['loop_lag_p99_ms']:>17.1f}")
+    finally:
+        proxy.latency_ms = 0
+        for chat_id in chat_ids:
+            sync_store.delete_chat(chat_id)
+        sync_engine.dispose()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""토큰당 처리 경로(hot path) 마이크로벤치마크
+
+`process_chat_message`가 토큰마다 수행하는 작업을 하나씩 분리해 측정한다.
+
+    stream_message   StreamMessage 생성 + model_dump
+    json_dumps       이벤트 dict 직렬화
+    coalesce         TokenCoalescer.add
+    publish          와이어 포맷 인코딩 + 샤드 노드 PUBLISH (stream_transport="pubsub"의 발행 경로)
+    publish_event    RedisManager.publish_event (Streams: XADD + PUBLISH 스크립트)
+    append_content   DatabaseChatStore.append_message_content (버퍼 없이 토큰마다 기록)
+    buffer_append    MessageWriteBuffer.append (write-behind 버퍼 경유)
+    update_state     Celery Task.update_state (실제 루프에서는 10토큰마다 호출)
+    token_loop       위 작업을 실제 루프와 같은 순서로 조합한 토큰 하나의 비용
+    deliver_compact  API: Pub/Sub 페이로드 → compact SSE 프레임 (본문 디코딩 없음)
+    deliver_full     API: Pub/Sub 페이로드 → full 형식 SSE 프레임 (디코딩 + 재인코딩)
+
+결과는 작업별 ns/token과 할당 지표로 출력하고, `--output`을 지정하면 커밋 해시와 함께
+JSON으로 저장한다. `--compare`로 이전 결과와 비교해 임계값 이상 느려지면 종료 코드 1을 반환한다.
+
+할당 지표 (CPython은 총 할당 횟수를 직접 노출하지 않으므로 tracemalloc 기반 근사치):
+    peak_bytes    작업 한 번이 순간적으로 점유한 메모리 (tracemalloc 피크)
+    blocks        작업 한 번 뒤 해제되지 않고 남은 메모리 블록 수 (누수/증가 감지용)
+
+기본값은 설정의 Redis/PostgreSQL을 사용하고, `--stand-ins`를 주면 fakeredis,
+SQLite 인메모리 DB, Celery 메모리 결과 백엔드로 외부 서비스 없이 실행한다.
+
+사용법:
+    python scripts/benchmarks/bench_hot_path.py
+    python scripts/benchmarks/bench_hot_path.py --stand-ins --output results/hot_path.json
+    python scripts/benchmarks/bench_hot_path.py --compare results/hot_path.json --threshold 0.15
+"""
+import sys
+import os
+import gc
+import json
+import time
+import uuid
+import platform
+import argparse
+import subprocess
+import statistics
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+
+# 프로젝트 루트를 Python 경로에 추가
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT_DIR)
+
+from src.core.config import settings
+from src.core import database
+from src.core.database import DatabaseChatStore, MessageType, MessageStatus
+from src.core.redis import RedisManager, channel_name, stream_key
+from src.core.wire import WireEvent, wire_payload, pubsub_payload
+from src.models.schemas import StreamMessage
+from src.services.buffer import MessageWriteBuffer
+from src.services.coalescer import TokenCoalescer
+
+TOKEN = " 토큰"
+
+Operation = Callable[[int], Any]
+
+
+def git_revision() -> Dict[str, Any]:
+    """현재 커밋 해시와 작업 트리 변경 여부"""
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"],
+                                             cwd=ROOT_DIR, text=True).strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def measure_time(op: Operation, iterations: int, repeats: int) -> Dict[str, float]:
+    """반복 측정한 작업당 실행 시간(ns)"""
+    for i in range(min(iterations, 1000)):
+        op(i)
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            started = time.perf_counter_ns()
+            for i in range(iterations):
+                op(i)
+            samples.append((time.perf_counter_ns() - started) / iterations)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "ns_per_op": statistics.median(samples),
+        "ns_per_op_min": min(samples),
+        "ns_per_op_stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def measure_allocations(op: Operation, iterations: int) -> Dict[str, float]:
+    """작업당 할당 지표 (tracemalloc 피크 바이트, 잔존 블록 수)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        op(0)
+        peaks = 0
+        blocks_before = sys.getallocatedblocks()
+        for i in range(iterations):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            op(i)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks += peak - current
+        gc.collect()
+        blocks = sys.getallocatedblocks() - blocks_before
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "peak_bytes_per_op": peaks / iterations,
+        "blocks_per_op": blocks / iterations,
+    }
+
+
+class HotPathBench:
+    """측정 대상 작업과 필요한 Redis/DB/Celery 자원 준비"""
+
+    def __init__(self, stand_ins: bool):
+        self.stand_ins = stand_ins
+        self.task_id = f"bench-{uuid.uuid4()}"
+        self.chat_id: Optional[uuid.UUID] = None
+        self.redis = RedisManager()
+        self.store = DatabaseChatStore()
+        self.celery_task = None
+
+        if stand_ins:
+            import fakeredis
+            from sqlalchemy import create_engine
+            from sqlalchemy.pool import StaticPool
+
+            self.redis._client = fakeredis.FakeRedis(decode_responses=True)
+            sqlite = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+            database.Base.metadata.create_all(bind=sqlite)
+            database.SessionLocal.configure(bind=sqlite)
+
+    def setup(self):
+        """벤치마크용 채팅/메시지 및 Celery 태스크 준비"""
+        chat = self.store.create_chat(title="hot path benchmark")
+        self.chat_id = chat.id
+        self.store.add_message(self.chat_id, self.task_id, MessageType.ASSISTANT, status=MessageStatus.STREAMING)
+
+        from src.core.celery_app import app
+        if self.stand_ins:
+            app.conf.result_backend = "cache+memory://"
+        from src.services.tasks import process_chat_message
+        self.celery_task = process_chat_message
+
+    def teardown(self):
+        """벤치마크 데이터 정리"""
+        if self.chat_id:
+            self.store.delete_chat(self.chat_id)
+        self.redis.stream_client(self.task_id).delete(stream_key(self.task_id))
+        self.redis.close()
+
+    def operations(self) -> Dict[str, Operation]:
+        """측정할 작업 목록"""
+        task_id = self.task_id
+        channel = channel_name(task_id)
+        event = StreamMessage(type="token", content=TOKEN, token_start=1, token_count=1).model_dump()
+        coalescer = TokenCoalescer.for_profile("latency")
+        buffer = MessageWriteBuffer(store=self.store)
+        loop_coalescer = TokenCoalescer.for_profile("latency")
+        loop_buffer = MessageWriteBuffer(store=self.store)
+        redis = self.redis
+        publish_client = redis.stream_client(task_id)
+        store = self.store
+        celery_task = self.celery_task
+        payload = pubsub_payload(wire_payload(event), entry_id="1712345678901-0")
+
+        def stream_message(i):
+            return StreamMessage(type="token", content=TOKEN, token_start=i, token_count=i).model_dump()
+
+        def json_dumps(i):
+            return json.dumps(event)
+
+        def coalesce(i):
+            return coalescer.add(TOKEN, i + 1)
+
+        def publish(i):
+            return publish_client.publish(channel, pubsub_payload(wire_payload(event)))
+
+        def publish_event(i):
+            return redis.publish_event(task_id, event)
+
+        def append_content(i):
+            return store.append_message_content(task_id, TOKEN)
+
+        def buffer_append(i):
+            return buffer.append(task_id, TOKEN)
+
+        def update_state(i):
+            return celery_task.update_state(
+                task_id=task_id,
+                state='PROCESSING',
+                meta={'status': f'토큰 생성 중... ({i}개)', 'progress': 50}
+            )
+
+        def token_loop(i):
+            token_count = i + 1
+            frame = loop_coalescer.add(TOKEN, token_count)
+            if frame:
+                redis.publish_event(task_id, StreamMessage(
+                    type="token",
+                    content=frame.content,
+                    token_start=frame.token_start,
+                    token_count=frame.token_count
+                ).model_dump())
+            loop_buffer.append(task_id, TOKEN)
+            if token_count % 10 == 0:
+                update_state(token_count)
+
+        return {
+            "stream_message": stream_message,
+            "json_dumps": json_dumps,
+            "coalesce": coalesce,
+            "publish": publish,
+            "publish_event": publish_event,
+            "append_content": append_content,
+            "buffer_append": buffer_append,
+            "update_state": update_state,
+            "token_loop": token_loop,
+            "deliver_compact": lambda i: WireEvent.from_payload(payload).frame("compact"),
+            "deliver_full": lambda i: WireEvent.from_payload(payload).frame("full"),
+        }
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> List[str]:
+    """기준 결과 대비 ns/op가 임계값 이상 증가한 작업 목록"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+
+    regressions = []
+    print("-" * 72)
+    print(f"vs {baseline_path}")
+    for result in results:
+        base = baseline.get(result["name"])
+        if not base or not base["ns_per_op"]:
+            continue
+        change = result["ns_per_op"] / base["ns_per_op"] - 1
+        marker = "  REGRESSION" if change > threshold else ""
+        print(f"{result['name']:<16} {base['ns_per_op']:>12.0f} -> {result['ns_per_op']:>12.0f} ns "
+              f"({change:+.1%}){marker}")
+        if change > threshold:
+            regressions.append(result["name"])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="토큰당 처리 경로 마이크로벤치마크")
+    parser.add_argument("--iterations", type=int, default=2000, help="반복당 작업 실행 횟수")
+    parser.add_argument("--repeats", type=int, default=5, help="시간 측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--alloc-iterations", type=int, default=200, help="할당 측정 작업 실행 횟수")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="지정한 작업만 측정")
+    parser.add_argument("--stand-ins", action="store_true",
+                        help="fakeredis/SQLite/메모리 결과 백엔드 사용 (외부 서비스 불필요)")
+    parser.add_argument("--output", metavar="PATH", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", metavar="PATH", help="비교할 기준 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.10, help="회귀로 판단할 ns/op 증가율")
+    args = parser.parse_args()
+
+    bench = HotPathBench(args.stand_ins)
+    bench.setup()
+    try:
+        operations = bench.operations()
+        names = args.only or list(operations)
+        print(f"backend: {'stand-ins' if args.stand_ins else settings.redis_url}  "
+              f"transport: {settings.stream_transport}  iterations: {args.iterations}x{args.repeats}")
+        print("-" * 72)
+        print(f"{'operation':<16} {'ns/token':>12} {'min':>12} {'tokens/s':>12} {'peak B':>9} {'blocks':>7}")
+
+        results = []
+        for name in names:
+            op = operations[name]
+            result = {"name": name, **measure_time(op, args.iterations, args.repeats),
+                      **measure_allocations(op, args.alloc_iterations)}
+            result["ops_per_sec"] = 1e9 / result["ns_per_op"] if result["ns_per_op"] else 0.0
+            results.append(result)
+            print(f"{name:<16} {result['ns_per_op']:>12.0f} {result['ns_per_op_min']:>12.0f} "
+                  f"{result['ops_per_sec']:>12.0f} {result['peak_bytes_per_op']:>9.0f} "
+                  f"{result['blocks_per_op']:>7.2f}")
+    finally:
+        bench.teardown()
+
+    report = {
+        **git_revision(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": "stand-ins" if args.stand_ins else "services",
+        "stream_transport": settings.stream_transport,
+        "iterations": args.iterations,
+        "repeats": args.repeats,
+        "results": results,
+    }
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Saved results to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""API → Celery → Redis → SSE 전체 파이프라인 벤치마크
+
+실행 중인 서버에 채팅을 만들고 메시지를 보낸 뒤 SSE로 응답을 끝까지 받는 요청을
+지정한 동시성으로 반복한다. 요청 처리량과 토큰 처리량, 그리고 다음 지연의
+백분위수를 출력한다.
+
+    TTFT   메시지 전송 → 첫 token 이벤트 수신
+    ITL    연속한 token 이벤트 사이 간격
+    total  메시지 전송 → complete 이벤트 수신
+
+OpenAI 비용 없이 재현 가능한 결과를 얻으려면 워커를 가짜 제공자로 실행한다:
+    LLM_PROVIDER=fake FAKE_LLM_TOKENS=fixed:200 python scripts/run_worker.py
+
+사용법:
+    python scripts/benchmarks/bench_pipeline.py --requests 200 --concurrency 20
+    python scripts/benchmarks/bench_pipeline.py --duration 60 --concurrency 50 --json result.json
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional
+
+import requests
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.redis import TERMINAL_EVENT_TYPES
+
+
+def percentile(values: List[float], p: float) -> float:
+    """백분위수 계산"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(len(ordered) * p / 100), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """지연 목록을 ms 단위 백분위수로 요약"""
+    return {
+        "p50_ms": percentile(values, 50) * 1000,
+        "p90_ms": percentile(values, 90) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": max(values) * 1000 if values else 0.0,
+    }
+
+
+def iter_sse_events(response: requests.Response):
+    """SSE 응답에서 data 필드를 JSON으로 디코딩해 순서대로 반환"""
+    data_lines = []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data_lines:
+                yield json.loads("\n".join(data_lines))
+                data_lines = []
+        elif line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+
+
+def run_request(base_url: str, chat_id: str, message: str, timeout: float) -> Dict[str, Any]:
+    """메시지 하나를 보내고 SSE 응답을 끝까지 수신"""
+    session = requests.Session()
+    result: Dict[str, Any] = {"ok": False, "tokens": 0, "ttft": None, "total": None, "itl": []}
+
+    sent = time.perf_counter()
+    response = session.post(f"{base_url}/api/chats/{chat_id}/messages", json={"message": message}, timeout=timeout)
+    response.raise_for_status()
+    stream_url = response.json()["stream_url"]
+
+    last_token: Optional[float] = None
+    with session.get(f"{base_url}{stream_url}", stream=True, timeout=timeout) as stream:
+        for event in iter_sse_events(stream):
+            now = time.perf_counter()
+            event_type = event.get("type")
+            if event_type == "token":
+                if last_token is None:
+                    result["ttft"] = now - sent
+                else:
+                    result["itl"].append(now - last_token)
+                last_token = now
+                result["tokens"] += event.get("token_count") or 1
+            elif event_type in TERMINAL_EVENT_TYPES:
+                result["total"] = now - sent
+                result["ok"] = event_type == "complete"
+                if event_type == "complete" and event.get("token_count"):
+                    result["tokens"] = event["token_count"]
+                break
+    session.close()
+    return result
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    """동시성을 유지하며 요청을 반복 실행"""
+    base_url = args.url.rstrip("/")
+    # 채팅은 동시성 슬롯마다 하나씩 만들어 재사용
+    chat_ids = [requests.post(f"{base_url}/api/chats", timeout=args.timeout).json()["chat_id"]
+                for _ in range(args.concurrency)]
+
+    results: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration if args.duration else None
+    counter = iter(range(10 ** 9))
+
+    def worker(slot: int):
+        while True:
+            with lock:
+                index = next(counter)
+            if args.duration is None and index >= args.requests:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            try:
+                result = run_request(base_url, chat_ids[slot], f"{args.message} #{index}", args.timeout)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            with lock:
+                results.append(result)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [executor.submit(worker, slot) for slot in range(args.concurrency)]
+        for future in as_completed(futures):
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    if not args.keep_chats:
+        for chat_id in chat_ids:
+            requests.delete(f"{base_url}/api/chats/{chat_id}", timeout=args.timeout)
+
+    completed = [r for r in results if r["ok"]]
+    tokens = sum(r["tokens"] for r in completed)
+    return {
+        "url": base_url,
+        "concurrency": args.concurrency,
+        "requests": len(results) + len(errors),
+        "completed": len(completed),
+        "failed": len(results) - len(completed) + len(errors),
+        "elapsed_s": elapsed,
+        "requests_per_sec": len(completed) / elapsed if elapsed else 0.0,
+        "tokens_per_sec": tokens / elapsed if elapsed else 0.0,
+        "ttft": summarize([r["ttft"] for r in completed if r["ttft"] is not None]),
+        "itl": summarize([gap for r in completed for gap in r["itl"]]),
+        "total": summarize([r["total"] for r in completed if r["total"] is not None]),
+        "errors": errors[:10],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API → Celery → Redis → SSE 파이프라인 벤치마크")
+    parser.add_argument("--url", default="http://localhost:5000", help="API 서버 주소")
+    parser.add_argument("--requests", type=int, default=100, help="총 요청 수 (--duration 미지정 시)")
+    parser.add_argument("--duration", type=float, default=None, help="지정 시 요청 수 대신 시간(초) 동안 실행")
+    parser.add_argument("--concurrency", type=int, default=10, help="동시 요청 수")
+    parser.add_argument("--message", default="벤치마크 메시지", help="보낼 메시지 (요청 번호가 붙음)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="요청별 타임아웃(초)")
+    parser.add_argument("--keep-chats", action="store_true", help="벤치마크 채팅을 삭제하지 않음")
+    parser.add_argument("--json", metavar="PATH", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    health = requests.get(f"{args.url.rstrip('/')}/api/health", timeout=args.timeout).json()
+    print(f"Server: {args.url} ({health.get('status')})")
+    print(f"concurrency={args.concurrency} "
+          + (f"duration={args.duration}s" if args.duration else f"requests={args.requests}"))
+
+    result = run_benchmark(args)
+
+    print("-" * 72)
+    print(f"completed {result['completed']}/{result['requests']} in {result['elapsed_s']:.2f}s "
+          f"({result['requests_per_sec']:.1f} req/s, {result['tokens_per_sec']:.0f} tokens/s)")
+    print(f"{'latency':<8} {'p50(ms)':>10} {'p90(ms)':>10} {'p99(ms)':>10} {'max(ms)':>10}")
+    for name in ("ttft", "itl", "total"):
+        stats = result[name]
+        print(f"{name:<8} {stats['p50_ms']:>10.1f} {stats['p90_ms']:>10.1f} "
+              f"{stats['p99_ms']:>10.1f} {stats['max_ms']:>10.1f}")
+    for error in result["errors"]:
+        print(f"error: {error}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"Saved results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
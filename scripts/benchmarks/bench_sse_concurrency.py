@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""SSE 동시 스트림 처리량 벤치마크
+
+블로킹 `RedisManager.read_stream`을 async 제너레이터 안에서 순회하던 기존 방식(sync)과
+`AsyncRedisManager` 기반 방식(async)을 같은 조건에서 비교한다.
+
+별도 스레드의 퍼블리셔가 N개 태스크 스트림에 토큰을 발행하고, 한 이벤트 루프 안에서
+N개의 소비자가 동시에 스트림을 읽는다. 제한 시간 안에 완료된 스트림 수와
+발행→수신 지연 분포를 출력한다.
+
+사용법:
+    python scripts/benchmarks/bench_sse_concurrency.py --streams 1000 --tokens 50
+    python scripts/benchmarks/bench_sse_concurrency.py --mode async --streams 5000
+"""
+import sys
+import os
+import time
+import uuid
+import asyncio
+import argparse
+import threading
+from typing import List, Dict, Any
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.config import settings
+from src.core.redis import RedisManager, AsyncRedisManager, stream_key, TERMINAL_EVENT_TYPES
+
+
+def percentile(values: List[float], p: float) -> float:
+    """백분위수 계산"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(len(ordered) * p / 100), len(ordered) - 1)
+    return ordered[index]
+
+
+def run_publisher(task_ids: List[str], tokens: int, interval: float, stop: threading.Event):
+    """모든 태스크에 토큰을 라운드 로빈으로 발행 (별도 스레드)"""
+    redis = RedisManager()
+    for i in range(tokens):
+        if stop.is_set():
+            break
+        tick = time.time()
+        for task_id in task_ids:
+            redis.publish_event(task_id, {"type": "token", "content": "x", "token_count": i + 1, "timestamp": time.time()})
+        time.sleep(max(0.0, interval - (time.time() - tick)))
+    for task_id in task_ids:
+        redis.publish_event(task_id, {"type": "complete", "timestamp": time.time()})
+    redis.close()
+
+
+async def consume_sync(task_id: str, deadline: float, lags: List[float]) -> bool:
+    """기존 방식: 블로킹 제너레이터를 async 제너레이터 안에서 순회"""
+    redis = RedisManager()
+    try:
+        for _, message in redis.read_stream(task_id):
+            if time.time() > deadline:
+                return False
+            lags.append(time.time() - message["timestamp"])
+            if message.get("type") in TERMINAL_EVENT_TYPES:
+                return True
+            await asyncio.sleep(0)
+    finally:
+        redis.close()
+    return False
+
+
+async def consume_async(redis: AsyncRedisManager, task_id: str, deadline: float, lags: List[float]) -> bool:
+    """개선 방식: redis.asyncio 기반 스트림 읽기"""
+    async for _, message in redis.read_stream(task_id):
+        if time.time() > deadline:
+            return False
+        lags.append(time.time() - message["timestamp"])
+        if message.get("type") in TERMINAL_EVENT_TYPES:
+            return True
+    return False
+
+
+async def run_mode(mode: str, args) -> Dict[str, Any]:
+    """한 가지 방식으로 벤치마크 실행"""
+    task_ids = [f"bench-{uuid.uuid4()}" for _ in range(args.streams)]
+    lags: List[float] = []
+    stop = threading.Event()
+    redis = AsyncRedisManager(max_connections=args.streams + 10)
+    
+    start = time.time()
+    deadline = start + args.duration
+    publisher = threading.Thread(target=run_publisher, args=(task_ids, args.tokens, args.interval, stop), daemon=True)
+    publisher.start()
+    
+    if mode == "sync":
+        consumers = [consume_sync(task_id, deadline, lags) for task_id in task_ids]
+    else:
+        consumers = [consume_async(redis, task_id, deadline, lags) for task_id in task_ids]
+    
+    try:
+        results = await asyncio.wait_for(asyncio.gather(*consumers, return_exceptions=True), timeout=args.duration + 5)
+    except asyncio.TimeoutError:
+        results = []
+    elapsed = time.time() - start
+    
+    stop.set()
+    publisher.join(timeout=5)
+    
+    # 벤치마크 스트림 정리
+    for task_id in task_ids:
+        await (await redis.stream_client(task_id)).delete(stream_key(task_id))
+    await redis.close()
+    
+    completed = sum(1 for result in results if result is True)
+    return {
+        "mode": mode,
+        "streams": args.streams,
+        "completed": completed,
+        "elapsed": elapsed,
+        "events": len(lags),
+        "events_per_sec": len(lags) / elapsed if elapsed else 0.0,
+        "lag_p50_ms": percentile(lags, 50) * 1000,
+        "lag_p99_ms": percentile(lags, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE 동시 스트림 처리량 벤치마크")
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    parser.add_argument("--streams", type=int, default=500, help="동시 스트림 수")
+    parser.add_argument("--tokens", type=int, default=50, help="스트림당 토큰 수")
+    parser.add_argument("--interval", type=float, default=0.02, help="토큰 간격(초)")
+    parser.add_argument("--duration", type=float, default=30.0, help="모드별 제한 시간(초)")
+    args = parser.parse_args()
+    
+    # 빈 스트림에서 오래 블로킹하지 않도록 짧게 설정
+    settings.stream_transport = "streams"
+    settings.stream_block_ms = 100
+    
+    modes = ["sync", "async"] if args.mode == "both" else [args.mode]
+    print(f"Redis: {settings.redis_url}")
+    print(f"streams={args.streams} tokens={args.tokens} interval={args.interval}s duration={args.duration}s")
+    print("-" * 72)
+    print(f"{'mode':<6} {'completed':>10} {'elapsed(s)':>11} {'events/s':>10} {'lag p50(ms)':>12} {'lag p99(ms)':>12}")
+    
+    for mode in modes:
+        result = asyncio.run(run_mode(mode, args))
+        print(f"{result['mode']:<6} {result['completed']:>5}/{result['streams']:<4} {result['elapsed']:>11.2f} "
+              f"{result['events_per_sec']:>10.0f} {result['lag_p50_ms']:>12.1f} {result['lag_p99_ms']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
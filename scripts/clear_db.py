@@ -4,13 +4,16 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.core.database import SessionLocal, Chat, Message, engine
+from src.core.database import SessionLocal, Chat, Message, MessageChunk, engine
 from sqlalchemy import text
 
 def clear_all_data():
     """모든 데이터 삭제"""
     db = SessionLocal()
     try:
+        # 스트리밍 중이던 메시지 청크 삭제 (외래 키가 없어 메시지와 함께 삭제되지 않음)
+        db.query(MessageChunk).delete()
+        
         # 모든 메시지 삭제 (외래 키 제약 때문에 먼저 삭제)
         deleted_messages = db.query(Message).delete()
         print(f"✓ {deleted_messages}개의 메시지 삭제됨")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""이전 기본 큐(`celery`)에 남은 태스크를 레인 큐로 옮기는 스크립트
+
+요청 레인별 큐(`chat.interactive`/`chat.background`)를 도입하기 전에 발행된 태스크는 Celery 기본 큐
+`celery`에 들어 있고, 새 워커는 이 큐를 소비하지 않는다. 새 버전을 배포한 뒤 한 번 실행해 남은 태스크를
+interactive 큐에 가장 높은 우선순위로 다시 발행한다. 이전 큐는 이전 브로커 설정(kombu 기본 구분자와
+우선순위 단계)으로 읽으므로 우선순위를 붙여 발행된 태스크도 함께 옮긴다.
+
+메시지는 새 큐에 발행한 뒤 이전 큐에서 확인(ack)하므로 중간에 중단되어도 유실되지 않는다.
+같은 태스크가 두 번 들어가도 워커는 `claim_message`로 한 번만 실행한다.
+
+사용법:
+    python scripts/drain_legacy_queue.py              # 남은 태스크 옮기기
+    python scripts/drain_legacy_queue.py --dry-run    # 남은 태스크 수만 출력
+"""
+import sys
+import os
+import argparse
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kombu import Connection, Exchange, Producer, Queue
+
+from src.core.celery_app import app
+from src.core.config import settings
+
+# 레인 도입 전 Celery 기본 큐
+LEGACY_QUEUE = "celery"
+
+
+def drain(source: str, target: str, dry_run: bool = False) -> int:
+    """이전 큐의 태스크를 대상 큐로 옮기기
+
+    Returns:
+        옮긴(`dry_run`이면 남아 있는) 태스크 수
+    """
+    legacy = Queue(source, Exchange(source), routing_key=source)
+    destination = app.amqp.queues[target]
+
+    # 이전 큐는 기본 전송 옵션으로, 대상 큐는 현재 브로커 설정으로 연결
+    with Connection(app.conf.broker_url) as old, app.connection_for_write() as new:
+        queue = legacy(old.default_channel)
+        if dry_run:
+            return queue.queue_declare(passive=True).message_count
+
+        producer = Producer(new)
+        moved = 0
+        while True:
+            message = queue.get(no_ack=False)
+            if message is None:
+                break
+            producer.publish(
+                message.body,
+                exchange=destination.exchange,
+                routing_key=destination.routing_key,
+                declare=[destination],
+                headers=message.headers,
+                content_type=message.content_type,
+                content_encoding=message.content_encoding,
+                correlation_id=message.properties.get("correlation_id"),
+                reply_to=message.properties.get("reply_to"),
+                priority=0,
+            )
+            message.ack()
+            moved += 1
+        return moved
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="이전 기본 큐의 태스크를 레인 큐로 옮기기")
+    parser.add_argument("--queue", default=LEGACY_QUEUE, help="이전 큐 이름")
+    parser.add_argument("--target", default=settings.interactive_queue, help="옮길 큐 이름")
+    parser.add_argument("--dry-run", action="store_true", help="옮기지 않고 남은 태스크 수만 출력")
+    args = parser.parse_args()
+
+    try:
+        count = drain(args.queue, args.target, args.dry_run)
+    except Exception as e:
+        print(f"✗ 큐 이동 실패: {e}")
+        return 1
+
+    if args.dry_run:
+        print(f"{args.queue} 큐에 남은 태스크: {count}개")
+    else:
+        print(f"✓ {args.queue} → {args.target}: 태스크 {count}개 이동")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,8 +10,11 @@ from sqlalchemy import text
 def drop_all_tables():
     """모든 테이블 삭제"""
     try:
-        # 모든 테이블 삭제
+        # 모든 테이블 삭제 (파티션은 messages와 함께 삭제됨)
         Base.metadata.drop_all(bind=engine)
+        # 마이그레이션 기록도 지워야 재생성 시 처음부터 적용됨
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
         print("✓ 모든 테이블 삭제됨")
         return True
     except Exception as e:
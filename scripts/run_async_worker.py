@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""asyncio 스트리밍 워커 실행 스크립트"""
+import sys
+import os
+import asyncio
+import logging
+import argparse
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.async_worker import AsyncChatWorker
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="asyncio 스트리밍 워커")
+    parser.add_argument("--concurrency", type=int, default=None, help="프로세스당 동시 생성 수")
+    parser.add_argument("--queues", default=None,
+                        help="소비할 큐 이름 (쉼표 구분, 미지정 시 모든 레인 큐)")
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(AsyncChatWorker(
+        concurrency=args.concurrency,
+        queues=args.queues.split(",") if args.queues else None
+    ).run())
\ No newline at end of file
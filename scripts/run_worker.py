@@ -2,11 +2,19 @@
 """Celery 워커 실행 스크립트"""
 import sys
 import os
+import shutil
 
 # 프로젝트 루트를 Python 경로에 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# 멀티프로세스 메트릭 디렉토리는 prometheus_client import 전에 준비
+metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if metrics_dir:
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
 from src.core.celery_app import app
 
 if __name__ == '__main__':
-    app.worker_main(['worker', '--loglevel=info'])
\ No newline at end of file
+    # 추가 인자는 그대로 전달 (예: -Q chat.background 로 특정 레인만 처리)
+    app.worker_main(['worker', '--loglevel=info', *sys.argv[1:]])
\ No newline at end of file
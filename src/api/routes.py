@@ -1,21 +1,31 @@
 """API 라우트 정의"""
-import json
+import time
 import uuid
 import asyncio
 from typing import AsyncGenerator, Optional
 
-from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Request, HTTPException, Query
+from fastapi.responses import HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
 from sse_starlette.sse import EventSourceResponse
 from celery.result import AsyncResult
 
 from src.core.celery_app import app as celery_app
-from src.core.redis import RedisManager
+from src.core.redis import async_redis_manager, TERMINAL_EVENT_TYPES
+from src.core.dispatcher import stream_dispatcher
 from src.core.config import settings
 from src.models.schemas import ChatRequest, ChatResponse, TaskStatus, HealthResponse
 from src.services.tasks import process_chat_message
-from src.core.database import db_chat_store, MessageType, MessageStatus
+from src.services.context import context_builder
+from src.services.single_flight import single_flight
+from src.services.outbox import outbox_relay
+from src.services.admission import admission
+from src.services.scheduling import fair_scheduler
+from src.services.cancellation import cancellation, REASON_MESSAGES, REASON_REQUESTED
+from src.core.database import MessageStatus, ACTIVE_MESSAGE_STATUSES
+from src.core.cache import async_chat_store, AsyncCachedChatStore
+from src.core.metrics import ACTIVE_STREAMS, observe_delivery, render_metrics
+from src.core.wire import WireEvent, StreamFormat
 
 # 라우터 생성
 router = APIRouter()
@@ -33,39 +43,76 @@ async def index(request: Request):
     )
 
 
+# 수락 거절 사유별 메시지
+ADMISSION_ERRORS = {
+    "global": "Too many active generations",
+    "queue": "Too many requests waiting for a worker",
+    "chat": "A response is already being generated in this chat",
+}
+
+
 @router.post("/api/chats/{chat_id}/messages")
 async def send_message(chat_id: str, request: ChatRequest):
-    """채팅에 메시지 전송"""
-    # 채팅 확인 (여기서는 존재 여부만 확인)
-    if not db_chat_store.get_chat(chat_id):
-        raise HTTPException(status_code=404, detail="Chat not found")
+    """채팅에 메시지 전송
     
+    채팅 확인, 사용자/응답 메시지 저장, 태스크 아웃박스 기록을 DB 왕복 한 번으로 처리한 뒤
+    태스크를 발행한다. 발행 전에 중단되어도 아웃박스 릴레이가 태스크를 다시 발행한다.
+    
+    진행 중인 생성이 전체/채팅별 한도에 도달했거나 브로커에 쌓인 태스크가 한도를 넘었으면 메시지를 저장하지 않고
+    429와 `Retry-After` 헤더로 거절한다 (single-flight 팔로워는 생성을 늘리지 않으므로 제외).
+    
+    태스크는 요청 레인(`priority`)의 큐로 보내고, 같은 큐 안에서는 채팅별 공정 큐잉으로
+    정한 브로커 우선순위를 붙여 한 채팅의 연속 요청이 다른 채팅을 밀어내지 않게 한다.
+    """
     # 태스크 ID 생성
     task_id = str(uuid.uuid4())
     
-    # 사용자 메시지 저장
-    db_chat_store.add_message(
-        chat_id=chat_id,
-        task_id=f"user-{task_id}",
-        type=MessageType.USER,
-        content=request.message,
-        status=MessageStatus.COMPLETED
-    )
+    # 같은 요청이 생성 중이면 태스크를 만들지 않고 리더 스트림에 합류
+    flight_key, leader_id = await asyncio.to_thread(single_flight.join, task_id, chat_id, request.message)
     
-    # AI 응답 메시지 준비
-    db_chat_store.add_message(
-        chat_id=chat_id,
-        task_id=task_id,
-        type=MessageType.ASSISTANT,
-        content="",
-        status=MessageStatus.PENDING
-    )
+    dispatch = None
+    if not leader_id:
+        decision = await admission.admit(task_id, chat_id)
+        if not decision.admitted:
+            await asyncio.to_thread(single_flight.fail, flight_key, task_id, "Server busy")
+            raise HTTPException(
+                status_code=429,
+                detail={
+                    "error": ADMISSION_ERRORS[decision.reason],
+                    "reason": decision.reason,
+                    "retry_after": decision.retry_after,
+                    "queue": await admission.status()
+                },
+                headers={"Retry-After": str(decision.retry_after)}
+            )
+        options, schedule = await fair_scheduler.route(chat_id, request.priority)
+        dispatch = (
+            process_chat_message.name,
+            [request.message, task_id, chat_id],
+            {
+                "stream_profile": request.stream_profile,
+                "enqueued_at": time.time(),
+                "flight_key": flight_key,
+                "schedule": schedule
+            },
+            options
+        )
     
-    # Celery 태스크 실행
-    task = process_chat_message.apply_async(
-        args=[request.message, task_id, chat_id],
-        task_id=task_id
-    )
+    # 사용자 메시지 + 대기 중인 AI 응답 메시지 저장 (채팅이 없으면 None)
+    posted = await async_chat_store.post_message(chat_id, task_id, request.message, dispatch=dispatch)
+    if posted is None:
+        if leader_id:
+            # 팔로워: 리더에서 자기 합류만 취소 (리더의 생성과 다른 팔로워는 그대로 진행)
+            await asyncio.to_thread(single_flight.leave, task_id, leader_id)
+        else:
+            # 확보한 슬롯 반환, 리더로 등록했다면 합류한 요청이 기다리지 않도록 해제
+            await asyncio.to_thread(admission.release, task_id, chat_id)
+            await asyncio.to_thread(single_flight.fail, flight_key, task_id, "Chat not found")
+        raise HTTPException(status_code=404, detail="Chat not found")
+    
+    # Celery 태스크 발행
+    if dispatch is not None:
+        await outbox_relay.dispatch(task_id, *dispatch)
     
     return {
         "task_id": task_id,
@@ -75,57 +122,162 @@ async def send_message(chat_id: str, request: ChatRequest):
 
 
 @router.get("/api/stream/{task_id}")
-async def stream_chat(task_id: str):
-    """SSE 스트리밍 엔드포인트"""
+async def stream_chat(task_id: str, request: Request, format: StreamFormat = "full"):
+    """SSE 스트리밍 엔드포인트
     
-    async def event_generator() -> AsyncGenerator[dict, None]:
-        channel = f"chat:{task_id}"
-        
-        # 연결 확인 메시지
-        yield {
-            "event": "message",
-            "data": json.dumps({"type": "connected", "task_id": task_id})
-        }
-        
-        # 새 Redis 매니저 인스턴스 생성 (스레드 안전성)
-        redis = RedisManager()
+    Streams 전송 방식에서는 각 이벤트에 스트림 엔트리 ID를 `id:` 필드로 붙이고,
+    `Last-Event-ID` 헤더가 있으면 해당 이벤트 이후부터 이어서 전송한다.
+    
+    `format=compact`이면 워커가 인코딩한 짧은 키 JSON(`src/core/wire.py`)을 그대로 전달하고,
+    `full`(기본값)이면 `StreamMessage` 필드명을 사용하는 JSON으로 전달한다.
+    
+    이벤트 스트림이 없으면(만료, Pub/Sub 전송 방식) 메시지를 먼저 조회해 종료된 태스크는 저장된 내용으로
+    바로 응답하고, 없는 태스크는 스트림을 열지 않고 404로 응답한다.
+    """
+    use_streams = settings.stream_transport == "streams"
+    last_event_id = request.headers.get("last-event-id")
+    
+    # single-flight 팔로워는 리더 태스크의 이벤트를 받음
+    source_id = await single_flight.resolve(task_id)
+    final = None
+    if not use_streams or not await async_redis_manager.stream_exists(source_id):
+        stored = await async_chat_store.get_message(task_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        final = _final_event_from_message(stored)
+    
+    async def event_generator() -> AsyncGenerator[bytes, None]:
+        # 연결 확인 메시지 (replay: 처음부터 다시 전송되는지 여부)
+        yield WireEvent.from_message({
+            "type": "connected",
+            "task_id": task_id,
+            "replay": use_streams and not last_event_id
+        }).frame(format)
         
+        ACTIVE_STREAMS.inc()
         try:
-            # Redis 메시지 스트리밍
-            for message in redis.subscribe(channel):
-                yield {
-                    "event": "message",
-                    "data": json.dumps(message)
-                }
+            # 스트림이 만료된 종료 태스크는 DB 내용으로 즉시 응답
+            if final:
+                yield WireEvent.from_message(final).frame(format)
+                return
+            
+            if use_streams:
+                # 기록된 이벤트 재생 후 새 이벤트 스트리밍
+                events = stream_dispatcher.stream(source_id, last_event_id or "0")
+            else:
+                # 프로세스 공용 구독으로 Redis 메시지 스트리밍
+                events = stream_dispatcher.subscribe(source_id)
+            if source_id != task_id:
+                # 팔로워만 취소되면 리더 이벤트 대신 자기 cancelled 이벤트로 끝냄
+                events = _until_cancelled(events, task_id)
+            
+            # 이미 인코딩된 프레임을 그대로 전달
+            async for event in events:
+                observe_delivery(event.type, event.timestamp)
+                yield event.frame(format)
                 
                 # 완료 또는 에러 시 종료
-                if message.get('type') in ['complete', 'error']:
+                if event.type in TERMINAL_EVENT_TYPES:
                     break
                 
-                # 이벤트 루프에 제어권 양보
-                await asyncio.sleep(0)
-                
         except asyncio.CancelledError:
             # 클라이언트 연결 끊김
             raise
         except Exception as e:
-            yield {
-                "event": "message",
-                "data": json.dumps({
-                    "type": "error",
-                    "error": f"Stream error: {str(e)}"
-                })
-            }
+            yield WireEvent.from_message({
+                "type": "error",
+                "error": f"Stream error: {str(e)}"
+            }).frame(format)
         finally:
-            redis.close()
+            ACTIVE_STREAMS.dec()
     
     return EventSourceResponse(event_generator())
 
 
+async def _until_cancelled(events: AsyncGenerator[WireEvent, None],
+                           task_id: str) -> AsyncGenerator[WireEvent, None]:
+    """리더 이벤트를 전달하다가 `task_id`에 취소가 요청되면 cancelled 이벤트로 종료
+
+    리더 이벤트가 뜸해도 `CANCEL_CHECK_INTERVAL`마다 취소 요청을 확인한다.
+    """
+    loop = asyncio.get_running_loop()
+    interval = settings.cancel_check_interval
+    next_check = loop.time() + interval
+    pending = asyncio.ensure_future(events.__anext__())
+    try:
+        while True:
+            done, _ = await asyncio.wait({pending}, timeout=max(0.0, next_check - loop.time()))
+            if done:
+                try:
+                    event = pending.result()
+                except StopAsyncIteration:
+                    return
+                pending = asyncio.ensure_future(events.__anext__())
+                yield event
+            if loop.time() < next_check:
+                continue
+            next_check = loop.time() + interval
+            if await cancellation.arequested(task_id):
+                yield WireEvent.from_message({
+                    "type": "cancelled",
+                    "content": "",
+                    "error": REASON_MESSAGES[REASON_REQUESTED]
+                })
+                return
+    finally:
+        pending.cancel()
+        try:
+            await pending
+        except (asyncio.CancelledError, StopAsyncIteration):
+            pass
+        await events.aclose()
+
+
+def _final_event_from_message(message: Optional[dict]) -> Optional[dict]:
+    """종료된 메시지를 complete/error 이벤트로 변환"""
+    if not message:
+        return None
+    
+    if message["status"] == MessageStatus.COMPLETED.value:
+        return {"type": "complete", "content": message["content"]}
+    if message["status"] == MessageStatus.FAILED.value:
+        return {"type": "error", "error": message["error"] or "Task failed"}
+    if message["status"] == MessageStatus.CANCELLED.value:
+        return {"type": "cancelled", "content": message["content"], "error": message["error"]}
+    return None
+
+
+@router.post("/api/task/{task_id}/cancel")
+async def cancel_task(task_id: str):
+    """생성 취소
+    
+    워커가 다음 확인 시점(`CANCEL_CHECK_INTERVAL`)에 업스트림 스트림을 닫고, 받은 데까지의 내용을
+    `cancelled` 상태로 저장한 뒤 `cancelled` 이벤트로 스트림을 끝낸다. 대기 중인 태스크는 시작하자마자 끝난다.
+    single-flight 리더를 취소하면 합류한 요청도 함께 취소되고, 팔로워를 취소하면 그 메시지만 바로 취소되며
+    팔로워의 SSE는 리더 이벤트 대신 `cancelled` 이벤트로 끝난다.
+    """
+    message = await async_chat_store.get_message(task_id)
+    if not message:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if message["status"] not in {status.value for status in ACTIVE_MESSAGE_STATUSES}:
+        raise HTTPException(
+            status_code=409,
+            detail={"error": "Task already finished", "status": message["status"]}
+        )
+    
+    # 리더가 아직 마무리하지 않은 팔로워는 합류를 풀고 바로 취소 상태로 저장
+    leader_id = await single_flight.resolve(task_id)
+    if leader_id != task_id and await asyncio.to_thread(single_flight.leave, task_id, leader_id):
+        await async_chat_store.update_message_status(task_id, MessageStatus.CANCELLED,
+                                                     error=REASON_MESSAGES[REASON_REQUESTED])
+    await cancellation.request(task_id)
+    return {"task_id": task_id, "status": "cancelling"}
+
+
 @router.get("/api/task/{task_id}", response_model=TaskStatus)
 async def get_task_status(task_id: str):
-    """태스크 상태 조회"""
-    result = AsyncResult(task_id, app=celery_app)
+    """태스크 상태 조회 (single-flight 팔로워는 리더 태스크 상태)"""
+    result = AsyncResult(await single_flight.resolve(task_id), app=celery_app)
     
     if not result:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -140,7 +292,7 @@ async def get_task_status(task_id: str):
 @router.post("/api/chats")
 async def create_chat():
     """새 채팅 생성"""
-    chat = db_chat_store.create_chat()
+    chat = await async_chat_store.create_chat()
     return {
         "chat_id": str(chat.id),
         "title": chat.title,
@@ -149,26 +301,42 @@ async def create_chat():
 
 
 @router.get("/api/chats")
-async def get_chats():
-    """모든 채팅 목록 조회"""
-    chats = db_chat_store.get_all_chats()
+async def get_chats(limit: Optional[int] = Query(None, ge=1), before: Optional[str] = None):
+    """채팅 목록 조회 (최근 업데이트 순, `before`에 `next_cursor`를 넘겨 다음 페이지 조회)"""
+    try:
+        page = await async_chat_store.get_all_chats(limit=limit, before=before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    chats = page["chats"]
     return {
         "chats": [
             {
                 "chat_id": chat["id"],
                 "title": chat["title"],
                 "updated_at": chat["updated_at"].isoformat(),
-                "message_count": chat["message_count"]
+                "message_count": chat["message_count"],
+                "last_message_preview": chat["last_message_preview"]
             }
             for chat in chats
-        ]
+        ],
+        "has_more": page["has_more"],
+        "next_cursor": chats[-1]["cursor"] if page["has_more"] else None
     }
 
 
 @router.get("/api/chats/{chat_id}")
-async def get_chat(chat_id: str):
-    """특정 채팅 조회"""
-    chat = db_chat_store.get_chat(chat_id)
+async def get_chat(chat_id: str, limit: Optional[int] = Query(None, ge=1),
+                   before: Optional[str] = None, after: Optional[str] = None):
+    """특정 채팅 조회
+    
+    기본적으로 최신 메시지 `limit`개를 반환하며, `before`/`after`에 메시지의
+    `cursor` 값을 넘기면 그 이전/이후 메시지를 조회한다.
+    """
+    try:
+        chat = await async_chat_store.get_chat(chat_id, limit=limit, before=before, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not chat:
         raise HTTPException(status_code=404, detail="Chat not found")
     
@@ -184,52 +352,73 @@ async def get_chat(chat_id: str):
                 "type": msg["type"],
                 "content": msg["content"],
                 "status": msg["status"],
-                "created_at": msg["created_at"].isoformat()
+                "created_at": msg["created_at"].isoformat(),
+                "cursor": msg["cursor"]
             }
             for msg in chat["messages"]
-        ]
+        ],
+        "has_more": chat["has_more"]
     }
 
 
 @router.delete("/api/chats/{chat_id}")
 async def delete_chat(chat_id: str):
     """채팅 삭제"""
-    chat = db_chat_store.get_chat(chat_id)
-    if not chat:
+    if not await async_chat_store.chat_exists(chat_id):
         raise HTTPException(status_code=404, detail="Chat not found")
     
-    db_chat_store.delete_chat(chat_id)
+    await async_chat_store.delete_chat(chat_id)
+    await asyncio.to_thread(context_builder.clear, chat_id)
     return {"status": "deleted"}
 
 
 @router.get("/api/chats/{chat_id}/active-task")
 async def get_active_task(chat_id: str):
     """채팅의 활성 작업 조회"""
-    chat = db_chat_store.get_chat(chat_id)
-    if not chat:
+    if not await async_chat_store.chat_exists(chat_id):
         raise HTTPException(status_code=404, detail="Chat not found")
     
-    active_task_id = db_chat_store.get_active_task(chat_id)
+    active_task_id = await async_chat_store.get_active_task(chat_id)
     if active_task_id:
-        # 활성 메시지 찾기
-        for message in chat["messages"]:
-            if message["task_id"] == active_task_id:
-                return {
-                    "task_id": active_task_id,
-                    "status": message["status"],
-                    "content": message["content"]
-                }
+        # 활성 메시지 조회
+        message = await async_chat_store.get_message(active_task_id)
+        if message:
+            return {
+                "task_id": active_task_id,
+                "status": message["status"],
+                "content": message["content"]
+            }
     
     return {"task_id": None}
 
 
+@router.get("/api/queue")
+async def get_queue_status():
+    """생성 대기열 상태 (수락된 생성 수, 대기 건수, 새 요청의 예상 대기 시간)"""
+    return await admission.status()
+
+
+@router.get("/api/cache/stats")
+async def get_cache_stats():
+    """채팅 캐시 히트/미스 통계 (현재 API 프로세스 기준)"""
+    if not isinstance(async_chat_store, AsyncCachedChatStore):
+        return {"enabled": False}
+    return {"enabled": True, **async_chat_store.stats()}
+
+
+@router.get("/metrics")
+async def metrics():
+    """Prometheus 메트릭"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @router.get("/api/health", response_model=HealthResponse)
 async def health_check():
     """헬스체크"""
-    from src.core.redis import redis_manager
     import time
     
-    redis_status = "connected" if redis_manager.health_check() else "disconnected"
+    redis_status = "connected" if await async_redis_manager.health_check() else "disconnected"
     
     return HealthResponse(
         status="ok" if redis_status == "connected" else "error",
@@ -1,31 +1,46 @@
 """Core modules for Redis Streaming application"""
 from .config import settings
-from .redis import redis_manager, RedisManager
+from .redis import redis_manager, RedisManager, async_redis_manager, AsyncRedisManager
+from .dispatcher import stream_dispatcher, StreamDispatcher
 from .celery_app import app as celery_app
 from .database import (
     db_chat_store,
     DatabaseChatStore,
     Chat,
     Message,
+    ChatArchive,
     ChatStatus,
     MessageType,
     MessageStatus,
     init_db,
     get_db
 )
+from .async_database import async_db_chat_store, AsyncDatabaseChatStore
+from .cache import chat_store, CachedChatStore, async_chat_store, AsyncCachedChatStore
 
 __all__ = [
     "settings",
     "redis_manager",
     "RedisManager",
+    "async_redis_manager",
+    "AsyncRedisManager",
+    "stream_dispatcher",
+    "StreamDispatcher",
     "celery_app",
     "db_chat_store",
     "DatabaseChatStore",
     "Chat",
     "Message",
+    "ChatArchive",
     "ChatStatus",
     "MessageType",
     "MessageStatus",
     "init_db",
-    "get_db"
+    "get_db",
+    "async_db_chat_store",
+    "AsyncDatabaseChatStore",
+    "chat_store",
+    "CachedChatStore",
+    "async_chat_store",
+    "AsyncCachedChatStore"
 ]
\ No newline at end of file
@@ -0,0 +1,451 @@
+"""비동기 데이터베이스 접근 (API 프로세스용)
+
+FastAPI 라우트는 이벤트 루프에서 실행되므로 동기 `DatabaseChatStore`(psycopg2)를 호출하면
+쿼리가 끝날 때까지 다른 요청과 SSE 스트림이 모두 멈춘다. API는 SQLAlchemy asyncio 확장과
+asyncpg 드라이버를 쓰는 `AsyncDatabaseChatStore`를 사용하고, Celery 워커는 동기 저장소를 유지한다.
+
+커넥션 풀 크기는 API 프로세스 하나 기준이다. `async_db_pool_size + async_db_max_overflow`에
+API 프로세스 수를 곱한 값과 워커 풀의 합이 PostgreSQL `max_connections`를 넘지 않도록 설정한다.
+"""
+import json
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Callable, Tuple
+
+from sqlalchemy import select, update, delete, insert, literal, case, tuple_, or_
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.config import settings
+from src.core.database import (
+    DATABASE_URL,
+    Chat,
+    Message,
+    OutboxTask,
+    MessageChunk,
+    ChatArchive,
+    ChatStatus,
+    MessageType,
+    MessageStatus,
+    ACTIVE_MESSAGE_STATUSES,
+    TERMINAL_MESSAGE_STATUSES,
+    DEFAULT_CHAT_TITLE,
+    decode_cursor,
+    title_from_message,
+    instrument_engine,
+    unpack_messages,
+    _preview,
+    _message_detail,
+    _archived_message,
+    _archived_message_query,
+    _chat_page,
+    _chat_summary,
+    _chunks_query,
+    _streamed_task_ids,
+    _join_chunks,
+    _delete_chunks_statement,
+    _lock_chat_statement,
+    _storage_statement,
+)
+from src.core.metrics import CHAT_ARCHIVE_OPERATIONS
+
+logger = logging.getLogger(__name__)
+
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def async_database_url(url: str) -> str:
+    """동기 PostgreSQL URL을 asyncpg 드라이버 URL로 변환"""
+    scheme, rest = url.split("://", 1)
+    if scheme in ("postgresql", "postgres", "postgresql+psycopg2"):
+        scheme = "postgresql+asyncpg"
+    return f"{scheme}://{rest}"
+
+
+def get_async_engine() -> AsyncEngine:
+    """비동기 엔진 (lazy loading)"""
+    global _engine, _sessionmaker
+    if _engine is None:
+        _engine = create_async_engine(
+            settings.async_database_url or async_database_url(DATABASE_URL),
+            pool_pre_ping=True,
+            pool_size=settings.async_db_pool_size,
+            max_overflow=settings.async_db_max_overflow,
+            pool_timeout=settings.async_db_pool_timeout,
+        )
+        instrument_engine(_engine.sync_engine)
+        _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False, autoflush=False)
+    return _engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """비동기 세션 생성"""
+    get_async_engine()
+    return _sessionmaker()
+
+
+async def dispose_async_engine():
+    """커넥션 풀 정리 (애플리케이션 종료 시)"""
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _sessionmaker = None
+
+
+def _uuid(value) -> Optional[uuid.UUID]:
+    """채팅 ID 파싱 (형식이 올바르지 않으면 None)"""
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+class AsyncDatabaseChatStore:
+    """`DatabaseChatStore`의 비동기 버전 (반환 형식 동일)
+
+    형식이 올바르지 않은 채팅 ID는 DB에 보내지 않고 없는 채팅으로 처리한다.
+    """
+
+    async def create_chat(self, title: Optional[str] = None) -> Chat:
+        """새 채팅 생성"""
+        async with AsyncSessionLocal() as db:
+            chat = Chat(title=title or DEFAULT_CHAT_TITLE)
+            db.add(chat)
+            await db.commit()
+            return chat
+
+    async def chat_exists(self, chat_id: str) -> bool:
+        """채팅 존재 여부 확인"""
+        chat_uuid = _uuid(chat_id)
+        if chat_uuid is None:
+            return False
+        async with AsyncSessionLocal() as db:
+            found = await db.scalar(select(Chat.id).where(Chat.id == chat_uuid).limit(1))
+            return found is not None
+
+    async def get_chat(self, chat_id: str, limit: Optional[int] = None,
+                       before: Optional[str] = None, after: Optional[str] = None) -> Optional[dict]:
+        """채팅 조회 (메시지는 키셋 페이지네이션, `DatabaseChatStore.get_chat` 참고)
+
+        Raises:
+            ValueError: 커서 형식이 올바르지 않은 경우
+        """
+        limit = min(limit or settings.chat_history_page_size, settings.chat_history_max_page_size)
+        chat_uuid = _uuid(chat_id)
+        if chat_uuid is None:
+            return None
+
+        async with AsyncSessionLocal() as db:
+            chat = await db.scalar(select(Chat).where(Chat.id == chat_uuid))
+            if not chat:
+                return None
+
+            # 콜드 스토리지로 옮긴 채팅은 메시지를 먼저 복원
+            if chat.cold_since is not None:
+                await self._rehydrate(db, chat.id)
+                await db.commit()
+
+            query = select(Message).where(Message.chat_id == chat.id)
+            position = tuple_(Message.created_at, Message.id)
+            if after:
+                query = query.where(position > tuple_(*decode_cursor(after)))
+                query = query.order_by(Message.created_at.asc(), Message.id.asc())
+            else:
+                if before:
+                    query = query.where(position < tuple_(*decode_cursor(before)))
+                query = query.order_by(Message.created_at.desc(), Message.id.desc())
+
+            # 한 개 더 조회해 다음 페이지 존재 여부 확인
+            messages = list(await db.scalars(query.limit(limit + 1)))
+            has_more = len(messages) > limit
+            messages = messages[:limit]
+            if not after:
+                messages.reverse()
+
+            # 진행 중인 메시지는 청크로 내용 복원
+            streamed_ids = _streamed_task_ids(messages)
+            streamed = _join_chunks(await db.execute(_chunks_query(streamed_ids))) if streamed_ids else None
+            return _chat_page(chat, messages, has_more, streamed)
+
+    @staticmethod
+    async def _rehydrate(db: AsyncSession, chat_id: uuid.UUID) -> bool:
+        """콜드 스토리지의 메시지를 messages로 복원 (`database._rehydrate`와 동일, 호출자가 커밋)"""
+        chat = await db.scalar(_lock_chat_statement(chat_id))
+        if chat is None or chat.cold_since is None:
+            return False
+        archive = await db.get(ChatArchive, chat_id)
+        if archive is not None:
+            rows = unpack_messages(chat_id, archive.payload)
+            if rows:
+                await db.execute(insert(Message), rows)
+            await db.delete(archive)
+        await db.execute(_storage_statement(chat_id, None, rehydrated_at=datetime.utcnow()))
+        CHAT_ARCHIVE_OPERATIONS.labels("rehydrated").inc()
+        return True
+
+    async def get_all_chats(self, include_archived: bool = False, limit: Optional[int] = None,
+                            before: Optional[str] = None) -> dict:
+        """채팅 목록 조회 (updated_at 기준 키셋 페이지네이션)
+
+        Raises:
+            ValueError: 커서 형식이 올바르지 않은 경우
+        """
+        limit = min(limit or settings.chat_list_page_size, settings.chat_list_max_page_size)
+
+        query = select(Chat)
+        if not include_archived:
+            query = query.where(Chat.status == ChatStatus.ACTIVE)
+        if before:
+            query = query.where(tuple_(Chat.updated_at, Chat.id) < tuple_(*decode_cursor(before)))
+        query = query.order_by(Chat.updated_at.desc(), Chat.id.desc()).limit(limit + 1)
+
+        async with AsyncSessionLocal() as db:
+            chats = list(await db.scalars(query))
+        has_more = len(chats) > limit
+        return {"chats": [_chat_summary(chat) for chat in chats[:limit]], "has_more": has_more}
+
+    async def get_message(self, task_id: str) -> Optional[dict]:
+        """태스크 ID로 메시지 조회 (콜드 스토리지에 있는 메시지는 채팅을 복원하지 않고 압축 값에서 읽음)"""
+        async with AsyncSessionLocal() as db:
+            message = await db.scalar(select(Message).where(Message.task_id == task_id).limit(1))
+            if not message:
+                return _archived_message(await db.scalar(_archived_message_query(task_id)), task_id)
+            streamed = ""
+            if message.status in ACTIVE_MESSAGE_STATUSES:
+                streamed = _join_chunks(await db.execute(_chunks_query([task_id]))).get(task_id, "")
+            return _message_detail(message, streamed)
+
+    async def add_message(self, chat_id: str, task_id: str, type: MessageType,
+                          content: str = "", status: MessageStatus = MessageStatus.PENDING) -> Message:
+        """채팅에 메시지 추가
+
+        Raises:
+            ValueError: 채팅 ID 형식이 올바르지 않은 경우
+        """
+        chat_uuid = _uuid(chat_id)
+        if chat_uuid is None:
+            raise ValueError(f"Invalid chat id: {chat_id}")
+
+        async with AsyncSessionLocal() as db:
+            message = Message(chat_id=chat_uuid, task_id=task_id, type=type, content=content, status=status)
+            db.add(message)
+
+            # 채팅 업데이트 시간 갱신
+            chat = await db.scalar(select(Chat).where(Chat.id == chat_uuid))
+            if chat:
+                chat.updated_at = datetime.utcnow()
+                chat.message_count = Chat.message_count + 1
+                if content:
+                    chat.last_message_preview = _preview(content)
+
+                # 첫 사용자 메시지로 제목 설정
+                if type == MessageType.USER and chat.title == DEFAULT_CHAT_TITLE:
+                    chat.title = title_from_message(content)
+
+            await db.commit()
+            return message
+
+    async def post_message(self, chat_id: str, task_id: str, content: str,
+                           dispatch: Optional[Tuple[str, list, dict, dict]] = None) -> Optional[Tuple[Message, Message]]:
+        """사용자 메시지와 대기 중인 응답 메시지를 한 번에 추가
+
+        채팅 갱신(시간, 메시지 수, 미리보기, 제목), 두 메시지 INSERT, 아웃박스 기록을
+        데이터 변경 CTE로 묶은 구문 하나로 실행한다(왕복 1회, 단일 트랜잭션).
+        채팅이 없으면 UPDATE가 행을 반환하지 않으므로 아무것도 기록되지 않는다.
+
+        Args:
+            dispatch: 아웃박스에 기록할 (태스크 이름, args, kwargs, 발행 옵션). None이면 기록하지 않음
+
+        Returns:
+            (사용자 메시지, 응답 메시지). 채팅이 없으면 None
+        """
+        chat_uuid = _uuid(chat_id)
+        if chat_uuid is None:
+            return None
+
+        now = datetime.utcnow()
+        user_message = Message(id=uuid.uuid4(), chat_id=chat_uuid, task_id=f"user-{task_id}",
+                               type=MessageType.USER, content=content, status=MessageStatus.COMPLETED,
+                               created_at=now, updated_at=now)
+        # 같은 시각이면 (created_at, id) 정렬이 뒤바뀔 수 있으므로 응답 메시지를 1µs 뒤로
+        reply_at = now + timedelta(microseconds=1)
+        assistant_message = Message(id=uuid.uuid4(), chat_id=chat_uuid, task_id=task_id,
+                                    type=MessageType.ASSISTANT, content="", status=MessageStatus.PENDING,
+                                    created_at=reply_at, updated_at=reply_at)
+
+        chat_values = {"updated_at": now, "message_count": Chat.message_count + 2}
+        if content:
+            chat_values["last_message_preview"] = _preview(content)
+            chat_values["title"] = case((Chat.title == DEFAULT_CHAT_TITLE, title_from_message(content)),
+                                        else_=Chat.title)
+        posted = (update(Chat).where(Chat.id == chat_uuid).values(**chat_values)
+                  .returning(Chat.id).cte("posted_chat"))
+
+        columns = ["id", "chat_id", "task_id", "type", "content", "status", "created_at", "updated_at"]
+        rows = [
+            select(*[
+                posted.c.id if name == "chat_id"
+                else literal(getattr(message, name), Message.__table__.c[name].type)
+                for name in columns
+            ])
+            for message in (user_message, assistant_message)
+        ]
+        ctes = [insert(Message).from_select(columns, rows[0].union_all(rows[1])).cte("posted_messages")]
+        if dispatch is not None:
+            name, args, kwargs, options = dispatch
+            payload = json.dumps({"args": args, "kwargs": kwargs, "options": options}, ensure_ascii=False)
+            ctes.append(insert(OutboxTask).from_select(
+                ["task_id", "task_name", "payload", "attempts", "created_at"],
+                select(literal(task_id), literal(name), literal(payload), literal(0), literal(now))
+                .where(posted.c.id.is_not(None))
+            ).cte("posted_outbox"))
+
+        async with AsyncSessionLocal() as db:
+            found = await db.scalar(select(posted.c.id).add_cte(*ctes))
+            await db.commit()
+        return (user_message, assistant_message) if found else None
+
+    async def confirm_dispatch(self, task_id: str):
+        """발행이 확인된 태스크를 아웃박스에서 삭제"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(OutboxTask).where(OutboxTask.task_id == task_id))
+            await db.commit()
+
+    async def relay_outbox(self, send: Callable[[str, str, list, dict, dict], None],
+                           older_than: float, limit: int = 100) -> int:
+        """발행이 확인되지 않은 아웃박스 태스크 재발행
+
+        `older_than`초보다 오래됐고 최근 `older_than`초 안에 발행을 시도하지 않은 행을
+        `FOR UPDATE SKIP LOCKED`로 가져와 `dispatched_at`을 기록하고 바로 커밋한다.
+        발행은 행 잠금과 트랜잭션 없이 스레드에서 하고(브로커 호출이 이벤트 루프를 막지 않음),
+        성공한 행은 삭제한다. 여러 API 프로세스가 동시에 실행해도 `dispatched_at`이 갱신된 행은
+        유예 시간 동안 건너뛰며, 삭제 전에 중단되면 유예 시간 뒤에 다시 발행된다
+        (워커는 `claim_message`로 중복 실행 방지).
+
+        Args:
+            send: (태스크 ID, 태스크 이름, args, kwargs, 발행 옵션)을 받아 발행하는 동기 함수
+
+        Returns:
+            재발행한 태스크 수
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=older_than)
+        async with AsyncSessionLocal() as db:
+            rows = list(await db.execute(
+                select(OutboxTask.task_id, OutboxTask.task_name, OutboxTask.payload)
+                .where(OutboxTask.created_at < cutoff,
+                       or_(OutboxTask.dispatched_at.is_(None), OutboxTask.dispatched_at < cutoff))
+                .order_by(OutboxTask.created_at).limit(limit)
+                .with_for_update(skip_locked=True)
+            ))
+            if not rows:
+                return 0
+            await db.execute(
+                update(OutboxTask).where(OutboxTask.task_id.in_([row.task_id for row in rows]))
+                .values(dispatched_at=now)
+            )
+            await db.commit()
+
+        sent, failed = [], []
+        for row in rows:
+            payload = json.loads(row.payload)
+            try:
+                await asyncio.to_thread(send, row.task_id, row.task_name, payload["args"], payload["kwargs"],
+                                        payload.get("options") or {})
+            except Exception as e:
+                logger.warning(f"Failed to relay outbox task {row.task_id}: {e}")
+                failed.append(row.task_id)
+                continue
+            sent.append(row.task_id)
+
+        async with AsyncSessionLocal() as db:
+            if sent:
+                await db.execute(delete(OutboxTask).where(OutboxTask.task_id.in_(sent)))
+            if failed:
+                # 다음 주기에 바로 다시 시도
+                await db.execute(
+                    update(OutboxTask).where(OutboxTask.task_id.in_(failed))
+                    .values(attempts=OutboxTask.attempts + 1, dispatched_at=None)
+                )
+            await db.commit()
+        return len(sent)
+
+    async def update_message_status(self, task_id: str, status: MessageStatus,
+                                    content: Optional[str] = None, error: Optional[str] = None) -> Optional[str]:
+        """메시지 상태 업데이트
+
+        Returns:
+            메시지가 속한 채팅 ID (메시지가 없으면 None)
+        """
+        async with AsyncSessionLocal() as db:
+            message = await db.scalar(select(Message).where(Message.task_id == task_id).limit(1))
+            if not message:
+                return None
+
+            chat_id = str(message.chat_id)
+            message.status = status
+            if content is not None:
+                message.content = content
+                # 완료된 응답을 채팅 목록 미리보기에 반영
+                if content:
+                    await db.execute(
+                        update(Chat).where(Chat.id == message.chat_id)
+                        .values(last_message_preview=_preview(content))
+                    )
+            if error is not None:
+                message.error = error
+            if status in TERMINAL_MESSAGE_STATUSES:
+                # 청크를 내용으로 합치고 삭제 (`database._compact_chunks`와 동일)
+                if content is None:
+                    chunks = (await db.execute(_chunks_query([task_id]))).all()
+                    if chunks:
+                        message.content = message.content + _join_chunks(chunks)[task_id]
+                await db.execute(delete(MessageChunk).where(MessageChunk.task_id == task_id))
+            message.updated_at = datetime.utcnow()
+            await db.commit()
+            return chat_id
+
+    async def delete_chat(self, chat_id: str):
+        """채팅 삭제 (관계를 로드하지 않고 청크, 메시지, 채팅을 DELETE 문으로 삭제, 콜드 스토리지는 외래 키로 함께 삭제)"""
+        chat_uuid = _uuid(chat_id)
+        if chat_uuid is None:
+            return
+        async with AsyncSessionLocal() as db:
+            await db.execute(_delete_chunks_statement(chat_uuid))
+            await db.execute(delete(Message).where(Message.chat_id == chat_uuid))
+            await db.execute(delete(Chat).where(Chat.id == chat_uuid))
+            await db.commit()
+
+    async def archive_chat(self, chat_id: str):
+        """채팅 아카이브"""
+        chat_uuid = _uuid(chat_id)
+        if chat_uuid is None:
+            return
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Chat).where(Chat.id == chat_uuid)
+                .values(status=ChatStatus.ARCHIVED, updated_at=datetime.utcnow())
+            )
+            await db.commit()
+
+    async def get_active_task(self, chat_id: str) -> Optional[str]:
+        """채팅의 활성 작업 ID 반환"""
+        chat_uuid = _uuid(chat_id)
+        if chat_uuid is None:
+            return None
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(
+                select(Message.task_id)
+                .where(Message.chat_id == chat_uuid, Message.status.in_(ACTIVE_MESSAGE_STATUSES))
+                .order_by(Message.created_at.desc())
+                .limit(1)
+            )
+
+
+# 싱글톤 인스턴스
+async_db_chat_store = AsyncDatabaseChatStore()
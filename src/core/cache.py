@@ -0,0 +1,446 @@
+"""채팅 메타데이터 및 최근 메시지 Redis 캐시"""
+import json
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any, Tuple
+
+import redis
+
+from src.core.config import settings
+from src.core.redis import RedisManager, redis_manager, AsyncRedisManager, async_redis_manager
+from src.core.metrics import REDIS_CALL_SECONDS
+from src.core.database import (
+    DatabaseChatStore,
+    db_chat_store,
+    MessageType,
+    MessageStatus,
+    DEFAULT_CHAT_TITLE,
+    title_from_message,
+    encode_cursor,
+)
+from src.core.async_database import AsyncDatabaseChatStore, async_db_chat_store
+
+logger = logging.getLogger(__name__)
+
+# 진행 중인 메시지는 내용이 계속 바뀌므로 캐시에서 제공하지 않음
+ACTIVE_STATUSES = (
+    MessageStatus.PENDING.value,
+    MessageStatus.PROCESSING.value,
+    MessageStatus.STREAMING.value,
+)
+
+# 캐시된 채팅에 새 메시지 반영 (메타가 없으면 아무것도 하지 않음)
+# KEYS: meta, recent / ARGV: 메시지 JSON, 최근 메시지 수, TTL, updated_at, 새 제목, 기본 제목
+ADD_MESSAGE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local count = redis.call('HINCRBY', KEYS[1], 'message_count', 1)
+redis.call('HSET', KEYS[1], 'updated_at', ARGV[4])
+if ARGV[5] ~= '' and redis.call('HGET', KEYS[1], 'title') == ARGV[6] then
+    redis.call('HSET', KEYS[1], 'title', ARGV[5])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+-- 빈 채팅의 첫 메시지면 최근 메시지 리스트를 새로 만든다
+if count == 1 or redis.call('EXISTS', KEYS[2]) == 1 then
+    if ARGV[1] == '' then
+        redis.call('DEL', KEYS[2])
+    else
+        redis.call('RPUSH', KEYS[2], ARGV[1])
+        redis.call('LTRIM', KEYS[2], -tonumber(ARGV[2]), -1)
+        redis.call('EXPIRE', KEYS[2], ARGV[3])
+    end
+end
+return 1
+"""
+
+
+def _meta_key(chat_id: str) -> str:
+    return f"chatcache:{chat_id}:meta"
+
+
+def _recent_key(chat_id: str) -> str:
+    return f"chatcache:{chat_id}:recent"
+
+
+class _ChatCache:
+    """동기/비동기 채팅 캐시 공통 부분 (직렬화, 통계, 위임)"""
+
+    def __init__(self, store, redis):
+        self.store = store
+        self.redis = redis
+        self.ttl = settings.chat_cache_ttl
+        self.recent_size = settings.chat_cache_recent_messages
+        self.max_message_bytes = settings.chat_cache_max_message_bytes
+        self._add_message = None
+        self._stats = {"hits": 0, "misses": 0, "bypasses": 0}
+
+    def __getattr__(self, name):
+        """캐시하지 않는 메서드는 내부 저장소로 위임"""
+        return getattr(self.store, name)
+
+    # 직렬화
+
+    def _encode_message(self, message: Dict[str, Any]) -> str:
+        """메시지를 캐시 항목으로 인코딩 (크기 한도를 넘으면 빈 문자열)"""
+        encoded = json.dumps({**message, "created_at": message["created_at"].isoformat()})
+        return encoded if len(encoded.encode()) <= self.max_message_bytes else ""
+
+    @staticmethod
+    def _decode_message(raw: str) -> Dict[str, Any]:
+        message = json.loads(raw)
+        message["created_at"] = datetime.fromisoformat(message["created_at"])
+        return message
+
+    def _count(self, field: str):
+        """히트/미스 카운터 증가 (프로세스 단위)"""
+        self._stats[field] += 1
+
+    def _populate_pipeline(self, pipe, chat: Dict[str, Any]):
+        """DB에서 읽은 채팅을 캐시에 쓰는 명령을 파이프라인에 추가"""
+        chat_id = chat["id"]
+        meta = {
+            "id": chat_id,
+            "title": chat["title"],
+            "status": chat["status"],
+            "created_at": chat["created_at"].isoformat(),
+            "updated_at": chat["updated_at"].isoformat(),
+            "message_count": chat["message_count"],
+        }
+        encoded = [self._encode_message(msg) for msg in chat["messages"]]
+
+        pipe.delete(_meta_key(chat_id), _recent_key(chat_id))
+        pipe.hset(_meta_key(chat_id), mapping=meta)
+        pipe.expire(_meta_key(chat_id), self.ttl)
+        # 한도를 넘는 메시지가 있으면 메타데이터만 캐시
+        if encoded and all(encoded):
+            pipe.rpush(_recent_key(chat_id), *encoded)
+            pipe.expire(_recent_key(chat_id), self.ttl)
+
+    @staticmethod
+    def _get_pipeline(pipe, chat_id: str, limit: int):
+        """최신 페이지 조회 명령을 파이프라인에 추가"""
+        pipe.hgetall(_meta_key(chat_id))
+        pipe.exists(_recent_key(chat_id))
+        pipe.lrange(_recent_key(chat_id), -limit, -1)
+
+    def _cached_page(self, meta: Dict[str, str], recent_exists: int, raw_messages) -> Tuple[str, Optional[dict]]:
+        """캐시 조회 결과 해석
+
+        Returns:
+            ("hit", 채팅) / ("bypass", None): 진행 중인 메시지가 있어 DB 조회 필요 /
+            ("miss", None): 캐시에 없음
+        """
+        if not (meta and (recent_exists or int(meta["message_count"]) == 0)):
+            return "miss", None
+        messages = [self._decode_message(raw) for raw in raw_messages]
+        # 진행 중인 메시지가 있으면 최신 내용을 위해 DB 조회
+        if any(msg["status"] in ACTIVE_STATUSES for msg in messages):
+            return "bypass", None
+        return "hit", {
+            "id": meta["id"],
+            "title": meta["title"],
+            "status": meta["status"],
+            "created_at": datetime.fromisoformat(meta["created_at"]),
+            "updated_at": datetime.fromisoformat(meta["updated_at"]),
+            "message_count": int(meta["message_count"]),
+            "messages": messages,
+            "has_more": int(meta["message_count"]) > len(messages)
+        }
+
+    @staticmethod
+    def _page_from_loaded(chat: dict, limit: int) -> dict:
+        """캐시를 채우며 읽은 채팅에서 요청한 페이지 추출"""
+        messages = chat["messages"][-limit:]
+        return {**chat, "messages": messages, "has_more": chat["has_more"] or len(chat["messages"]) > limit}
+
+    def _add_message_args(self, chat_id: str, task_id: str, type: MessageType, content: str,
+                          status: MessageStatus, message) -> Tuple[list, list]:
+        """메시지 추가 스크립트의 KEYS/ARGV"""
+        title = title_from_message(content) if type == MessageType.USER else ""
+        encoded = self._encode_message({
+            "task_id": task_id,
+            "type": type.value,
+            "content": content,
+            "status": status.value,
+            "created_at": message.created_at,
+            "cursor": encode_cursor(message.created_at, message.id)
+        })
+        keys = [_meta_key(chat_id), _recent_key(chat_id)]
+        args = [encoded, self.recent_size, self.ttl, datetime.utcnow().isoformat(), title, DEFAULT_CHAT_TITLE]
+        return keys, args
+
+    @staticmethod
+    def _keys(chat_id: str, meta: bool = True) -> list:
+        return [_recent_key(chat_id)] + ([_meta_key(chat_id)] if meta else [])
+
+    # 통계
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 히트/미스 통계 (현재 프로세스 기준)"""
+        counters = dict(self._stats)
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_ratio"] = counters["hits"] / lookups if lookups else 0.0
+        return counters
+
+
+class CachedChatStore(_ChatCache):
+    """`DatabaseChatStore` 앞단의 read-through 캐시
+
+    채팅 메타데이터는 Redis 해시(`chatcache:{id}:meta`), 최근 메시지 N개는
+    Redis 리스트(`chatcache:{id}:recent`)에 보관한다. 메시지 추가 시에는 캐시를
+    갱신하고, 메시지 상태 변경/아카이브/삭제 시에는 무효화한다.
+    캐시하지 않는 메서드는 내부 저장소로 그대로 위임하며,
+    Redis 오류가 나면 데이터베이스로 바로 조회한다.
+    """
+
+    def __init__(self, store: Optional[DatabaseChatStore] = None, redis: Optional[RedisManager] = None):
+        super().__init__(store or db_chat_store, redis or redis_manager)
+
+    def _populate(self, chat: Dict[str, Any]):
+        """DB에서 읽은 채팅으로 캐시 채우기"""
+        pipe = self.redis.client.pipeline(transaction=True)
+        self._populate_pipeline(pipe, chat)
+        pipe.execute()
+
+    def _invalidate(self, chat_id: str, meta: bool = True):
+        """채팅 캐시 무효화"""
+        try:
+            self.redis.client.delete(*self._keys(chat_id, meta))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to invalidate chat cache {chat_id}: {e}")
+
+    # 조회
+
+    def chat_exists(self, chat_id: str) -> bool:
+        """채팅 존재 여부 확인"""
+        try:
+            if self.redis.client.exists(_meta_key(chat_id)):
+                self._count("hits")
+                return True
+            self._count("misses")
+        except redis.RedisError as e:
+            logger.warning(f"Chat cache unavailable: {e}")
+            return self.store.chat_exists(chat_id)
+
+        return self._load(chat_id) is not None
+
+    def get_chat(self, chat_id: str, limit: Optional[int] = None,
+                 before: Optional[str] = None, after: Optional[str] = None) -> Optional[dict]:
+        """채팅 조회 (최신 페이지는 캐시에서 제공)"""
+        limit = min(limit or settings.chat_history_page_size, settings.chat_history_max_page_size)
+        if before or after or limit > self.recent_size:
+            return self.store.get_chat(chat_id, limit=limit, before=before, after=after)
+
+        try:
+            pipe = self.redis.client.pipeline(transaction=False)
+            self._get_pipeline(pipe, chat_id, limit)
+            with REDIS_CALL_SECONDS.labels("cache_get").time():
+                meta, recent_exists, raw_messages = pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Chat cache unavailable: {e}")
+            return self.store.get_chat(chat_id, limit=limit)
+
+        result, chat = self._cached_page(meta, recent_exists, raw_messages)
+        if result == "hit":
+            self._count("hits")
+            return chat
+        if result == "bypass":
+            self._count("bypasses")
+            return self.store.get_chat(chat_id, limit=limit)
+
+        self._count("misses")
+        chat = self._load(chat_id)
+        return self._page_from_loaded(chat, limit) if chat is not None else None
+
+    def _load(self, chat_id: str) -> Optional[dict]:
+        """DB에서 채팅과 최근 메시지를 읽어 캐시에 저장"""
+        chat = self.store.get_chat(chat_id, limit=self.recent_size)
+        if chat is not None:
+            try:
+                self._populate(chat)
+            except redis.RedisError as e:
+                logger.warning(f"Failed to populate chat cache {chat_id}: {e}")
+        return chat
+
+    # 변경
+
+    def add_message(self, chat_id: str, task_id: str, type: MessageType,
+                    content: str = "", status: MessageStatus = MessageStatus.PENDING):
+        """메시지 추가 후 캐시에 반영"""
+        message = self.store.add_message(chat_id, task_id, type, content=content, status=status)
+
+        keys, args = self._add_message_args(chat_id, task_id, type, content, status, message)
+        try:
+            if self._add_message is None:
+                self._add_message = self.redis.client.register_script(ADD_MESSAGE_SCRIPT)
+            self._add_message(keys=keys, args=args)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to update chat cache {chat_id}: {e}")
+            self._invalidate(chat_id)
+        return message
+
+    def update_message_status(self, task_id: str, status: MessageStatus,
+                              content: Optional[str] = None, error: Optional[str] = None) -> Optional[str]:
+        """메시지 상태 업데이트 후 최근 메시지 캐시 무효화"""
+        chat_id = self.store.update_message_status(task_id, status, content=content, error=error)
+        if chat_id:
+            self._invalidate(chat_id, meta=False)
+        return chat_id
+
+    def claim_message(self, task_id: str) -> Optional[str]:
+        """대기 중인 메시지 선점 후 최근 메시지 캐시 무효화"""
+        chat_id = self.store.claim_message(task_id)
+        if chat_id:
+            self._invalidate(chat_id, meta=False)
+        return chat_id
+
+    def archive_chat(self, chat_id: str):
+        """채팅 아카이브 후 캐시 무효화"""
+        self.store.archive_chat(chat_id)
+        self._invalidate(chat_id)
+
+    def delete_chat(self, chat_id: str):
+        """채팅 삭제 후 캐시 무효화"""
+        self.store.delete_chat(chat_id)
+        self._invalidate(chat_id)
+
+
+class AsyncCachedChatStore(_ChatCache):
+    """`AsyncDatabaseChatStore` 앞단의 read-through 캐시 (API 프로세스용)
+
+    `CachedChatStore`와 같은 키와 형식을 사용하므로 워커가 갱신/무효화한 캐시를 그대로 공유한다.
+    """
+
+    def __init__(self, store: Optional[AsyncDatabaseChatStore] = None,
+                 redis: Optional[AsyncRedisManager] = None):
+        super().__init__(store or async_db_chat_store, redis or async_redis_manager)
+
+    async def _populate(self, chat: Dict[str, Any]):
+        """DB에서 읽은 채팅으로 캐시 채우기"""
+        pipe = self.redis.client.pipeline(transaction=True)
+        self._populate_pipeline(pipe, chat)
+        await pipe.execute()
+
+    async def _invalidate(self, chat_id: str, meta: bool = True):
+        """채팅 캐시 무효화"""
+        try:
+            await self.redis.client.delete(*self._keys(chat_id, meta))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to invalidate chat cache {chat_id}: {e}")
+
+    # 조회
+
+    async def chat_exists(self, chat_id: str) -> bool:
+        """채팅 존재 여부 확인"""
+        try:
+            if await self.redis.client.exists(_meta_key(chat_id)):
+                self._count("hits")
+                return True
+            self._count("misses")
+        except redis.RedisError as e:
+            logger.warning(f"Chat cache unavailable: {e}")
+            return await self.store.chat_exists(chat_id)
+
+        return await self._load(chat_id) is not None
+
+    async def get_chat(self, chat_id: str, limit: Optional[int] = None,
+                       before: Optional[str] = None, after: Optional[str] = None) -> Optional[dict]:
+        """채팅 조회 (최신 페이지는 캐시에서 제공)"""
+        limit = min(limit or settings.chat_history_page_size, settings.chat_history_max_page_size)
+        if before or after or limit > self.recent_size:
+            return await self.store.get_chat(chat_id, limit=limit, before=before, after=after)
+
+        try:
+            pipe = self.redis.client.pipeline(transaction=False)
+            self._get_pipeline(pipe, chat_id, limit)
+            with REDIS_CALL_SECONDS.labels("cache_get").time():
+                meta, recent_exists, raw_messages = await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Chat cache unavailable: {e}")
+            return await self.store.get_chat(chat_id, limit=limit)
+
+        result, chat = self._cached_page(meta, recent_exists, raw_messages)
+        if result == "hit":
+            self._count("hits")
+            return chat
+        if result == "bypass":
+            self._count("bypasses")
+            return await self.store.get_chat(chat_id, limit=limit)
+
+        self._count("misses")
+        chat = await self._load(chat_id)
+        return self._page_from_loaded(chat, limit) if chat is not None else None
+
+    async def _load(self, chat_id: str) -> Optional[dict]:
+        """DB에서 채팅과 최근 메시지를 읽어 캐시에 저장"""
+        chat = await self.store.get_chat(chat_id, limit=self.recent_size)
+        if chat is not None:
+            try:
+                await self._populate(chat)
+            except redis.RedisError as e:
+                logger.warning(f"Failed to populate chat cache {chat_id}: {e}")
+        return chat
+
+    # 변경
+
+    async def add_message(self, chat_id: str, task_id: str, type: MessageType,
+                          content: str = "", status: MessageStatus = MessageStatus.PENDING):
+        """메시지 추가 후 캐시에 반영"""
+        message = await self.store.add_message(chat_id, task_id, type, content=content, status=status)
+
+        keys, args = self._add_message_args(chat_id, task_id, type, content, status, message)
+        try:
+            if self._add_message is None:
+                self._add_message = self.redis.client.register_script(ADD_MESSAGE_SCRIPT)
+            await self._add_message(keys=keys, args=args)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to update chat cache {chat_id}: {e}")
+            await self._invalidate(chat_id)
+        return message
+
+    async def post_message(self, chat_id: str, task_id: str, content: str,
+                           dispatch: Optional[Tuple[str, list, dict, dict]] = None):
+        """사용자/응답 메시지를 한 번에 추가한 뒤 캐시에 반영 (`AsyncDatabaseChatStore.post_message` 참고)"""
+        posted = await self.store.post_message(chat_id, task_id, content, dispatch=dispatch)
+        if posted is None:
+            return None
+
+        try:
+            if self._add_message is None:
+                self._add_message = self.redis.client.register_script(ADD_MESSAGE_SCRIPT)
+            pipe = self.redis.client.pipeline(transaction=False)
+            for message in posted:
+                keys, args = self._add_message_args(chat_id, message.task_id, message.type,
+                                                    message.content, message.status, message)
+                await self._add_message(keys=keys, args=args, client=pipe)
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Failed to update chat cache {chat_id}: {e}")
+            await self._invalidate(chat_id)
+        return posted
+
+    async def update_message_status(self, task_id: str, status: MessageStatus,
+                                    content: Optional[str] = None, error: Optional[str] = None) -> Optional[str]:
+        """메시지 상태 업데이트 후 최근 메시지 캐시 무효화"""
+        chat_id = await self.store.update_message_status(task_id, status, content=content, error=error)
+        if chat_id:
+            await self._invalidate(chat_id, meta=False)
+        return chat_id
+
+    async def archive_chat(self, chat_id: str):
+        """채팅 아카이브 후 캐시 무효화"""
+        await self.store.archive_chat(chat_id)
+        await self._invalidate(chat_id)
+
+    async def delete_chat(self, chat_id: str):
+        """채팅 삭제 후 캐시 무효화"""
+        await self.store.delete_chat(chat_id)
+        await self._invalidate(chat_id)
+
+
+# 캐시가 꺼져 있으면 DB 저장소를 그대로 사용
+chat_store = CachedChatStore() if settings.chat_cache_enabled else db_chat_store
+
+# API 프로세스용 비동기 저장소
+async_chat_store = AsyncCachedChatStore() if settings.chat_cache_enabled else async_db_chat_store
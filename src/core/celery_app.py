@@ -1,7 +1,62 @@
 """Celery 애플리케이션 설정"""
+from typing import List
+
 from celery import Celery
+from kombu import Queue
+from kombu.utils.scheduling import round_robin_cycle
 from src.core.config import settings
 
+
+class WeightedLaneCycle(round_robin_cycle):
+    """레인 큐 가중 순환 (Redis 브로커 `queue_order_strategy`)
+
+    Redis 브로커는 BRPOP에 넘긴 키 중 앞에 있는 리스트에서 먼저 꺼낸다. 키는 우선순위 단계 순서이고
+    같은 단계 안에서는 이 순환이 돌려준 큐 순서를 따른다. smooth weighted round-robin으로 크레딧이 가장
+    큰 큐를 앞에 두고, 메시지를 받은 큐는 전체 가중치만큼 크레딧을 잃는다. 두 레인이 모두 밀려 있으면
+    같은 단계에서 `interactive_lane_weight:background_lane_weight` 비율로 처리되고, 한쪽이 비어 있으면
+    다른 쪽이 처리량을 모두 쓴다. 쉬던 큐가 한꺼번에 몰려 처리되지 않도록 크레딧은 ±전체 가중치로 제한한다.
+    """
+
+    def __init__(self, it=None):
+        super().__init__(it)
+        self.credits = {}
+
+    @staticmethod
+    def weight(queue: str) -> int:
+        if queue == settings.interactive_queue:
+            return max(1, settings.interactive_lane_weight)
+        if queue == settings.background_queue:
+            return max(1, settings.background_lane_weight)
+        return 1
+
+    def consume(self, n):
+        """크레딧이 큰 큐부터 (같으면 선언 순서)"""
+        return sorted(self.items[:n], key=lambda queue: -self.credits.get(queue, 0))
+
+    def rotate(self, last_used):
+        """메시지를 받은 큐의 크레딧 차감, 모든 큐에 가중치만큼 적립"""
+        if last_used not in self.items:
+            return last_used
+        total = sum(self.weight(queue) for queue in self.items)
+        for queue in self.items:
+            credit = self.credits.get(queue, 0) + self.weight(queue) - (total if queue == last_used else 0)
+            self.credits[queue] = max(-total, min(total, credit))
+        return last_used
+
+
+# Redis 브로커의 우선순위 단계별 리스트 키 구분자 (단계 0은 큐 이름 그대로)
+PRIORITY_SEP = ':'
+
+
+def lane_queue_keys() -> List[str]:
+    """레인 큐의 브로커 리스트 키 (`chat.interactive`, `chat.interactive:1`, ...)"""
+    keys = []
+    for queue in (settings.interactive_queue, settings.background_queue):
+        keys.append(queue)
+        keys.extend(f"{queue}{PRIORITY_SEP}{step}" for step in range(1, settings.schedule_priority_levels))
+    return keys
+
+
 # Celery 앱 생성
 app = Celery(
     'redis_streaming',
@@ -22,7 +77,20 @@ app.conf.update(
     task_soft_time_limit=240,  # 4분
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    # 요청 레인별 큐 (두 큐를 모두 처리하는 워커는 레인 가중치 비율로 번갈아 소비)
+    task_queues=(
+        Queue(settings.interactive_queue),
+        Queue(settings.background_queue),
+    ),
+    task_default_queue=settings.interactive_queue,
+    # Redis 브로커는 큐마다 우선순위 단계별 리스트를 두고 0(가장 높음)부터 소비
+    # (이전 기본 큐 `celery`에 남은 태스크는 scripts/drain_legacy_queue.py로 옮김)
+    broker_transport_options={
+        'priority_steps': list(range(settings.schedule_priority_levels)),
+        'sep': PRIORITY_SEP,
+        'queue_order_strategy': f'{__name__}:WeightedLaneCycle',
+    },
 )
 
 # 태스크 자동 탐색
-app.autodiscover_tasks(['src.services'])
\ No newline at end of file
+app.autodiscover_tasks(['src.services'])
@@ -1,7 +1,7 @@
 """애플리케이션 설정"""
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Literal
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -23,19 +23,127 @@ class Settings(BaseSettings):
     
     # Redis 설정
     redis_url: str = "redis://localhost:6379/0"
+    redis_async_max_connections: int = 100  # API 프로세스 비동기 커넥션 풀 크기
+    # 토큰 스트림/채널을 나눠 실을 Redis 노드 (쉼표 구분 URL, 비어 있으면 redis_url 하나)
+    stream_redis_urls: str = ""
+    
+    # 스트리밍 전송 설정
+    stream_transport: Literal["pubsub", "streams"] = "streams"
+    stream_maxlen: int = 10000  # 태스크별 스트림 최대 길이 (근사치)
+    stream_ttl: int = 3600  # 마지막 이벤트 이후 스트림 보존 시간(초)
+    stream_block_ms: int = 5000  # XREAD 블로킹 대기 시간(ms)
+    stream_buffer_size: int = 256  # SSE 연결별 대기 이벤트 수 한도 (느린 클라이언트 보호)
+    # 한도 초과 시 정책: coalesce(대기 중인 token 이벤트 병합) 또는 resync(버퍼를 비우고 스트림 기록에서 이어 받기)
+    stream_overflow_policy: Literal["coalesce", "resync"] = "coalesce"
+    
+    # 토큰 병합(coalescing) 설정: 윈도우 안에 도착한 토큰을 하나의 token 이벤트로 발행
+    stream_profile: Literal["latency", "throughput"] = "latency"
+    stream_latency_window_ms: int = 20
+    stream_latency_max_bytes: int = 64
+    stream_throughput_window_ms: int = 100
+    stream_throughput_max_bytes: int = 2048
     
     # OpenAI 설정
-    openai_api_key: str
+    openai_api_key: Optional[str] = None  # llm_provider가 openai일 때 필요
     openai_model: str = "gpt-4o-mini"
     openai_max_tokens: int = 5120
     openai_temperature: float = 0.7
     
+    # LLM 제공자 설정
+    llm_provider: Literal["openai", "fake", "replay"] = "openai"
+    llm_record_path: Optional[Path] = None  # 지정 시 생성된 스트림을 JSONL로 기록
+    llm_replay_path: Optional[Path] = None  # replay 제공자가 재생할 기록 파일
+    llm_replay_speed: float = 1.0  # 재생 속도 배율
+    
+    # 가짜 LLM 설정 (분포 형식: fixed:V, uniform:A,B, normal:MU,SIGMA, lognormal:M,SIGMA, exp:MEAN)
+    fake_llm_tokens: str = "uniform:50,300"  # 응답 토큰 수
+    fake_llm_ttft_ms: str = "lognormal:300,0.5"  # 첫 토큰 지연(ms)
+    fake_llm_itl_ms: str = "lognormal:20,0.4"  # 토큰 간 지연(ms)
+    fake_llm_seed: int = 42
+    
     # Celery 설정
     celery_broker_url: Optional[str] = None
     celery_result_backend: Optional[str] = None
+    async_worker_concurrency: int = 200  # asyncio 워커 프로세스당 동시 생성 수
+    worker_metrics_port: int = 9100  # 워커 Prometheus 메트릭 포트 (0이면 비활성화)
+    
+    # 태스크 스케줄링 (요청 레인별 큐 + 큐 안에서 채팅별 가중 공정 큐잉)
+    interactive_queue: str = "chat.interactive"  # 사용자가 응답을 기다리는 요청
+    background_queue: str = "chat.background"  # 지연을 허용하는 요청 (일괄 처리 등)
+    default_lane: Literal["interactive", "background"] = "interactive"
+    schedule_priority_levels: int = 10  # 큐당 우선순위 단계 수 (Redis 브로커 priority_steps)
+    schedule_default_weight: float = 1.0  # 채팅 가중치 기본값 (sched:weights 해시로 채팅별 지정)
+    interactive_lane_weight: int = 4  # 두 레인이 모두 밀려 있을 때 워커가 처리하는 비율 (interactive:background)
+    background_lane_weight: int = 1
     
     # 데이터베이스 설정
     database_url: Optional[str] = None
+    chat_history_page_size: int = 50  # 채팅 조회 시 기본 메시지 수 (최신 N개)
+    chat_history_max_page_size: int = 200
+    chat_list_page_size: int = 50  # 채팅 목록 페이지 크기
+    chat_list_max_page_size: int = 200
+    
+    # 메시지 파티셔닝 (messages는 created_at 월별 RANGE 파티션, 스키마는 Alembic으로 관리)
+    message_partitions_ahead: int = 2  # 미리 만들어 둘 다음 달 파티션 수
+    
+    # 콜드 스토리지 (오래 쓰지 않은 채팅의 메시지를 압축해 chat_archives로 옮기고 조회 시 복원)
+    archive_inactive_days: int = 30  # 마지막 활동 후 이 기간(일)이 지난 채팅을 이동 (ARCHIVED 채팅은 바로)
+    archive_batch_size: int = 100  # 아카이브 작업 한 번에 옮길 최대 채팅 수
+    archive_lock_timeout_ms: int = 5000  # 파티션 추가/삭제 DDL의 잠금 대기 한도 (밀리초)
+    
+    # API 비동기 데이터베이스 설정 (SQLAlchemy asyncio + asyncpg, 프로세스당 풀)
+    async_database_url: Optional[str] = None  # 미지정 시 database_url을 asyncpg 드라이버로 변환
+    async_db_pool_size: int = 20
+    async_db_max_overflow: int = 10
+    async_db_pool_timeout: float = 10.0  # 커넥션 대기 한도(초)
+    
+    # 태스크 아웃박스 (메시지와 같은 트랜잭션으로 기록, 발행 미확인 태스크는 API가 재발행)
+    outbox_relay_interval: float = 5.0  # 릴레이 주기(초)
+    outbox_dispatch_grace: float = 10.0  # 이 시간(초)이 지나도 발행이 확인되지 않으면 재발행
+    outbox_relay_batch: int = 100  # 주기당 최대 재발행 수
+    
+    # 채팅 캐시 설정 (메타데이터 + 최근 메시지 Redis read-through 캐시)
+    chat_cache_enabled: bool = True
+    chat_cache_ttl: int = 600  # 초
+    chat_cache_recent_messages: int = 50  # 채팅별로 캐시할 최근 메시지 수
+    chat_cache_max_message_bytes: int = 16384  # 이보다 큰 메시지가 있으면 메타데이터만 캐시
+    
+    # 메시지 쓰기 버퍼 설정 (스트리밍 토큰 write-behind)
+    message_buffer_enabled: bool = True
+    message_buffer_max_chars: int = 512  # 이 크기 이상 쌓이면 flush
+    message_buffer_flush_interval: float = 1.0  # 마지막 flush 이후 경과 시간(초)
+    message_buffer_on_failure: Literal["flush", "discard"] = "flush"  # 실패 시 남은 토큰 처리
+    message_buffer_flush_on_exit: bool = True  # 프로세스 종료 시 남은 토큰 기록
+    
+    # 대화 컨텍스트 설정 (채팅별 토큰 윈도우를 Redis에 유지)
+    context_enabled: bool = True  # 비활성화하면 현재 메시지만 모델에 전달
+    context_token_budget: int = 3000  # 프롬프트 토큰 예산 (openai_max_tokens를 넘지 않음)
+    context_max_messages: int = 50  # 윈도우가 없을 때 DB에서 읽을 최근 메시지 수
+    context_ttl: int = 3600  # 마지막 턴 이후 윈도우 보존 시간(초)
+    
+    # 응답 캐시 설정 (정규화한 메시지 + 모델 + temperature + 컨텍스트가 같으면 저장된 응답 재생)
+    response_cache_enabled: bool = False
+    response_cache_ttl: int = 86400  # 마지막 적중 이후 보존 시간(초)
+    response_cache_max_entries: int = 10000  # 초과 시 가장 오래 사용하지 않은 항목부터 제거
+    response_cache_max_entry_bytes: int = 65536  # 이보다 큰 응답은 저장하지 않음
+    response_cache_replay_speed: float = 0.0  # 원래 타이밍 대비 재생 속도 배율 (0이면 지연 없이 재생)
+    
+    # 동일 생성 합치기 (temperature 0 + Streams 전송일 때 진행 중인 같은 요청의 스트림에 합류)
+    single_flight_enabled: bool = True
+    single_flight_ttl: int = 600  # 리더 등록 유지 시간(초), 생성 시작 후 이 시간이 지나면 리더 워커가 사라진 것으로 보고 팔로워 정리 (task_time_limit보다 길어야 함)
+    
+    # 수락 제어 (대기 + 실행 중인 생성 수를 Redis에서 원자적으로 제한, 초과 시 429)
+    admission_enabled: bool = True
+    admission_max_active: int = 200  # 전체 동시 생성 한도 (대기 + 실행)
+    admission_max_active_per_chat: int = 2  # 채팅당 동시 생성 한도
+    admission_max_queued: int = 100  # 브로커 레인 큐에 쌓인 태스크 한도 (측정값, 0이면 확인 안 함)
+    admission_worker_capacity: int = 16  # 워커 동시 실행 수 (대기 중인 태스크가 없어 측정할 수 없을 때 대기 시간 추정용)
+    admission_lease_ttl: int = 900  # 해제되지 않은 슬롯 만료 시간(초, 워커 비정상 종료 대비)
+    admission_default_generation_seconds: float = 15.0  # 완료 기록이 없을 때 생성 1건 예상 시간(초)
+    
+    # 생성 취소 (취소 요청 또는 SSE 구독자가 없는 생성은 토큰 사이에서 중단)
+    cancel_idle_grace: float = 30.0  # 구독자 없이 이 시간(초)이 지나면 취소 (0이면 비활성화)
+    cancel_check_interval: float = 0.5  # 워커가 취소 요청을 확인하는 최소 간격(초)
     
     # 경로 설정
     templates_dir: Path = BASE_DIR / "templates"
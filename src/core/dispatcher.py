@@ -0,0 +1,269 @@
+"""API 프로세스 단위 Pub/Sub 멀티플렉서"""
+import os
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional, Any, Dict, List, Set, Tuple, AsyncGenerator
+
+from src.core.config import settings
+from src.core.redis import AsyncRedisManager, async_redis_manager, channel_name, stream_key, TERMINAL_EVENT_TYPES
+from src.core.metrics import REDIS_CALL_SECONDS, STREAM_BUFFER_DEPTH, STREAM_BUFFER_OVERFLOWS
+from src.core.wire import WireEvent, merge_token_runs
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_stream_id(entry_id: str) -> Tuple[int, int]:
+    """스트림 엔트리 ID("ms-seq")를 비교 가능한 튜플로 변환"""
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class ListenerBuffer:
+    """SSE 연결 하나에 보낼 이벤트 버퍼 (최대 `maxsize`개)
+
+    수신 태스크는 기다리지 않고 넣기만 하므로 느린 클라이언트가 공유 구독이나 다른 연결을 막지 않는다.
+    클라이언트가 느려 버퍼가 가득 차면 정책에 따라 처리한다.
+
+    - coalesce: 대기 중인 연속 token 이벤트를 하나로 병합 (내용은 그대로, 이벤트 수만 줄어듦)
+    - resync: 버퍼를 비우고 `get()`이 None을 반환 → 소비자가 스트림 기록에서 놓친 구간을 다시 읽음
+    """
+
+    def __init__(self, maxsize: int, policy: str = "coalesce"):
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self._events: deque = deque()
+        self._ready = asyncio.Event()
+        self._dropped = False
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def put(self, event: WireEvent):
+        """이벤트 추가 (대기하지 않음)"""
+        if len(self._events) >= self.maxsize:
+            STREAM_BUFFER_OVERFLOWS.labels(self.policy).inc()
+            if self.policy == "resync":
+                self._events.clear()
+                self._dropped = True
+                self._ready.set()
+                return
+            # token이 아닌 이벤트는 생성당 몇 개뿐이므로 병합 후에는 한도 안으로 돌아옴
+            self._events = deque(merge_token_runs(self._events))
+        self._events.append(event)
+        STREAM_BUFFER_DEPTH.observe(len(self._events))
+        self._ready.set()
+
+    async def get(self) -> Optional[WireEvent]:
+        """다음 이벤트 (resync로 버퍼가 비워졌으면 None)"""
+        while not self._events and not self._dropped:
+            self._ready.clear()
+            await self._ready.wait()
+        if self._dropped:
+            self._dropped = False
+            return None
+        return self._events.popleft()
+
+
+class StreamDispatcher:
+    """프로세스당 스트림 노드별 Pub/Sub 연결 하나로 모든 SSE 연결에 메시지를 분배하는 클래스
+
+    태스크 채널은 첫 구독자가 생길 때 태스크의 스트림 노드에서 구독하고 마지막 구독자가 떠날 때 해제한다.
+    같은 태스크를 보는 여러 클라이언트는 하나의 구독을 공유하며,
+    수신 메시지는 본문을 디코딩하지 않고 헤더만 읽은 `WireEvent`로 각 연결의
+    `ListenerBuffer`에 전달된다. 같은 이벤트 객체를 공유하므로 SSE 프레임 인코딩도 한 번만 일어난다.
+    """
+
+    def __init__(self, redis: Optional[AsyncRedisManager] = None):
+        self.redis = redis or async_redis_manager
+        self._pubsubs: Dict[str, Any] = {}
+        self._reader_tasks: List[asyncio.Task] = []
+        self._running = False
+        self._queues: Dict[str, Set[ListenerBuffer]] = {}
+        self._lock = asyncio.Lock()
+        # 구독이 하나도 없을 때도 연결을 유지하기 위한 제어 채널
+        self._control_channel = f"dispatcher:{os.getpid()}:{id(self)}"
+
+    @property
+    def active_channels(self) -> int:
+        """현재 구독 중인 태스크 채널 수"""
+        return len(self._queues)
+
+    @property
+    def active_listeners(self) -> int:
+        """현재 연결된 리스너 수"""
+        return sum(len(queues) for queues in self._queues.values())
+
+    async def start(self):
+        """스트림 노드별 공유 구독 연결 및 수신 태스크 시작"""
+        if self._reader_tasks:
+            return
+
+        self._running = True
+        for node in self.redis.stream_nodes:
+            pubsub = self.redis.node_client(node).pubsub()
+            await pubsub.subscribe(self._control_channel)
+            self._pubsubs[node] = pubsub
+            self._reader_tasks.append(asyncio.create_task(self._reader(pubsub)))
+        logger.info(f"Stream dispatcher started on {len(self._pubsubs)} node(s)")
+
+    async def stop(self):
+        """수신 태스크 및 구독 연결 종료"""
+        # 수신 대기 타임아웃과 취소가 겹치면 redis-py가 CancelledError를 삼킬 수 있으므로 플래그로도 종료
+        self._running = False
+        for task in self._reader_tasks:
+            task.cancel()
+        for task in self._reader_tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._reader_tasks = []
+
+        for pubsub in self._pubsubs.values():
+            await pubsub.aclose()
+        self._pubsubs.clear()
+
+        self._queues.clear()
+        logger.info("Stream dispatcher stopped")
+
+    async def _reader(self, pubsub):
+        """공유 연결에서 메시지를 읽어 태스크별 큐로 분배"""
+        while self._running:
+            try:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Dispatcher receive error: {e}")
+                await asyncio.sleep(1.0)
+                continue
+
+            if not message or message['type'] != 'message':
+                continue
+
+            channel = message['channel']
+            queues = self._queues.get(channel)
+            if not queues:
+                continue
+
+            try:
+                wire_event = WireEvent.from_payload(message['data'])
+            except ValueError:
+                logger.warning(f"Invalid payload received: {message['data']}")
+                continue
+
+            for queue in queues:
+                queue.put(wire_event)
+
+    @asynccontextmanager
+    async def listen(self, task_id: str, policy: Optional[str] = None) -> AsyncGenerator[ListenerBuffer, None]:
+        """태스크 채널 리스너 등록 (참조 카운팅)
+
+        Args:
+            policy: 버퍼 한도 초과 시 정책 (미지정 시 `stream_overflow_policy`)
+
+        Yields:
+            `WireEvent`를 받는 연결별 버퍼
+        """
+        if not self._reader_tasks:
+            await self.start()
+
+        channel = channel_name(task_id)
+        pubsub = self._pubsubs[await self.redis.stream_node(task_id)]
+        queue = ListenerBuffer(settings.stream_buffer_size, policy or settings.stream_overflow_policy)
+
+        async with self._lock:
+            listeners = self._queues.setdefault(channel, set())
+            listeners.add(queue)
+            if len(listeners) == 1:
+                await pubsub.subscribe(channel)
+
+        try:
+            yield queue
+        finally:
+            async with self._lock:
+                listeners = self._queues.get(channel)
+                if listeners is not None:
+                    listeners.discard(queue)
+                    if not listeners:
+                        del self._queues[channel]
+                        try:
+                            await pubsub.unsubscribe(channel)
+                        except Exception as e:
+                            logger.warning(f"Failed to unsubscribe {channel}: {e}")
+
+    async def subscribe(self, task_id: str) -> AsyncGenerator[WireEvent, None]:
+        """Pub/Sub 전송 방식의 태스크 이벤트 스트림 (다시 읽을 기록이 없으므로 한도 초과 시 항상 병합)"""
+        async with self.listen(task_id, policy="coalesce") as queue:
+            while True:
+                yield await queue.get()
+
+    async def stream(self, task_id: str, last_id: str = "0") -> AsyncGenerator[WireEvent, None]:
+        """Streams 전송 방식의 태스크 이벤트 스트림
+
+        먼저 구독을 등록한 뒤 XRANGE로 `last_id` 이후의 기록을 재생하고,
+        이후에는 공유 구독으로 들어오는 이벤트를 엔트리 ID 기준으로 중복 제거해 전달한다.
+        일정 시간 이벤트가 없으면 XRANGE로 누락분을 다시 확인한다.
+        클라이언트가 느려 버퍼를 비운 경우(resync)에는 놓친 구간을 XRANGE로 읽어 연속된 token 이벤트를
+        하나로 합쳐(스냅샷) 보낸 뒤 이어서 전달한다. 밀린 이벤트는 API 메모리가 아닌 Redis 스트림에 남아 있다.
+
+        Yields:
+            엔트리 ID가 붙은 `WireEvent`
+        """
+        async with self.listen(task_id) as queue:
+            last = _parse_stream_id(last_id)
+
+            async for event in self._catch_up(task_id, last_id):
+                last = _parse_stream_id(event.entry_id)
+                last_id = event.entry_id
+                yield event
+                if event.type in TERMINAL_EVENT_TYPES:
+                    return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.stream_block_ms / 1000)
+                except asyncio.TimeoutError:
+                    event = None
+                    resync = False
+                else:
+                    resync = event is None
+
+                if event is None:
+                    # 재연결 등으로 놓친 이벤트가 있는지 확인 (resync면 놓친 token 이벤트를 병합)
+                    async for event in self._catch_up(task_id, last_id, merge=resync):
+                        last = _parse_stream_id(event.entry_id)
+                        last_id = event.entry_id
+                        yield event
+                        if event.type in TERMINAL_EVENT_TYPES:
+                            return
+                    continue
+
+                if event.entry_id is None or _parse_stream_id(event.entry_id) <= last:
+                    continue
+                last = _parse_stream_id(event.entry_id)
+                last_id = event.entry_id
+                yield event
+                if event.type in TERMINAL_EVENT_TYPES:
+                    return
+
+    async def _catch_up(self, task_id: str, last_id: str, merge: bool = False) -> AsyncGenerator[WireEvent, None]:
+        """XRANGE로 `last_id` 이후 기록된 이벤트 읽기 (`merge`면 연속된 token 이벤트를 하나로 병합)"""
+        start = f"({last_id}" if last_id != "0" else "-"
+        client = await self.redis.stream_client(task_id)
+        with REDIS_CALL_SECONDS.labels("xrange").time():
+            entries = await client.xrange(stream_key(task_id), min=start, max="+")
+        events = []
+        for entry_id, fields in entries:
+            try:
+                events.append(WireEvent.from_fields(entry_id, fields))
+            except KeyError:
+                logger.warning(f"Invalid stream entry {entry_id}: {fields}")
+        for event in merge_token_runs(events) if merge else events:
+            yield event
+
+
+# API 프로세스 공용 디스패처 인스턴스
+stream_dispatcher = StreamDispatcher()
@@ -0,0 +1,226 @@
+"""Prometheus 메트릭
+
+API와 워커가 공통으로 사용하는 메트릭 정의. 메트릭 값은 프로세스 메모리에 기록되며
+API는 `/metrics` 라우트, 워커는 `worker_metrics_port`의 HTTP 서버로 노출한다.
+
+Celery prefork 워커나 여러 uvicorn 워커처럼 프로세스가 여러 개면
+`PROMETHEUS_MULTIPROC_DIR` 환경 변수를 지정해 프로세스별 값을 합산한다.
+"""
+import os
+import time
+import logging
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    CONTENT_TYPE_LATEST,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+logger = logging.getLogger(__name__)
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_GAP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+CALL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+RATE_BUCKETS = (1, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500)
+DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+# 워커: 생성 단계별 지연
+QUEUE_WAIT_SECONDS = Histogram(
+    "chat_queue_wait_seconds", "태스크 등록부터 워커 처리 시작까지 대기 시간 (요청 레인별)",
+    ["lane"], buckets=LATENCY_BUCKETS
+)
+TTFT_SECONDS = Histogram(
+    "llm_time_to_first_token_seconds", "LLM 호출부터 첫 토큰 수신까지 시간",
+    ["provider", "model"], buckets=LATENCY_BUCKETS
+)
+INTER_TOKEN_SECONDS = Histogram(
+    "llm_inter_token_seconds", "연속한 토큰 수신 간격",
+    ["provider", "model"], buckets=TOKEN_GAP_BUCKETS
+)
+TOKENS_PER_SECOND = Histogram(
+    "llm_tokens_per_second", "생성별 토큰 처리 속도 (첫 토큰 이후)",
+    ["provider", "model"], buckets=RATE_BUCKETS
+)
+TOKENS_TOTAL = Counter(
+    "llm_tokens", "생성된 토큰 수",
+    ["provider", "model"]
+)
+GENERATIONS_TOTAL = Counter(
+    "chat_generations", "종료된 생성 수",
+    ["status"]
+)
+GENERATION_CANCELLATIONS = Counter(
+    "chat_generation_cancellations", "중단된 생성 수 (requested: 취소 요청, abandoned: 구독자 없음)",
+    ["reason"]
+)
+ACTIVE_GENERATIONS = Gauge(
+    "chat_active_generations", "워커에서 진행 중인 생성 수",
+    multiprocess_mode="livesum"
+)
+
+# 응답 캐시
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "response_cache_lookups", "응답 캐시 조회 수",
+    ["result"]
+)
+RESPONSE_CACHE_SAVED_TOKENS = Counter(
+    "response_cache_saved_tokens", "캐시 적중으로 생성하지 않은 토큰 수"
+)
+RESPONSE_CACHE_SAVED_SECONDS = Counter(
+    "response_cache_saved_seconds", "캐시 적중으로 절약한 원래 생성 시간(초)"
+)
+
+# 동일 생성 합치기
+SINGLE_FLIGHT_REQUESTS = Counter(
+    "single_flight_requests", "single-flight 등록 수 (follower는 LLM 호출을 생략한 요청)",
+    ["role"]
+)
+
+# 수락 제어
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions", "메시지 전송 수락 결과 (admitted, rejected_global, rejected_queue, rejected_chat)",
+    ["result"]
+)
+
+# 태스크 발행 (아웃박스)
+OUTBOX_DISPATCHES = Counter(
+    "outbox_dispatches", "아웃박스 태스크 발행 수 (direct: 요청 처리 중, relayed: 릴레이 재발행, failed: 발행 실패)",
+    ["result"]
+)
+
+# 콜드 스토리지
+CHAT_ARCHIVE_OPERATIONS = Counter(
+    "chat_archive_operations", "콜드 스토리지 채팅 이동 수 (archived: 압축 보관, rehydrated: 조회 시 복원)",
+    ["operation"]
+)
+CHAT_ARCHIVE_BYTES = Counter(
+    "chat_archive_bytes", "콜드 스토리지로 옮긴 메시지 크기 (raw: 압축 전 JSON, compressed: 저장 크기)",
+    ["kind"]
+)
+
+# API: SSE 전달
+ACTIVE_STREAMS = Gauge(
+    "chat_active_streams", "연결된 SSE 스트림 수",
+    multiprocess_mode="livesum"
+)
+DELIVERY_LAG_SECONDS = Histogram(
+    "chat_stream_delivery_lag_seconds", "이벤트 생성(발행)부터 SSE 전송까지 지연",
+    ["type"], buckets=CALL_BUCKETS + (2.5, 5)
+)
+
+STREAM_BUFFER_DEPTH = Histogram(
+    "chat_stream_buffer_depth", "SSE 연결별 전송 대기 이벤트 수 (이벤트를 넣을 때 측정)",
+    buckets=DEPTH_BUCKETS
+)
+STREAM_BUFFER_OVERFLOWS = Counter(
+    "chat_stream_buffer_overflows", "SSE 연결 버퍼 한도 초과 수 (policy: coalesce/resync)",
+    ["policy"]
+)
+
+# 외부 호출 지연
+DB_CALL_SECONDS = Histogram(
+    "db_call_seconds", "데이터베이스 쿼리 실행 시간",
+    ["statement"], buckets=CALL_BUCKETS
+)
+REDIS_CALL_SECONDS = Histogram(
+    "redis_call_seconds", "Redis 호출 시간",
+    ["operation"], buckets=CALL_BUCKETS
+)
+
+
+class GenerationMetrics:
+    """생성 하나의 TTFT, 토큰 간격, 토큰 처리 속도 기록
+
+    라벨이 붙은 자식 메트릭을 생성 시점에 한 번만 조회해 토큰당 비용을
+    `time.perf_counter()` 호출과 히스토그램 관측 한 번으로 유지한다.
+    """
+
+    def __init__(self, provider: str, model: str, enqueued_at: Optional[float] = None,
+                 lane: str = "interactive"):
+        if enqueued_at:
+            QUEUE_WAIT_SECONDS.labels(lane).observe(max(0.0, time.time() - enqueued_at))
+        self.model = model
+        self.set_provider(provider)
+        self._requested: Optional[float] = None
+        self._first: Optional[float] = None
+        self._last: Optional[float] = None
+        self._count = 0
+        ACTIVE_GENERATIONS.inc()
+
+    def set_provider(self, provider: str):
+        """토큰을 기록할 제공자 라벨 지정 (응답 캐시 적중 시 `cache`)"""
+        self._ttft = TTFT_SECONDS.labels(provider, self.model)
+        self._gap = INTER_TOKEN_SECONDS.labels(provider, self.model)
+        self._rate = TOKENS_PER_SECOND.labels(provider, self.model)
+        self._tokens = TOKENS_TOTAL.labels(provider, self.model)
+
+    def requested(self):
+        """LLM 호출 시작 시점 기록"""
+        self._requested = time.perf_counter()
+
+    def token(self):
+        """토큰 수신 기록"""
+        now = time.perf_counter()
+        if self._last is None:
+            self._first = now
+            if self._requested is not None:
+                self._ttft.observe(now - self._requested)
+        else:
+            self._gap.observe(now - self._last)
+        self._last = now
+        self._count += 1
+
+    def finish(self, status: str):
+        """생성 종료 기록 (status: completed/failed/cancelled)"""
+        ACTIVE_GENERATIONS.dec()
+        GENERATIONS_TOTAL.labels(status).inc()
+        if self._count:
+            self._tokens.inc(self._count)
+        if self._count > 1 and self._last > self._first:
+            self._rate.observe((self._count - 1) / (self._last - self._first))
+
+
+def observe_delivery(event_type: str, timestamp: Optional[float]):
+    """SSE로 전송하는 이벤트의 발행→전달 지연 기록"""
+    if timestamp:
+        DELIVERY_LAG_SECONDS.labels(event_type or "unknown").observe(max(0.0, time.time() - timestamp))
+
+
+def _registry() -> CollectorRegistry:
+    """노출할 레지스트리 (멀티프로세스 모드면 프로세스별 값을 합산)"""
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus 텍스트 형식으로 메트릭 출력
+
+    Returns:
+        (본문, Content-Type)
+    """
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int):
+    """워커용 메트릭 HTTP 서버 시작 (백그라운드 스레드)"""
+    start_http_server(port, registry=_registry())
+    logger.info(f"Metrics server listening on :{port}")
+
+
+def mark_process_dead(pid: int):
+    """종료된 워커 프로세스의 gauge 값 정리 (멀티프로세스 모드)"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
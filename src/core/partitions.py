@@ -0,0 +1,161 @@
+"""messages 테이블 월별 파티션 관리
+
+messages는 created_at 기준 RANGE 파티션 테이블이다(`migrations/versions/0002_partition_messages.py`).
+파티션은 한 달 단위 `messages_YYYYMM`이고, 범위에 맞는 파티션이 없는 행은 `messages_default`에 들어간다
+(파티션 생성이 늦어지거나 오래된 파티션을 삭제한 뒤 콜드 스토리지에서 복원한 메시지).
+
+인덱스도 파티션마다 따로 있으므로 INSERT는 이번 달 파티션의 작은 인덱스만 갱신하고,
+채팅 이력 조회는 created_at 범위가 맞는 파티션만 읽는다. 오래된 파티션은 콜드 스토리지 작업이
+메시지를 옮겨 비면 삭제한다.
+
+파티션 추가/삭제는 API 시작(`init_db`)과 아카이브 작업(`scripts/archive_chats.py`)에서 실행한다.
+새 파티션은 빈 테이블을 만들어 기본 파티션의 해당 범위 행을 옮긴 뒤 ATTACH하므로 부모 테이블에
+SHARE UPDATE EXCLUSIVE 잠금만 잡아 읽기/쓰기를 막지 않는다. 잠금 대기는 `archive_lock_timeout_ms`로 제한한다.
+"""
+import re
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "messages"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+_MONTH_PARTITION = re.compile(rf"^{PARENT_TABLE}_(\d{{4}})(\d{{2}})$")
+
+
+def month_start(value: datetime) -> datetime:
+    """해당 달의 시작 시각"""
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    """월별 파티션 이름 (`messages_YYYYMM`)"""
+    return f"{PARENT_TABLE}_{month:%Y%m}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    """파티션 이름의 달 (월별 파티션이 아니면 None)"""
+    match = _MONTH_PARTITION.match(name)
+    return datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def _bounds(month: datetime) -> str:
+    return f"FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    """messages가 파티션 테이블인지 여부 (PostgreSQL이 아니거나 마이그레이션 전이면 False)"""
+    if conn.dialect.name != "postgresql":
+        return False
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": PARENT_TABLE}
+    ).scalar()
+    return relkind == "p"
+
+
+def list_partitions(conn: Connection) -> List[str]:
+    """messages의 파티션 이름 목록"""
+    return list(conn.execute(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+             "WHERE i.inhparent = to_regclass(:name) ORDER BY c.relname"),
+        {"name": PARENT_TABLE}
+    ).scalars())
+
+
+def _set_lock_timeout(conn: Connection):
+    conn.execute(text(f"SET LOCAL lock_timeout = {int(settings.archive_lock_timeout_ms)}"))
+
+
+def _attach_partition(conn: Connection, month: datetime):
+    """빈 테이블을 만들고 기본 파티션의 해당 범위 행을 옮긴 뒤 파티션으로 연결"""
+    name = partition_name(month)
+    start, end = month, add_months(month, 1)
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(
+        text(f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end "
+             f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"),
+        {"start": start, "end": end}
+    )
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES {_bounds(month)}"))
+
+
+def ensure_partitions(conn: Connection, now: Optional[datetime] = None, ahead: Optional[int] = None) -> List[str]:
+    """이번 달부터 `ahead`개월 뒤까지 빠진 파티션 생성 (호출자가 커밋)
+
+    파티션마다 세이브포인트를 두고, 잠금 대기 한도를 넘긴 파티션은 건너뛴다(다음 실행에서 다시 시도).
+
+    Returns:
+        생성한 파티션 이름
+    """
+    if not is_partitioned(conn):
+        return []
+    ahead = settings.message_partitions_ahead if ahead is None else ahead
+    existing = set(list_partitions(conn))
+    current = month_start(now or datetime.utcnow())
+
+    created = []
+    _set_lock_timeout(conn)
+    for offset in range(ahead + 1):
+        month = add_months(current, offset)
+        if partition_name(month) in existing:
+            continue
+        try:
+            with conn.begin_nested():
+                _attach_partition(conn, month)
+        except DBAPIError as e:
+            logger.warning(f"Failed to create partition {partition_name(month)}: {e}")
+            continue
+        created.append(partition_name(month))
+    if created:
+        logger.info(f"Created message partitions: {', '.join(created)}")
+    return created
+
+
+def drop_empty_partitions(conn: Connection, now: Optional[datetime] = None) -> List[str]:
+    """이번 달 이전의 빈 월별 파티션 분리 후 삭제 (호출자가 커밋)
+
+    비어 있는지 확인한 뒤 분리하기 전에 복원된 메시지가 들어올 수 있으므로, 분리(파티션 ACCESS EXCLUSIVE 잠금)
+    후 같은 세이브포인트에서 다시 확인하고 행이 있으면 분리를 되돌린다.
+
+    Returns:
+        삭제한 파티션 이름
+    """
+    if not is_partitioned(conn):
+        return []
+    current = month_start(now or datetime.utcnow())
+
+    dropped = []
+    _set_lock_timeout(conn)
+    for name in list_partitions(conn):
+        month = partition_month(name)
+        if month is None or month >= current:
+            continue
+        if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})")).scalar():
+            continue
+        try:
+            with conn.begin_nested() as savepoint:
+                conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+                if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})")).scalar():
+                    savepoint.rollback()
+                    continue
+                conn.execute(text(f"DROP TABLE {name}"))
+        except DBAPIError as e:
+            logger.warning(f"Failed to drop partition {name}: {e}")
+            continue
+        dropped.append(name)
+    if dropped:
+        logger.info(f"Dropped empty message partitions: {', '.join(dropped)}")
+    return dropped
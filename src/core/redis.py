@@ -1,12 +1,42 @@
-"""Redis 연결 및 Pub/Sub 관리"""
+"""Redis 연결 및 Pub/Sub 관리
+
+태스크 이벤트(스트림 키, Pub/Sub 채널)는 `stream_redis_urls`의 노드에 태스크 ID로 샤딩하고
+(`src/core/sharding.py`), 그 밖의 상태는 `redis_url`의 기본 클라이언트를 사용한다.
+이벤트는 `publish_event`로만 발행하고(와이어 포맷), API는 `src/core/dispatcher.py`가 노드마다 구독한다.
+"""
 import redis
-import json
+import redis.asyncio as aioredis
 import logging
-from typing import Optional, Generator, Dict, Any
+from typing import Optional, Generator, AsyncGenerator, Dict, Any, Tuple, List
 from src.core.config import settings
+from src.core.metrics import REDIS_CALL_SECONDS
+from src.core.wire import WireEvent, wire_payload, pubsub_payload
+from src.core.sharding import HashRing, PinCache, PIN_SCRIPT, pin_key, pin_ttl, stream_node_urls
 
 logger = logging.getLogger(__name__)
 
+# XADD + EXPIRE + PUBLISH를 한 번의 왕복으로 처리하는 스크립트
+# 스트림 엔트리는 타입(t), 타임스탬프(ts), compact JSON(d) 필드로 저장하고
+# Pub/Sub으로는 엔트리 ID를 앞에 붙인 "<ID>\t<타입>\t<ts>\t<JSON>" 페이로드를 발행한다
+STREAM_PUBLISH_SCRIPT = """
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[2], '*', 't', ARGV[5], 'ts', ARGV[6], 'd', ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+local payload = id .. '\\t' .. ARGV[5] .. '\\t' .. ARGV[6] .. '\\t' .. ARGV[1]
+return {id, redis.call('PUBLISH', ARGV[4], payload)}
+"""
+
+TERMINAL_EVENT_TYPES = ('complete', 'error', 'cancelled')
+
+
+def channel_name(task_id: str) -> str:
+    """태스크의 Pub/Sub 채널명"""
+    return f"chat:{task_id}"
+
+
+def stream_key(task_id: str) -> str:
+    """태스크의 Redis Stream 키"""
+    return f"stream:chat:{task_id}"
+
 
 class RedisManager:
     """Redis 연결 및 Pub/Sub 관리 클래스"""
@@ -14,7 +44,12 @@ class RedisManager:
     def __init__(self, url: Optional[str] = None):
         self.url = url or settings.redis_url
         self._client = None
-        self._pubsub = None
+        self._stream_publish = None
+        self.stream_nodes: List[str] = stream_node_urls(self.url)
+        self._ring = HashRing(self.stream_nodes)
+        self._pins = PinCache()
+        self._pin = None
+        self._node_clients: Dict[str, redis.Redis] = {}
         
     @property
     def client(self) -> redis.Redis:
@@ -22,52 +57,108 @@ class RedisManager:
         if self._client is None:
             self._client = redis.from_url(self.url, decode_responses=True)
         return self._client
+    
+    def node_client(self, node: str) -> redis.Redis:
+        """스트림 노드 클라이언트 (기본 URL과 같으면 기본 클라이언트)"""
+        if node == self.url:
+            return self.client
+        client = self._node_clients.get(node)
+        if client is None:
+            client = self._node_clients[node] = redis.from_url(node, decode_responses=True)
+        return client
+    
+    def stream_node(self, task_id: str) -> str:
+        """태스크 이벤트를 싣는 노드 (노드가 여러 개면 처음 조회할 때 고정)"""
+        if len(self.stream_nodes) == 1:
+            return self.stream_nodes[0]
+        node = self._pins.get(task_id)
+        if node is None:
+            node = self._ring.node_for(task_id)
+            try:
+                if self._pin is None:
+                    self._pin = self.client.register_script(PIN_SCRIPT)
+                node = self._pin(keys=[pin_key(task_id)], args=[node, pin_ttl()])
+            except redis.RedisError as e:
+                # 고정하지 못해도 링 구성이 같은 프로세스끼리는 같은 노드를 고름
+                logger.warning(f"Failed to pin stream node of task {task_id}: {e}")
+                return node
+            self._pins.put(task_id, node)
+        return node
+    
+    def stream_client(self, task_id: str) -> redis.Redis:
+        """태스크 스트림/채널이 있는 노드의 클라이언트"""
+        return self.node_client(self.stream_node(task_id))
+        
+    def publish_event(self, task_id: str, message: Dict[str, Any]) -> int:
+        """태스크 이벤트 발행
         
-    def publish(self, channel: str, message: Dict[str, Any]) -> int:
-        """채널에 메시지 발행
+        메시지는 compact 와이어 포맷(`src/core/wire.py`)으로 인코딩한다.
+        `stream_transport`가 "streams"이면 태스크 스트림에 XADD한 뒤
+        엔트리 ID를 포함해 Pub/Sub 채널에도 발행한다.
         
         Args:
-            channel: 발행할 채널명
+            task_id: 태스크 ID
             message: 발행할 메시지 (dict)
             
         Returns:
             구독자 수
         """
+        channel = channel_name(task_id)
+        fields = wire_payload(message)
+        
         try:
-            return self.client.publish(channel, json.dumps(message))
+            client = self.stream_client(task_id)
+            if settings.stream_transport != "streams":
+                with REDIS_CALL_SECONDS.labels("publish").time():
+                    return client.publish(channel, pubsub_payload(fields))
+            
+            if self._stream_publish is None:
+                self._stream_publish = self.client.register_script(STREAM_PUBLISH_SCRIPT)
+            with REDIS_CALL_SECONDS.labels("publish_event").time():
+                _, receivers = self._stream_publish(
+                    keys=[stream_key(task_id)],
+                    args=[fields["d"], settings.stream_maxlen, settings.stream_ttl, channel,
+                          fields["t"], fields["ts"]],
+                    client=client
+                )
+            return receivers
         except Exception as e:
-            logger.error(f"Failed to publish message: {e}")
+            logger.error(f"Failed to publish stream event: {e}")
             raise
     
-    def subscribe(self, channel: str) -> Generator[Dict[str, Any], None, None]:
-        """채널 구독 및 메시지 스트림
+    def read_stream(self, task_id: str, last_id: str = "0") -> Generator[Tuple[str, Dict[str, Any]], None, None]:
+        """태스크 스트림을 `last_id` 이후부터 읽기
+        
+        이미 기록된 이벤트를 즉시 재생한 뒤 새 이벤트를 블로킹으로 기다린다.
         
         Args:
-            channel: 구독할 채널명
+            task_id: 태스크 ID
+            last_id: 마지막으로 받은 엔트리 ID ("0"이면 처음부터)
             
         Yields:
-            수신된 메시지 (dict)
+            (엔트리 ID, 메시지 dict)
         """
-        pubsub = self.client.pubsub()
+        key = stream_key(task_id)
+        client = self.stream_client(task_id)
         
-        try:
-            pubsub.subscribe(channel)
+        while True:
+            response = client.xread({key: last_id}, block=settings.stream_block_ms, count=100)
+            if not response:
+                continue
             
-            for message in pubsub.listen():
-                if message['type'] == 'message':
+            for _, entries in response:
+                for entry_id, fields in entries:
+                    last_id = entry_id
                     try:
-                        data = json.loads(message['data'])
-                        yield data
-                    except json.JSONDecodeError:
-                        logger.warning(f"Invalid JSON received: {message['data']}")
-                        yield {'error': 'Invalid JSON', 'raw': message['data']}
-                        
-        except Exception as e:
-            logger.error(f"Subscription error: {e}")
-            raise
-        finally:
-            pubsub.unsubscribe(channel)
-            pubsub.close()
+                        data = WireEvent.from_fields(entry_id, fields).to_dict()
+                    except (KeyError, ValueError):
+                        logger.warning(f"Invalid stream entry {entry_id}: {fields}")
+                        data = {'error': 'Invalid JSON', 'raw': fields}
+                    yield entry_id, data
+    
+    def stream_exists(self, task_id: str) -> bool:
+        """태스크 스트림 존재 여부"""
+        return bool(self.stream_client(task_id).exists(stream_key(task_id)))
     
     def health_check(self) -> bool:
         """Redis 연결 상태 확인"""
@@ -81,7 +172,156 @@ class RedisManager:
         if self._client:
             self._client.close()
             self._client = None
+        for client in self._node_clients.values():
+            client.close()
+        self._node_clients.clear()
+
+
+class AsyncRedisManager:
+    """redis.asyncio 기반 Redis 연결 및 Pub/Sub 관리 클래스
+    
+    API 프로세스에서 사용하며, 블로킹 호출 없이 이벤트 루프에서 동작하므로
+    많은 SSE 연결이 서로를 막지 않는다. 인스턴스 하나가 커넥션 풀을 공유한다.
+    """
+    
+    def __init__(self, url: Optional[str] = None, max_connections: Optional[int] = None):
+        self.url = url or settings.redis_url
+        self.max_connections = max_connections or settings.redis_async_max_connections
+        self._client = None
+        self._stream_publish = None
+        self.stream_nodes: List[str] = stream_node_urls(self.url)
+        self._ring = HashRing(self.stream_nodes)
+        self._pins = PinCache()
+        self._pin = None
+        self._node_clients: Dict[str, aioredis.Redis] = {}
+        
+    def _connect(self, url: str) -> aioredis.Redis:
+        # 풀이 가득 차면 오류 대신 반환될 때까지 대기
+        pool = aioredis.BlockingConnectionPool.from_url(
+            url,
+            decode_responses=True,
+            max_connections=self.max_connections
+        )
+        return aioredis.Redis(connection_pool=pool)
+    
+    @property
+    def client(self) -> aioredis.Redis:
+        """비동기 Redis 클라이언트 (lazy loading)"""
+        if self._client is None:
+            self._client = self._connect(self.url)
+        return self._client
+    
+    def node_client(self, node: str) -> aioredis.Redis:
+        """스트림 노드 클라이언트 (기본 URL과 같으면 기본 클라이언트)"""
+        if node == self.url:
+            return self.client
+        client = self._node_clients.get(node)
+        if client is None:
+            client = self._node_clients[node] = self._connect(node)
+        return client
+    
+    async def stream_node(self, task_id: str) -> str:
+        """태스크 이벤트를 싣는 노드 (`RedisManager.stream_node`와 동일)"""
+        if len(self.stream_nodes) == 1:
+            return self.stream_nodes[0]
+        node = self._pins.get(task_id)
+        if node is None:
+            node = self._ring.node_for(task_id)
+            try:
+                if self._pin is None:
+                    self._pin = self.client.register_script(PIN_SCRIPT)
+                node = await self._pin(keys=[pin_key(task_id)], args=[node, pin_ttl()])
+            except redis.RedisError as e:
+                logger.warning(f"Failed to pin stream node of task {task_id}: {e}")
+                return node
+            self._pins.put(task_id, node)
+        return node
+    
+    async def stream_client(self, task_id: str) -> aioredis.Redis:
+        """태스크 스트림/채널이 있는 노드의 클라이언트"""
+        return self.node_client(await self.stream_node(task_id))
+    
+    async def publish_event(self, task_id: str, message: Dict[str, Any]) -> int:
+        """태스크 이벤트 발행 (`RedisManager.publish_event`와 동일한 형식)"""
+        channel = channel_name(task_id)
+        fields = wire_payload(message)
+        
+        try:
+            client = await self.stream_client(task_id)
+            if settings.stream_transport != "streams":
+                with REDIS_CALL_SECONDS.labels("publish").time():
+                    return await client.publish(channel, pubsub_payload(fields))
+            
+            if self._stream_publish is None:
+                self._stream_publish = self.client.register_script(STREAM_PUBLISH_SCRIPT)
+            with REDIS_CALL_SECONDS.labels("publish_event").time():
+                _, receivers = await self._stream_publish(
+                    keys=[stream_key(task_id)],
+                    args=[fields["d"], settings.stream_maxlen, settings.stream_ttl, channel,
+                          fields["t"], fields["ts"]],
+                    client=client
+                )
+            return receivers
+        except Exception as e:
+            logger.error(f"Failed to publish stream event: {e}")
+            raise
+    
+    async def read_stream(self, task_id: str, last_id: str = "0") -> AsyncGenerator[Tuple[str, Dict[str, Any]], None]:
+        """태스크 스트림을 `last_id` 이후부터 읽기
+        
+        Yields:
+            (엔트리 ID, 메시지 dict)
+        """
+        key = stream_key(task_id)
+        client = await self.stream_client(task_id)
+        
+        while True:
+            response = await client.xread({key: last_id}, block=settings.stream_block_ms, count=100)
+            if not response:
+                continue
+            
+            for _, entries in response:
+                for entry_id, fields in entries:
+                    last_id = entry_id
+                    try:
+                        data = WireEvent.from_fields(entry_id, fields).to_dict()
+                    except (KeyError, ValueError):
+                        logger.warning(f"Invalid stream entry {entry_id}: {fields}")
+                        data = {'error': 'Invalid JSON', 'raw': fields}
+                    yield entry_id, data
+    
+    async def stream_exists(self, task_id: str) -> bool:
+        """태스크 스트림 존재 여부"""
+        client = await self.stream_client(task_id)
+        with REDIS_CALL_SECONDS.labels("exists").time():
+            return bool(await client.exists(stream_key(task_id)))
+    
+    async def health_check(self) -> bool:
+        """Redis 연결 상태 확인 (기본 노드와 모든 스트림 노드)"""
+        try:
+            if not await self.client.ping():
+                return False
+            for node in self.stream_nodes:
+                if not await self.node_client(node).ping():
+                    return False
+            return True
+        except Exception:
+            return False
+    
+    async def close(self):
+        """연결 종료"""
+        for client in self._node_clients.values():
+            await client.aclose(close_connection_pool=True)
+        self._node_clients.clear()
+        if self._client:
+            await self._client.aclose(close_connection_pool=True)
+            self._client = None
+            self._stream_publish = None
+            self._pin = None
 
 
 # 전역 Redis 매니저 인스턴스
-redis_manager = RedisManager()
\ No newline at end of file
+redis_manager = RedisManager()
+
+# API 프로세스용 비동기 Redis 매니저 인스턴스
+async_redis_manager = AsyncRedisManager()
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""스트림 채널 샤딩
+
+토큰 이벤트(스트림 키 + Pub/Sub 채널)는 태스크 ID의 일관된 해싱으로 여러 Redis 노드에 나눠 싣는다.
+Celery 브로커/결과 백엔드와 캐시 등 나머지 상태는 `redis_url` 하나에 그대로 둔다.
+
+노드를 추가하면 해시 링에서 일부 태스크의 노드가 바뀐다. 진행 중인 태스크의 발행자(워커)와
+구독자(API)가 서로 다른 노드를 보지 않도록, 노드가 여러 개일 때는 태스크를 처음 조회한 쪽이
+`streamshard:{task_id}`에 노드를 고정(SET NX)하고 이후에는 모두 고정된 노드를 사용한다.
+고정 값은 바뀌지 않으므로 프로세스 안에서 캐시한다. 따라서 노드 추가는 새 태스크부터 반영되고,
+노드를 제거할 때는 해당 노드에 고정된 스트림이 만료될 때까지(`stream_ttl`) 남겨 두어야 한다.
+"""
+import bisect
+import hashlib
+from collections import OrderedDict
+from typing import List, Optional
+
+from src.core.config import settings
+
+# 노드당 가상 노드 수 (많을수록 태스크가 고르게 분산)
+DEFAULT_REPLICAS = 160
+
+# 프로세스별 고정 노드 캐시 크기
+PIN_CACHE_SIZE = 10000
+
+# 고정 값 보존 시간 여유(초). 스트림은 마지막 이벤트 후 `stream_ttl` 동안 남으므로 생성 시간만큼 더 둔다
+PIN_TTL_MARGIN = 600
+
+# 고정된 노드가 있으면 반환, 없으면 제안한 노드로 고정
+# KEYS: 고정 키 / ARGV: 제안 노드, TTL
+PIN_SCRIPT = """
+local pinned = redis.call('GET', KEYS[1])
+if pinned then
+    return pinned
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return ARGV[1]
+"""
+
+
+def pin_key(task_id: str) -> str:
+    """태스크 스트림 노드 고정 키"""
+    return f"streamshard:{task_id}"
+
+
+def pin_ttl() -> int:
+    return settings.stream_ttl + PIN_TTL_MARGIN
+
+
+def stream_node_urls(default: str) -> List[str]:
+    """스트림 노드 URL 목록 (`stream_redis_urls`가 비어 있으면 `default` 하나)"""
+    urls = [url.strip() for url in settings.stream_redis_urls.split(",") if url.strip()]
+    return list(dict.fromkeys(urls)) or [default]
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """가상 노드를 둔 일관된 해시 링
+
+    노드를 추가하면 새 노드가 차지하는 구간의 키(약 1/N)만 옮겨 가고 나머지 키의 노드는 그대로다.
+    """
+
+    def __init__(self, nodes: List[str], replicas: int = DEFAULT_REPLICAS):
+        if not nodes:
+            raise ValueError("HashRing requires at least one node")
+        self.nodes = list(nodes)
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(replicas))
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key: str) -> str:
+        """키가 속한 노드"""
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class PinCache:
+    """태스크별 고정 노드 LRU 캐시"""
+
+    def __init__(self, maxsize: int = PIN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._nodes: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, task_id: str) -> Optional[str]:
+        node = self._nodes.get(task_id)
+        if node is not None:
+            self._nodes.move_to_end(task_id)
+        return node
+
+    def put(self, task_id: str, node: str):
+        self._nodes[task_id] = node
+        self._nodes.move_to_end(task_id)
+        if len(self._nodes) > self.maxsize:
+            self._nodes.popitem(last=False)
@@ -0,0 +1,160 @@
+"""스트림 이벤트 와이어 포맷
+
+워커 → Redis → API 구간의 이벤트는 짧은 키 JSON(compact)으로 한 번만 인코딩한다.
+null 필드는 생략하고 타임스탬프는 밀리초 정수로 보낸다.
+
+    {"type": "token", "content": "안녕", "token_start": 3, "token_count": 5,
+     "progress": null, "error": null, "timestamp": 1712345678.123456}
+    → {"t":"token","c":"안녕","s":3,"n":5,"ts":1712345678123}
+
+API는 타입과 타임스탬프를 JSON 밖의 헤더로 받아 본문을 디코딩하지 않고 라우팅하며,
+compact 형식을 요청한 클라이언트에는 인코딩된 본문을 그대로 SSE 프레임으로 전달한다.
+기존 형식(full)은 이벤트당 한 번만 디코딩/확장해 같은 이벤트를 받는 모든 연결이 공유한다.
+"""
+import json
+from typing import Optional, Dict, Any, Literal, Iterable, List
+
+StreamFormat = Literal["full", "compact"]
+
+# 긴 필드명 → 짧은 키 (timestamp는 ts 밀리초로 별도 처리)
+SHORT_KEYS = {
+    "type": "t",
+    "content": "c",
+    "token_start": "s",
+    "token_count": "n",
+    "progress": "p",
+    "error": "e",
+}
+LONG_KEYS = {short: long for long, short in SHORT_KEYS.items()}
+
+# full 형식에서 항상 포함되는 필드 (`StreamMessage`와 동일)
+FULL_FIELDS = ("type", "content", "token_start", "token_count", "progress", "error", "timestamp")
+
+# Pub/Sub 페이로드 헤더 구분자: "<엔트리 ID>\t<타입>\t<ts>\t<compact JSON>"
+HEADER_SEPARATOR = "\t"
+
+SSE_SEPARATOR = "\r\n"
+
+
+def encode_compact(message: Dict[str, Any]) -> str:
+    """이벤트 dict를 짧은 키 JSON으로 인코딩"""
+    compact = {}
+    for key, value in message.items():
+        if value is None:
+            continue
+        if key == "timestamp":
+            compact["ts"] = int(value * 1000)
+        else:
+            compact[SHORT_KEYS.get(key, key)] = value
+    return json.dumps(compact, ensure_ascii=False, separators=(",", ":"))
+
+
+def expand(compact: Dict[str, Any]) -> Dict[str, Any]:
+    """짧은 키 dict를 full 형식 dict로 확장"""
+    message = dict.fromkeys(FULL_FIELDS)
+    for key, value in compact.items():
+        if key == "ts":
+            message["timestamp"] = value / 1000
+        else:
+            message[LONG_KEYS.get(key, key)] = value
+    return message
+
+
+class WireEvent:
+    """인코딩된 스트림 이벤트
+
+    `frame()`이 만든 SSE 프레임은 형식별로 캐시되므로 같은 이벤트를
+    여러 연결로 보낼 때 인코딩은 한 번만 일어난다.
+    """
+
+    __slots__ = ("entry_id", "type", "timestamp", "data", "_frames")
+
+    def __init__(self, entry_id: Optional[str], type: str, timestamp: Optional[float], data: str):
+        self.entry_id = entry_id
+        self.type = type
+        self.timestamp = timestamp
+        self.data = data
+        self._frames: Dict[str, bytes] = {}
+
+    @classmethod
+    def from_message(cls, message: Dict[str, Any], entry_id: Optional[str] = None) -> "WireEvent":
+        """이벤트 dict로 생성"""
+        return cls(entry_id, message.get("type", ""), message.get("timestamp"), encode_compact(message))
+
+    @classmethod
+    def from_payload(cls, payload: str) -> "WireEvent":
+        """Pub/Sub 페이로드("<ID>\\t<타입>\\t<ts>\\t<JSON>")로 생성"""
+        entry_id, type, ts, data = payload.split(HEADER_SEPARATOR, 3)
+        return cls(entry_id or None, type, int(ts) / 1000 if ts else None, data)
+
+    @classmethod
+    def from_fields(cls, entry_id: str, fields: Dict[str, str]) -> "WireEvent":
+        """스트림 엔트리 필드({"t", "ts", "d"})로 생성"""
+        ts = fields.get("ts")
+        return cls(entry_id, fields.get("t", ""), int(ts) / 1000 if ts else None, fields["d"])
+
+    @classmethod
+    def merge(cls, events: List["WireEvent"]) -> "WireEvent":
+        """연속된 token 이벤트를 하나로 병합
+
+        내용은 이어 붙이고 토큰 범위는 첫 이벤트의 시작부터 마지막 이벤트의 끝까지로 한다.
+        엔트리 ID는 마지막 이벤트(이어 받을 위치), 타임스탬프는 첫 이벤트(전달 지연 측정용)를 따른다.
+        """
+        if len(events) == 1:
+            return events[0]
+        first, last = json.loads(events[0].data), json.loads(events[-1].data)
+        merged = dict(last)
+        merged["c"] = "".join(json.loads(event.data).get("c", "") for event in events)
+        for key in ("s", "ts"):
+            if key in first:
+                merged[key] = first[key]
+        return cls(events[-1].entry_id, events[-1].type, events[0].timestamp,
+                   json.dumps(merged, ensure_ascii=False, separators=(",", ":")))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """full 형식 dict로 디코딩"""
+        return expand(json.loads(self.data))
+
+    def frame(self, format: StreamFormat = "full") -> bytes:
+        """SSE 프레임 (`id:`/`event:`/`data:` 필드) 인코딩"""
+        frame = self._frames.get(format)
+        if frame is None:
+            data = self.data if format == "compact" else json.dumps(self.to_dict())
+            lines = [f"id: {self.entry_id}"] if self.entry_id else []
+            lines.append("event: message")
+            lines.append(f"data: {data}")
+            frame = (SSE_SEPARATOR.join(lines) + SSE_SEPARATOR * 2).encode("utf-8")
+            self._frames[format] = frame
+        return frame
+
+
+def wire_payload(message: Dict[str, Any]) -> Dict[str, str]:
+    """발행용 필드 (타입, 밀리초 타임스탬프, compact JSON)"""
+    timestamp = message.get("timestamp")
+    return {
+        "t": message.get("type", ""),
+        "ts": str(int(timestamp * 1000)) if timestamp else "",
+        "d": encode_compact(message),
+    }
+
+
+def pubsub_payload(fields: Dict[str, str], entry_id: str = "") -> str:
+    """Pub/Sub으로 보낼 헤더 + 본문 문자열"""
+    return HEADER_SEPARATOR.join((entry_id, fields["t"], fields["ts"], fields["d"]))
+
+
+def merge_token_runs(events: Iterable[WireEvent]) -> List[WireEvent]:
+    """이벤트 목록에서 연속된 token 이벤트를 하나씩으로 병합 (다른 이벤트의 순서는 유지)"""
+    merged: List[WireEvent] = []
+    run: List[WireEvent] = []
+    for event in events:
+        if event.type == "token":
+            run.append(event)
+            continue
+        if run:
+            merged.append(WireEvent.merge(run))
+            run = []
+        merged.append(event)
+    if run:
+        merged.append(WireEvent.merge(run))
+    return merged
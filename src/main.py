@@ -8,6 +8,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from src.core.config import settings
 from src.api.routes import router
 from src.core.database import init_db
+from src.core.async_database import dispose_async_engine
+from src.core.redis import async_redis_manager
+from src.core.dispatcher import stream_dispatcher
+from src.services.outbox import outbox_relay
 
 # 로깅 설정
 logging.basicConfig(
@@ -31,9 +35,22 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
     
+    # 프로세스 공용 Pub/Sub 디스패처 시작
+    try:
+        await stream_dispatcher.start()
+    except Exception as e:
+        logger.error(f"Failed to start stream dispatcher: {e}")
+    
+    # 발행이 확인되지 않은 태스크 재발행
+    await outbox_relay.start()
+    
     yield
     # 종료 시
     logger.info("Shutting down...")
+    await outbox_relay.stop()
+    await stream_dispatcher.stop()
+    await async_redis_manager.close()
+    await dispose_async_engine()
 
 
 # FastAPI 앱 생성
@@ -7,6 +7,12 @@ from datetime import datetime
 class ChatRequest(BaseModel):
     """채팅 요청 모델"""
     message: str = Field(..., min_length=1, max_length=1000, description="사용자 메시지")
+    stream_profile: Optional[Literal["latency", "throughput"]] = Field(
+        None, description="토큰 병합 프로파일 (미지정 시 서버 설정 사용)"
+    )
+    priority: Optional[Literal["interactive", "background"]] = Field(
+        None, description="요청 레인 (미지정 시 서버 설정 사용, background는 별도 큐에서 낮은 우선순위로 처리)"
+    )
 
 
 class ChatResponse(BaseModel):
@@ -25,11 +31,12 @@ class TaskStatus(BaseModel):
 
 class StreamMessage(BaseModel):
     """스트림 메시지 모델"""
-    type: Literal["start", "progress", "token", "complete", "error"]
+    type: Literal["start", "progress", "token", "complete", "error", "cancelled"]
     content: Optional[str] = None
-    token_count: Optional[int] = None
+    token_start: Optional[int] = None  # 병합된 token 이벤트의 첫 토큰 번호
+    token_count: Optional[int] = None  # 누적 토큰 수 (병합된 이벤트의 마지막 토큰 번호)
     progress: Optional[int] = None
-    error: Optional[str] = None
+    error: Optional[str] = None  # error: 오류 내용, cancelled: 취소 사유
     timestamp: float = Field(default_factory=lambda: datetime.now().timestamp())
     
     class Config:
@@ -41,6 +48,13 @@ class StreamMessage(BaseModel):
                     "token_count": 1,
                     "timestamp": 1234567890.123
                 },
+                {
+                    "type": "token",
+                    "content": "Hello, world",
+                    "token_start": 1,
+                    "token_count": 3,
+                    "timestamp": 1234567890.123
+                },
                 {
                     "type": "progress",
                     "progress": 50,
@@ -1,4 +1,20 @@
 """Business logic and services"""
 from .tasks import process_chat_message
+from .buffer import MessageWriteBuffer, message_buffer
+from .llm import LLMProvider, get_provider
+from .context import ContextBuilder, context_builder
+from .response_cache import ResponseCache, response_cache
+from .single_flight import SingleFlight, single_flight
+from .outbox import OutboxRelay, outbox_relay
+from .admission import AdmissionController, admission
+from .scheduling import FairScheduler, fair_scheduler
+from .cancellation import CancellationRegistry, cancellation
+from .archive import ChatArchiver, chat_archiver
 
-__all__ = ["process_chat_message"]
\ No newline at end of file
+__all__ = [
+    "process_chat_message", "MessageWriteBuffer", "message_buffer", "LLMProvider", "get_provider",
+    "ContextBuilder", "context_builder", "ResponseCache", "response_cache",
+    "SingleFlight", "single_flight", "OutboxRelay", "outbox_relay",
+    "AdmissionController", "admission", "FairScheduler", "fair_scheduler",
+    "CancellationRegistry", "cancellation", "ChatArchiver", "chat_archiver",
+]
\ No newline at end of file
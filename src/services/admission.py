@@ -0,0 +1,237 @@
+"""메시지 전송 수락 제어 (admission control)
+
+요청이 몰려도 Celery 큐가 끝없이 늘어나지 않도록, 수락된 생성(대기 + 실행 중)을
+Redis 정렬 집합에 임대(lease)로 기록하고 전체/채팅별 한도를 넘으면 429로 거절한다.
+브로커에 실제로 쌓인 태스크 수(레인 큐와 우선순위 단계 리스트의 LLEN 합)도 확인해
+`admission_max_queued` 이상이면 거절한다.
+
+워커는 생성이 끝나면 임대를 해제하면서 생성 시간 이동 평균을 갱신하고, API는 이 평균과
+측정한 대기 건수로 대기 시간과 `Retry-After`를 계산한다. 실행 중인 생성 수는 임대 수에서
+대기 건수를 뺀 값이고, 대기 중인 태스크가 있으면 워커가 모두 바쁜 것이므로 이 값을 워커 용량으로 쓴다
+(대기 건수가 0이면 용량을 잴 수 없으므로 `admission_worker_capacity` 설정값을 쓴다).
+브로커가 Redis가 아니거나 조회에 실패하면 대기 건수는 임대 수와 설정 용량으로 추정하고 `queue_measured`를 False로 표시한다.
+
+    admission:active          → 수락된 태스크 ID (점수: 임대 만료 시각)
+    admission:chat:{chat_id}  → 채팅별 수락된 태스크 ID (점수: 임대 만료 시각)
+    admission:stats           → avg_seconds (생성 1건 시간 이동 평균)
+
+임대 만료는 워커가 해제하지 못하고 중단된 경우에만 쓰인다.
+"""
+import math
+import time
+import logging
+from typing import Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from src.core.config import settings
+from src.core.celery_app import lane_queue_keys
+from src.core.redis import RedisManager, redis_manager, AsyncRedisManager, async_redis_manager
+from src.core.metrics import ADMISSION_DECISIONS
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_KEY = "admission:active"
+STATS_KEY = "admission:stats"
+
+# 생성 시간 이동 평균 가중치
+DURATION_ALPHA = 0.2
+
+# 만료된 임대 정리 후 한도 확인 및 등록
+# KEYS: 전체 집합, 채팅 집합, 통계
+# ARGV: 태스크 ID, 현재 시각, 임대 만료 시각, 전체 한도, 채팅 한도, 임대 TTL,
+#       브로커 대기 건수(-1이면 측정 못 함), 대기 건수 한도(0이면 확인 안 함)
+# 반환: {결과(1 수락, 0 전체 초과, -1 채팅 초과, -2 대기 건수 초과), 수락된 생성 수, 평균 생성 시간}
+ADMIT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[2])
+local avg = redis.call('HGET', KEYS[3], 'avg_seconds') or ''
+local active = redis.call('ZCARD', KEYS[1])
+if active >= tonumber(ARGV[4]) then
+    return {0, active, avg}
+end
+if redis.call('ZCARD', KEYS[2]) >= tonumber(ARGV[5]) then
+    return {-1, active, avg}
+end
+local max_queued = tonumber(ARGV[8])
+if max_queued > 0 and tonumber(ARGV[7]) >= max_queued then
+    return {-2, active, avg}
+end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+redis.call('ZADD', KEYS[2], ARGV[3], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[6])
+return {1, active + 1, avg}
+"""
+
+# 임대 해제 및 생성 시간 이동 평균 갱신
+# KEYS: 전체 집합, 채팅 집합, 통계 / ARGV: 태스크 ID, 생성 시간(초, 0이면 기록 안 함), 가중치
+RELEASE_SCRIPT = """
+local removed = redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+local duration = tonumber(ARGV[2])
+if removed == 1 and duration > 0 then
+    local avg = tonumber(redis.call('HGET', KEYS[3], 'avg_seconds') or ARGV[2])
+    redis.call('HSET', KEYS[3], 'avg_seconds', tostring(avg + tonumber(ARGV[3]) * (duration - avg)))
+end
+return removed
+"""
+
+
+def _chat_key(chat_id: str) -> str:
+    return f"admission:chat:{chat_id}"
+
+
+class AdmissionDecision:
+    """수락 결과
+
+    Attributes:
+        admitted: 수락 여부
+        reason: 거절 사유 ("global": 전체 한도, "chat": 채팅 한도, "queue": 브로커 대기 건수 한도)
+        active: 수락된 생성 수 (대기 + 실행)
+        retry_after: 다시 시도하기까지 권장 대기 시간(초)
+    """
+
+    def __init__(self, admitted: bool, reason: Optional[str] = None, active: int = 0, retry_after: int = 0):
+        self.admitted = admitted
+        self.reason = reason
+        self.active = active
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """전체/채팅별 동시 생성 수 제한과 대기 시간 추정"""
+
+    def __init__(self, redis: Optional[RedisManager] = None, async_redis: Optional[AsyncRedisManager] = None):
+        self.redis = redis or redis_manager
+        self.async_redis = async_redis or async_redis_manager
+        self.max_active = settings.admission_max_active
+        self.max_active_per_chat = settings.admission_max_active_per_chat
+        self.max_queued = settings.admission_max_queued
+        self.capacity = max(1, settings.admission_worker_capacity)
+        self.lease_ttl = settings.admission_lease_ttl
+        self._admit = None
+        self._release = None
+        self._broker: Optional[AsyncRedisManager] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.admission_enabled
+
+    def _average(self, raw) -> float:
+        return float(raw) if raw else settings.admission_default_generation_seconds
+
+    def _broker_client(self) -> Optional[aioredis.Redis]:
+        """Celery 브로커 클라이언트 (수락 제어와 같은 Redis면 공용 클라이언트, Redis 브로커가 아니면 None)"""
+        url = settings.celery_broker_url
+        if url == self.async_redis.url:
+            return self.async_redis.client
+        if not url.startswith(("redis://", "rediss://", "unix://")):
+            return None
+        if self._broker is None:
+            self._broker = AsyncRedisManager(url)
+        return self._broker.client
+
+    async def queue_depth(self) -> Optional[int]:
+        """브로커 레인 큐에 쌓인 태스크 수 (측정할 수 없으면 None)"""
+        client = self._broker_client()
+        if client is None:
+            return None
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key in lane_queue_keys():
+                pipe.llen(key)
+            return sum(await pipe.execute())
+        except redis.RedisError as e:
+            logger.warning(f"Failed to measure broker queue depth: {e}")
+            return None
+
+    def _split(self, active: int, queued: Optional[int]) -> Tuple[int, int, int]:
+        """임대 수를 (실행, 대기, 워커 용량)으로 나눔 (대기 건수를 측정하지 못했으면 설정 용량으로 추정)"""
+        if queued is None:
+            return min(active, self.capacity), max(0, active - self.capacity), self.capacity
+        running = max(0, active - queued)
+        capacity = running if queued > 0 and running > 0 else self.capacity
+        return running, queued, capacity
+
+    @staticmethod
+    def estimated_wait(queued: int, capacity: int, average: float) -> float:
+        """새 요청이 실행되기까지 예상 대기 시간(초, 앞선 대기 건이 워커 용량만큼씩 처리된다고 가정)"""
+        return queued * average / max(1, capacity)
+
+    async def admit(self, task_id: str, chat_id: str) -> AdmissionDecision:
+        """생성 슬롯 확보 (Redis 오류 시에는 요청을 막지 않음)"""
+        if not self.enabled:
+            return AdmissionDecision(True)
+
+        queued = await self.queue_depth() if self.max_queued > 0 else None
+        now = time.time()
+        try:
+            if self._admit is None:
+                self._admit = self.async_redis.client.register_script(ADMIT_SCRIPT)
+            result, active, average = await self._admit(
+                keys=[ACTIVE_KEY, _chat_key(chat_id), STATS_KEY],
+                args=[task_id, now, now + self.lease_ttl, self.max_active, self.max_active_per_chat,
+                      self.lease_ttl, -1 if queued is None else queued, self.max_queued]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Admission check failed, admitting task {task_id}: {e}")
+            return AdmissionDecision(True)
+
+        average = self._average(average)
+        _, _, capacity = self._split(active, queued)
+        if result == 1:
+            ADMISSION_DECISIONS.labels("admitted").inc()
+            return AdmissionDecision(True, active=active)
+
+        if result == 0:
+            # 한도 아래로 내려가려면 (초과분 + 1)건이 끝나야 함
+            reason, wait = "global", self.estimated_wait(active - self.max_active + 1, capacity, average)
+        elif result == -2:
+            # 대기 건수가 한도 아래로 내려갈 때까지
+            reason, wait = "queue", self.estimated_wait(queued - self.max_queued + 1, capacity, average)
+        else:
+            # 같은 채팅의 진행 중인 생성이 끝날 때까지
+            reason, wait = "chat", average
+        ADMISSION_DECISIONS.labels(f"rejected_{reason}").inc()
+        return AdmissionDecision(False, reason, active, max(1, math.ceil(wait)))
+
+    def release(self, task_id: str, chat_id: str, duration: Optional[float] = None):
+        """생성 종료 시 슬롯 반환 (`duration`이 있으면 평균 생성 시간에 반영)"""
+        if not self.enabled:
+            return
+        try:
+            if self._release is None:
+                self._release = self.redis.client.register_script(RELEASE_SCRIPT)
+            self._release(keys=[ACTIVE_KEY, _chat_key(chat_id), STATS_KEY],
+                          args=[task_id, duration or 0, DURATION_ALPHA])
+        except redis.RedisError as e:
+            logger.warning(f"Failed to release admission slot of task {task_id}: {e}")
+
+    async def status(self) -> dict:
+        """현재 대기열 상태와 새 요청의 예상 대기 시간
+
+        `queued`는 브로커에서 측정한 대기 건수이고, 측정하지 못했으면 추정값이다(`queue_measured`).
+        """
+        pipe = self.async_redis.client.pipeline(transaction=False)
+        pipe.zcount(ACTIVE_KEY, f"({time.time()}", "+inf")
+        pipe.hget(STATS_KEY, "avg_seconds")
+        active, average = await pipe.execute()
+        queued = await self.queue_depth()
+        average = self._average(average)
+        running, waiting, capacity = self._split(active, queued)
+        return {
+            "active": active,
+            "running": running,
+            "queued": waiting,
+            "queue_measured": queued is not None,
+            "capacity": capacity,
+            "max_active": self.max_active,
+            "max_queued": self.max_queued,
+            "avg_generation_seconds": round(average, 2),
+            "estimated_wait_seconds": round(self.estimated_wait(waiting, capacity, average), 1),
+        }
+
+
+# 프로세스 공용 수락 제어 인스턴스
+admission = AdmissionController()
@@ -0,0 +1,144 @@
+"""채팅 콜드 스토리지 아카이브 작업
+
+오래 쓰지 않은 채팅(마지막 활동 후 `archive_inactive_days`일 경과)과 아카이브된 채팅(`ChatStatus.ARCHIVED`)의
+메시지를 압축해 `chat_archives` 한 행으로 옮기고 messages에서 삭제한다. 채팅 행(제목, 메시지 수, 미리보기)은
+그대로 두므로 목록은 바뀌지 않고, 채팅을 조회하면 저장소가 메시지를 복원한다(`cold_since`가 있는 채팅).
+복원한 채팅은 `rehydrated_at`부터 다시 `archive_inactive_days`일이 지나야 옮긴다.
+
+messages에는 최근 채팅만 남아 파티션 인덱스가 작게 유지되고, 메시지가 모두 옮겨진 오래된 파티션은
+삭제된다. 작업은 `scripts/archive_chats.py`로 실행한다(cron 또는 `--interval` 반복).
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import select, delete, exists, and_, or_, tuple_
+
+from src.core.config import settings
+from src.core.database import (
+    SessionLocal,
+    engine,
+    Chat,
+    Message,
+    ChatArchive,
+    ChatStatus,
+    ACTIVE_MESSAGE_STATUSES,
+    pack_messages,
+    _storage_statement,
+)
+from src.core.partitions import ensure_partitions, drop_empty_partitions
+from src.core.metrics import CHAT_ARCHIVE_OPERATIONS, CHAT_ARCHIVE_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+def _eligible(cutoff: datetime):
+    """콜드 스토리지로 옮길 채팅 조건"""
+    return and_(
+        Chat.cold_since.is_(None),
+        Chat.message_count > 0,
+        or_(Chat.rehydrated_at.is_(None), Chat.rehydrated_at < cutoff),
+        or_(Chat.status == ChatStatus.ARCHIVED, Chat.updated_at < cutoff),
+    )
+
+
+class ChatArchiver:
+    """채팅 메시지 콜드 스토리지 이동 및 메시지 파티션 관리"""
+
+    def __init__(self):
+        self.inactive_days = settings.archive_inactive_days
+        self.batch_size = settings.archive_batch_size
+
+    def _cutoff(self, now: datetime) -> datetime:
+        return now - timedelta(days=self.inactive_days)
+
+    def archive_chat(self, chat_id, now: Optional[datetime] = None) -> bool:
+        """채팅 하나의 메시지를 콜드 스토리지로 이동 (채팅당 트랜잭션 하나)
+
+        채팅 행을 잠그고(`SKIP LOCKED`) 조건을 다시 확인한다. 메시지 추가는 채팅 행을 갱신하므로
+        이동이 끝날 때까지 기다렸다가 messages에 기록되고, 다음 조회 때 복원된 메시지와 합쳐진다.
+        진행 중인 메시지가 있는 채팅은 옮기지 않는다.
+
+        Returns:
+            이동 여부
+        """
+        now = now or datetime.utcnow()
+        db = SessionLocal()
+        try:
+            chat = db.scalar(
+                select(Chat).where(Chat.id == chat_id, _eligible(self._cutoff(now)))
+                .with_for_update(skip_locked=True)
+            )
+            if chat is None:
+                return False
+            messages = list(db.scalars(
+                select(Message).where(Message.chat_id == chat.id).order_by(Message.created_at, Message.id)
+            ))
+            if not messages or any(message.status in ACTIVE_MESSAGE_STATUSES for message in messages):
+                return False
+
+            payload, raw_bytes = pack_messages(messages)
+            db.add(ChatArchive(chat_id=chat.id, payload=payload, message_count=len(messages),
+                               task_ids=[message.task_id for message in messages],
+                               raw_bytes=raw_bytes, created_at=now))
+            db.execute(delete(Message).where(Message.chat_id == chat.id))
+            db.execute(_storage_statement(chat.id, now))
+            db.commit()
+        finally:
+            db.close()
+
+        CHAT_ARCHIVE_OPERATIONS.labels("archived").inc()
+        CHAT_ARCHIVE_BYTES.labels("raw").inc(raw_bytes)
+        CHAT_ARCHIVE_BYTES.labels("compressed").inc(len(payload))
+        return True
+
+    def archive_once(self, now: Optional[datetime] = None,
+                     after: Optional[Tuple[datetime, object]] = None) -> Tuple[int, Optional[tuple]]:
+        """오래된 채팅부터 `archive_batch_size`개까지 이동
+
+        Args:
+            after: 이전 배치의 마지막 (updated_at, id). 이동해도 updated_at은 바뀌지 않으므로
+                이전 배치에서 옮기지 못한 채팅(잠김, 진행 중인 메시지)을 다시 조회하지 않는다.
+
+        Returns:
+            (이동한 채팅 수, 다음 배치 커서 - 대상이 더 없으면 None)
+        """
+        now = now or datetime.utcnow()
+        active = exists().where(Message.chat_id == Chat.id, Message.status.in_(ACTIVE_MESSAGE_STATUSES))
+        query = select(Chat.updated_at, Chat.id).where(_eligible(self._cutoff(now)), ~active)
+        if after is not None:
+            query = query.where(tuple_(Chat.updated_at, Chat.id) > tuple_(*after))
+        db = SessionLocal()
+        try:
+            rows = db.execute(query.order_by(Chat.updated_at, Chat.id).limit(self.batch_size)).all()
+        finally:
+            db.close()
+        moved = sum(self.archive_chat(chat_id, now) for _, chat_id in rows)
+        cursor = tuple(rows[-1]) if len(rows) == self.batch_size else None
+        return moved, cursor
+
+    def maintain_partitions(self, now: Optional[datetime] = None) -> dict:
+        """다음 달 파티션을 미리 만들고 빈 과거 파티션 삭제"""
+        with engine.begin() as conn:
+            created = ensure_partitions(conn, now)
+            dropped = drop_empty_partitions(conn, now)
+        return {"created": created, "dropped": dropped}
+
+    def run_once(self, now: Optional[datetime] = None) -> dict:
+        """대상 채팅을 모두 이동한 뒤 파티션 정리
+
+        Returns:
+            {"archived": 이동한 채팅 수, "partitions": {"created": [...], "dropped": [...]}}
+        """
+        now = now or datetime.utcnow()
+        archived, cursor = self.archive_once(now)
+        while cursor is not None:
+            moved, cursor = self.archive_once(now, after=cursor)
+            archived += moved
+        if archived:
+            logger.info(f"Archived {archived} chat(s) to cold storage")
+        return {"archived": archived, "partitions": self.maintain_partitions(now)}
+
+
+# 프로세스 공용 아카이브 작업
+chat_archiver = ChatArchiver()
@@ -0,0 +1,325 @@
+"""asyncio 기반 스트리밍 워커
+
+Celery prefork 워커는 프로세스 하나가 LLM 스트림 하나를 맡아 대부분의 시간을
+네트워크 대기로 보낸다. 이 워커는 같은 Celery 큐에서 `chat.process_message`
+태스크를 가져와 하나의 이벤트 루프에서 LLM 제공자의 비동기 스트림으로 여러 생성을
+동시에 처리한다. 동시 처리 수는 `async_worker_concurrency`로 제한한다.
+"""
+import queue
+import socket
+import signal
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, List
+
+from src.core.celery_app import app
+from src.core.config import settings
+from src.core.redis import async_redis_manager
+from src.core.database import MessageStatus
+from src.core.cache import chat_store
+from src.core.metrics import GenerationMetrics, start_metrics_server
+from src.models.schemas import StreamMessage
+from src.services.buffer import message_buffer
+from src.services.coalescer import TokenCoalescer, TokenFrame
+from src.services.llm import LLMProvider
+from src.services.context import context_builder
+from src.services.response_cache import response_cache, CACHE_PROVIDER
+from src.services.single_flight import single_flight
+from src.services.admission import admission
+from src.services.scheduling import fair_scheduler
+from src.services.cancellation import cancellation, CancellationWatch
+from src.services.tasks import process_chat_message, build_chat_messages, llm_provider
+
+logger = logging.getLogger(__name__)
+
+# 소비 스레드가 브로커 대기를 멈추고 완료된 태스크 메시지를 확인(ack)하는 주기(초)
+ACK_POLL_INTERVAL = 0.2
+
+
+async def publish_token_frame_async(task_id: str, frame: TokenFrame) -> int:
+    """병합된 토큰 프레임을 token 이벤트로 발행"""
+    token_msg = StreamMessage(
+        type="token",
+        content=frame.content,
+        token_start=frame.token_start,
+        token_count=frame.token_count
+    )
+    return await async_redis_manager.publish_event(task_id, token_msg.model_dump())
+
+
+async def process_chat_message_async(provider: LLMProvider, user_message: str, task_id: str, chat_id: str,
+                                     stream_profile: Optional[str] = None,
+                                     enqueued_at: Optional[float] = None,
+                                     flight_key: Optional[str] = None,
+                                     schedule: Optional[dict] = None) -> Dict[str, Any]:
+    """`process_chat_message`의 비동기 버전
+
+    DB 호출은 스레드 풀에서 실행해 이벤트 루프를 막지 않는다.
+    """
+    started = time.time()
+    # 상태 업데이트: PENDING → PROCESSING (아웃박스 재발행으로 중복 전달된 태스크는 건너뜀)
+    if not await asyncio.to_thread(chat_store.claim_message, task_id):
+        logger.warning(f"Task {task_id} is no longer pending, skipping duplicate delivery")
+        return {'status': 'skipped', 'task_id': task_id}
+
+    await asyncio.to_thread(fair_scheduler.started, chat_id, schedule)
+    await asyncio.to_thread(single_flight.started, flight_key, task_id)
+    logger.info(f"Starting async task {task_id} for chat {chat_id}")
+    metrics = GenerationMetrics(provider.name, settings.openai_model, enqueued_at,
+                                (schedule or {}).get("lane", settings.default_lane))
+    try:
+        result = await _generate(provider, metrics, user_message, task_id, chat_id, stream_profile, flight_key)
+    except BaseException:
+        metrics.finish("failed")
+        raise
+    metrics.finish(result['status'])
+    # 중단된 생성은 평균 생성 시간에 반영하지 않음
+    duration = time.time() - started
+    await asyncio.to_thread(admission.release, task_id, chat_id,
+                            duration if result['status'] == 'completed' else None)
+    return {**result, 'task_id': task_id, 'duration': duration}
+
+
+async def _finish_cancelled(task_id: str, flight_key: Optional[str], watch: CancellationWatch,
+                            content: str, token_count: int) -> Dict[str, Any]:
+    """`tasks.finish_cancelled`의 비동기 버전"""
+    message_buffer.discard(task_id)
+    await asyncio.to_thread(
+        chat_store.update_message_status, task_id, MessageStatus.CANCELLED, content, watch.message
+    )
+    await asyncio.to_thread(single_flight.cancel, flight_key, task_id, content, watch.message)
+    cancelled_msg = StreamMessage(type="cancelled", content=content, token_count=token_count, error=watch.message)
+    await async_redis_manager.publish_event(task_id, cancelled_msg.model_dump())
+    return {'status': 'cancelled', 'reason': watch.reason, 'response': content, 'token_count': token_count}
+
+
+async def _generate(provider: LLMProvider, metrics: GenerationMetrics, user_message: str,
+                    task_id: str, chat_id: str, stream_profile: Optional[str],
+                    flight_key: Optional[str] = None) -> Dict[str, Any]:
+    """LLM 스트리밍, 토큰 발행 및 완료 처리 (취소되면 받은 데까지 저장하고 중단)"""
+    watch = cancellation.watch(task_id)
+    if await watch.acheck():
+        return await _finish_cancelled(task_id, flight_key, watch, "", 0)
+
+    start_msg = StreamMessage(type="start", content="처리를 시작합니다...")
+    watch.observe(await async_redis_manager.publish_event(task_id, start_msg.model_dump()))
+
+    progress_msg = StreamMessage(
+        type="progress",
+        content="LLM 모델에 요청을 보내는 중...",
+        progress=10
+    )
+    watch.observe(await async_redis_manager.publish_event(task_id, progress_msg.model_dump()))
+
+    await asyncio.to_thread(chat_store.update_message_status, task_id, MessageStatus.STREAMING)
+
+    messages = await asyncio.to_thread(build_chat_messages, user_message, chat_id, task_id)
+    cached = await asyncio.to_thread(
+        response_cache.lookup, messages, settings.openai_model, settings.openai_temperature
+    )
+    metrics.requested()
+    if cached.hit:
+        metrics.set_provider(CACHE_PROVIDER)
+        stream = cached.response.areplay()
+    else:
+        stream = cached.arecord(provider.astream(
+            messages,
+            model=settings.openai_model,
+            temperature=settings.openai_temperature,
+            max_tokens=settings.openai_max_tokens
+        ))
+
+    parts: List[str] = []
+    token_count = 0
+    coalescer = TokenCoalescer.for_profile(stream_profile)
+
+    async for content in stream:
+        metrics.token()
+        parts.append(content)
+        token_count += 1
+
+        frame = coalescer.add(content, token_count)
+        if frame:
+            watch.observe(await publish_token_frame_async(task_id, frame))
+
+        if message_buffer.stage(task_id, content):
+            await asyncio.to_thread(message_buffer.flush, task_id)
+
+        if await watch.acheck():
+            break
+
+    if watch.reason:
+        await stream.aclose()
+        return await _finish_cancelled(task_id, flight_key, watch, "".join(parts), token_count)
+
+    frame = coalescer.flush()
+    if frame:
+        await publish_token_frame_async(task_id, frame)
+
+    full_response = "".join(parts)
+    message_buffer.discard(task_id)
+    await asyncio.to_thread(
+        chat_store.update_message_status, task_id, MessageStatus.COMPLETED, full_response
+    )
+    await asyncio.to_thread(context_builder.append_turn, chat_id, user_message, full_response)
+    await asyncio.to_thread(cached.save)
+    await asyncio.to_thread(single_flight.complete, flight_key, task_id, full_response)
+
+    complete_msg = StreamMessage(type="complete", content=full_response, token_count=token_count)
+    await async_redis_manager.publish_event(task_id, complete_msg.model_dump())
+
+    return {
+        'status': 'completed',
+        'response': full_response,
+        'token_count': token_count
+    }
+
+
+class AsyncChatWorker:
+    """Celery 큐를 소비해 채팅 태스크를 이벤트 루프에서 동시 처리하는 워커
+
+    kombu 소비는 전용 스레드에서 수행하고, 받은 태스크는 이벤트 루프로 넘긴다.
+    동시 처리 슬롯이 모두 차면 소비 스레드가 대기하므로 큐에서 더 가져가지 않는다.
+    
+    메시지는 Celery의 acks_late처럼 태스크가 끝난 뒤 확인(ack)한다. kombu 연결은 스레드 안전하지 않으므로
+    끝난 메시지를 큐에 넣어 두면 소비 스레드가 브로커 대기 사이에 확인한다. 처리 중에 프로세스가 죽으면
+    브로커가 메시지를 다시 전달하고, 이미 시작된 태스크는 `claim_message`가 건너뛴다.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, queues: Optional[List[str]] = None):
+        self.concurrency = concurrency or settings.async_worker_concurrency
+        # 소비할 큐 이름 (None이면 설정된 모든 레인 큐)
+        self.queues = queues
+        self.provider = llm_provider
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._stopping = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 태스크가 끝나 확인을 기다리는 메시지 (이벤트 루프 → 소비 스레드)
+        self._finished: "queue.SimpleQueue" = queue.SimpleQueue()
+        # 받았지만 아직 확인하지 않은 메시지 수 (소비 스레드에서만 변경)
+        self._unacked = 0
+
+    @property
+    def active(self) -> int:
+        """현재 처리 중인 태스크 수"""
+        return len(self._inflight)
+
+    def _consume(self):
+        """kombu 소비 루프 (전용 스레드)"""
+        queues = [queue for name, queue in app.amqp.queues.consume_from.items()
+                  if not self.queues or name in self.queues]
+        with app.connection_for_read() as connection:
+            # 확인하지 않은 메시지도 prefetch 한도에 포함되므로 동시 처리 수만큼 받음
+            with connection.Consumer(queues, callbacks=[self._on_message],
+                                     accept=['json'], prefetch_count=self.concurrency):
+                logger.info(f"Consuming from {[q.name for q in queues]} "
+                            f"with concurrency {self.concurrency}")
+                while not self._stopping.is_set():
+                    try:
+                        connection.drain_events(timeout=ACK_POLL_INTERVAL)
+                    except socket.timeout:
+                        pass
+                    except Exception as e:
+                        logger.error(f"Consumer error: {e}")
+                        time.sleep(1.0)
+                    self._ack_finished()
+            
+            # 새 메시지는 받지 않고 진행 중인 태스크가 끝날 때까지 확인만 처리
+            while self._unacked:
+                self._ack_finished(timeout=1.0)
+
+    def _ack_finished(self, timeout: Optional[float] = None):
+        """끝난 태스크의 메시지 확인 (소비 스레드, `timeout`이 있으면 하나가 올 때까지 대기)"""
+        while True:
+            try:
+                message = self._finished.get(timeout=timeout) if timeout else self._finished.get_nowait()
+            except queue.Empty:
+                return
+            timeout = None
+            self._unacked -= 1
+            try:
+                message.ack()
+            except Exception as e:
+                logger.error(f"Failed to ack task message: {e}")
+
+    def _on_message(self, body, message):
+        """태스크 메시지 수신 콜백 (소비 스레드)"""
+        task_name = message.headers.get('task')
+        if task_name != process_chat_message.name:
+            logger.warning(f"Unsupported task {task_name}, requeueing")
+            message.requeue()
+            return
+
+        # 빈 슬롯이 생길 때까지 소비 중단
+        self._slots.acquire()
+        self._unacked += 1
+
+        task_id = message.headers['id']
+        args, kwargs, _ = body
+        future = asyncio.run_coroutine_threadsafe(self._run(task_id, args, kwargs), self._loop)
+        future.add_done_callback(lambda _: self._done(message))
+
+    def _done(self, message):
+        """태스크 종료 콜백: 슬롯을 반환하고 메시지 확인을 소비 스레드에 넘김"""
+        self._finished.put(message)
+        self._slots.release()
+
+    async def _run(self, task_id: str, args: list, kwargs: dict):
+        """태스크 하나 실행 및 결과 저장"""
+        self._inflight[task_id] = asyncio.current_task()
+        backend = app.backend
+        try:
+            await asyncio.to_thread(backend.mark_as_started, task_id)
+            result = await asyncio.wait_for(
+                process_chat_message_async(self.provider, *args, **kwargs),
+                timeout=app.conf.task_time_limit
+            )
+            await asyncio.to_thread(backend.mark_as_done, task_id, result)
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                e = TimeoutError(f"Task exceeded {app.conf.task_time_limit}s time limit")
+            logger.error(f"Async task {task_id} failed: {e}", exc_info=True)
+            await self._fail(task_id, e, kwargs.get('flight_key'), args[2] if len(args) > 2 else None)
+        finally:
+            self._inflight.pop(task_id, None)
+
+    async def _fail(self, task_id: str, exc: Exception, flight_key: Optional[str] = None,
+                    chat_id: Optional[str] = None):
+        """`ChatTask.on_failure`와 동일한 실패 처리"""
+        try:
+            error_msg = StreamMessage(type="error", error=str(exc))
+            await async_redis_manager.publish_event(task_id, error_msg.model_dump())
+            message_buffer.fail(task_id)
+            await asyncio.to_thread(
+                chat_store.update_message_status, task_id, MessageStatus.FAILED,
+                None, f"Error: {str(exc)}"
+            )
+            await asyncio.to_thread(single_flight.fail, flight_key, task_id, f"Error: {str(exc)}")
+            if chat_id:
+                await asyncio.to_thread(admission.release, task_id, chat_id)
+            await asyncio.to_thread(app.backend.mark_as_failure, task_id, exc)
+        except Exception as e:
+            logger.error(f"Failed to record failure for task {task_id}: {e}")
+
+    async def run(self):
+        """워커 실행 (SIGINT/SIGTERM 시 진행 중인 태스크를 마치고 종료)"""
+        self._loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            self._loop.add_signal_handler(sig, stop.set)
+
+        if settings.worker_metrics_port:
+            start_metrics_server(settings.worker_metrics_port)
+
+        consumer = threading.Thread(target=self._consume, name="async-worker-consumer", daemon=True)
+        consumer.start()
+
+        await stop.wait()
+        logger.info(f"Shutting down, waiting for {self.active} task(s)...")
+        self._stopping.set()
+        # 소비 스레드는 진행 중인 태스크가 모두 끝나 메시지를 확인한 뒤 종료
+        await asyncio.to_thread(consumer.join, app.conf.task_time_limit)
+        await async_redis_manager.close()
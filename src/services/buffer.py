@@ -0,0 +1,176 @@
+"""스트리밍 메시지 내용 write-behind 버퍼"""
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from src.core.config import settings
+from src.core.database import db_chat_store, DatabaseChatStore
+
+logger = logging.getLogger(__name__)
+
+
+class MessageWriteBuffer:
+    """태스크별 토큰을 모아 크기/시간 임계값마다 DB에 기록하는 버퍼
+
+    토큰마다 `append_message_content`를 호출하는 대신 메모리에 모아두었다가
+    `max_chars` 이상 쌓이거나 `flush_interval`초가 지나면 한 번에 기록한다.
+    시간 임계값은 토큰이 추가될 때와 함께 프로세스별 백그라운드 스레드(`flush_due`)가 확인하므로
+    생성이 멈춘 스트림(긴 도구 호출, 느린 업스트림)의 토큰도 `flush_interval` 안에 기록된다.
+    기록은 `message_chunks`에 청크 하나를 추가하는 INSERT이며, 메시지가 종료되면 합쳐진다.
+    완료 시에는 최종 내용이 상태 업데이트와 함께 한 번에 기록되므로
+    남은 토큰은 버리고, 실패 시에는 `on_failure` 정책에 따라 처리한다.
+    """
+
+    def __init__(self, store: Optional[DatabaseChatStore] = None,
+                 enabled: Optional[bool] = None,
+                 max_chars: Optional[int] = None,
+                 flush_interval: Optional[float] = None,
+                 on_failure: Optional[str] = None):
+        self.store = store or db_chat_store
+        self.enabled = settings.message_buffer_enabled if enabled is None else enabled
+        self.max_chars = settings.message_buffer_max_chars if max_chars is None else max_chars
+        self.flush_interval = (settings.message_buffer_flush_interval
+                               if flush_interval is None else flush_interval)
+        self.on_failure = on_failure or settings.message_buffer_on_failure
+        self._pending: Dict[str, List[str]] = {}
+        self._sizes: Dict[str, int] = {}
+        self._last_flush: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # 태스크별 기록 잠금 (백그라운드 기록과 스트림의 기록이 청크 순서를 바꾸지 않도록)
+        self._task_locks: Dict[str, threading.Lock] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_pid: Optional[int] = None
+
+    def append(self, task_id: str, content: str) -> bool:
+        """토큰 추가 (임계값에 도달하면 바로 기록)
+
+        Args:
+            task_id: 태스크 ID
+            content: 추가할 토큰
+
+        Returns:
+            이번 호출에서 DB에 기록했는지 여부
+        """
+        due = self.stage(task_id, content)
+        if due:
+            self.flush(task_id)
+        return due
+
+    def stage(self, task_id: str, content: str) -> bool:
+        """토큰을 버퍼에만 추가하고 flush가 필요한지 반환
+
+        DB 기록을 호출자가 직접 (예: 별도 스레드에서) 수행할 때 사용한다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._pending.setdefault(task_id, []).append(content)
+            size = self._sizes.get(task_id, 0) + len(content)
+            self._sizes[task_id] = size
+            last = self._last_flush.setdefault(task_id, now)
+
+        if not self.enabled:
+            return True
+        if self.flush_interval > 0:
+            self._start_flusher()
+        return size >= self.max_chars or (now - last) >= self.flush_interval
+
+    def _task_lock(self, task_id: str) -> threading.Lock:
+        with self._lock:
+            return self._task_locks.setdefault(task_id, threading.Lock())
+
+    def flush(self, task_id: str):
+        """태스크의 대기 중인 토큰을 DB에 기록"""
+        with self._task_lock(task_id):
+            with self._lock:
+                chunks = self._pending.pop(task_id, None)
+                self._sizes.pop(task_id, None)
+                self._last_flush[task_id] = time.monotonic()
+
+            if chunks:
+                self.store.append_message_content(task_id, "".join(chunks))
+
+    def discard(self, task_id: str):
+        """태스크의 버퍼를 기록하지 않고 제거 (최종 내용을 따로 저장하는 경우)
+
+        진행 중인 백그라운드 기록이 끝날 때까지 기다리므로 반환 후에는 이 태스크의 청크가 더 기록되지 않는다.
+        """
+        with self._task_lock(task_id):
+            with self._lock:
+                self._pending.pop(task_id, None)
+                self._sizes.pop(task_id, None)
+                self._last_flush.pop(task_id, None)
+                self._task_locks.pop(task_id, None)
+
+    def fail(self, task_id: str):
+        """태스크 실패 시 `on_failure` 정책에 따라 남은 토큰 처리"""
+        if self.on_failure == "flush":
+            try:
+                self.flush(task_id)
+            except Exception as e:
+                logger.error(f"Failed to flush buffered content for task {task_id}: {e}")
+        self.discard(task_id)
+
+    def flush_due(self, now: Optional[float] = None) -> float:
+        """마지막 기록 후 `flush_interval`이 지난 태스크의 토큰 기록
+
+        Returns:
+            다음으로 기록할 태스크까지 남은 시간(초, 대기 중인 토큰이 없으면 `flush_interval`)
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            deadlines = {task_id: self._last_flush.get(task_id, now) + self.flush_interval
+                         for task_id in self._pending}
+
+        for task_id, deadline in deadlines.items():
+            if deadline > now:
+                continue
+            try:
+                self.flush(task_id)
+            except Exception as e:
+                logger.error(f"Failed to flush buffered content for task {task_id}: {e}")
+
+        waits = [deadline - now for deadline in deadlines.values() if deadline > now]
+        return min(waits) if waits else self.flush_interval
+
+    def _start_flusher(self):
+        """백그라운드 기록 스레드 시작 (프로세스마다 처음 토큰을 받을 때, prefork 자식 프로세스 포함)"""
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+            self._flusher = threading.Thread(target=self._run_flusher, name="message-buffer-flush", daemon=True)
+        self._flusher.start()
+
+    def _run_flusher(self):
+        wait = self.flush_interval
+        while True:
+            time.sleep(wait)
+            try:
+                wait = self.flush_due()
+            except Exception as e:
+                logger.error(f"Message buffer flush failed: {e}")
+                wait = self.flush_interval
+
+    def flush_all(self):
+        """모든 태스크의 대기 중인 토큰을 DB에 기록"""
+        with self._lock:
+            task_ids = list(self._pending.keys())
+
+        for task_id in task_ids:
+            try:
+                self.flush(task_id)
+            except Exception as e:
+                logger.error(f"Failed to flush buffered content for task {task_id}: {e}")
+
+
+# 워커 프로세스 단위 버퍼 인스턴스
+message_buffer = MessageWriteBuffer()
+
+if settings.message_buffer_flush_on_exit:
+    atexit.register(message_buffer.flush_all)
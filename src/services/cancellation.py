@@ -0,0 +1,148 @@
+"""진행 중인 생성 취소
+
+사용자가 응답을 버리면(탭 닫기, 중단 버튼) 워커가 `max_tokens`까지 LLM 스트림을 계속 받으며
+DB/Redis에 기록하고 슬롯을 차지한다. 두 가지 경우에 토큰 사이에서 생성을 중단한다.
+
+- 취소 요청: API가 `cancel:{task_id}` 플래그를 남기면 워커가 `cancel_check_interval`마다 확인
+- 구독자 없음: `publish_event`가 반환하는 수신자 수가 `cancel_idle_grace`초 동안 0이면 중단
+  (API 디스패처는 SSE 연결이 있는 태스크 채널만 구독하므로 수신자 수가 곧 구독 중인 API 프로세스 수)
+
+중단된 생성은 업스트림 스트림을 닫고, 그때까지 받은 내용을 `CANCELLED` 상태로 저장한 뒤
+`cancelled` 이벤트로 스트림을 끝낸다. 대기열에 있던 태스크는 시작하자마자 같은 방식으로 끝난다.
+"""
+import time
+import logging
+from typing import Iterable, Optional, Set
+
+import redis
+
+from src.core.config import settings
+from src.core.redis import RedisManager, redis_manager, AsyncRedisManager, async_redis_manager
+from src.core.metrics import GENERATION_CANCELLATIONS
+
+logger = logging.getLogger(__name__)
+
+# 취소 플래그 보존 시간(초). 대기열에서 오래 기다린 태스크도 시작 시 확인할 수 있도록 넉넉하게
+FLAG_TTL = 3600
+
+REASON_REQUESTED = "requested"
+REASON_ABANDONED = "abandoned"
+
+REASON_MESSAGES = {
+    REASON_REQUESTED: "Cancelled by user",
+    REASON_ABANDONED: "Cancelled: no subscriber",
+}
+
+
+def _cancel_key(task_id: str) -> str:
+    return f"cancel:{task_id}"
+
+
+class CancellationWatch:
+    """생성 하나의 취소 여부 감시
+
+    워커는 발행할 때마다 수신자 수를 `observe`로 알리고, 토큰 사이에서 `check`/`acheck`를 호출한다.
+    Redis 확인은 `cancel_check_interval`마다 한 번만 하므로 토큰당 비용은 시각 비교 정도다.
+    """
+
+    def __init__(self, registry: "CancellationRegistry", task_id: str):
+        self.registry = registry
+        self.task_id = task_id
+        self.idle_grace = settings.cancel_idle_grace
+        self.interval = settings.cancel_check_interval
+        now = time.monotonic()
+        # 클라이언트가 POST 응답을 받고 SSE에 연결하기까지의 시간도 유예 기간에 포함
+        self._last_listener = now
+        self._next_check = now
+        self.reason: Optional[str] = None
+
+    def observe(self, receivers: int):
+        """이벤트 발행 결과 기록 (수신자가 있으면 유예 시간 초기화)"""
+        if receivers:
+            self._last_listener = time.monotonic()
+
+    def _idle(self, now: float) -> bool:
+        return self.idle_grace > 0 and now - self._last_listener > self.idle_grace
+
+    def _cancel(self, reason: str) -> str:
+        self.reason = reason
+        GENERATION_CANCELLATIONS.labels(reason).inc()
+        logger.info(f"Cancelling task {self.task_id}: {reason}")
+        return reason
+
+    def check(self) -> Optional[str]:
+        """취소해야 하면 사유 반환"""
+        if self.reason:
+            return self.reason
+        now = time.monotonic()
+        if self._idle(now):
+            return self._cancel(REASON_ABANDONED)
+        if now >= self._next_check:
+            self._next_check = now + self.interval
+            if self.registry.requested(self.task_id):
+                return self._cancel(REASON_REQUESTED)
+        return None
+
+    async def acheck(self) -> Optional[str]:
+        """`check`의 비동기 버전"""
+        if self.reason:
+            return self.reason
+        now = time.monotonic()
+        if self._idle(now):
+            return self._cancel(REASON_ABANDONED)
+        if now >= self._next_check:
+            self._next_check = now + self.interval
+            if await self.registry.arequested(self.task_id):
+                return self._cancel(REASON_REQUESTED)
+        return None
+
+    @property
+    def message(self) -> str:
+        """`cancelled` 이벤트와 메시지에 기록할 사유"""
+        return REASON_MESSAGES.get(self.reason, "Cancelled")
+
+
+class CancellationRegistry:
+    """Redis 취소 플래그 관리 (Redis 오류 시에는 취소되지 않은 것으로 간주)"""
+
+    def __init__(self, redis: Optional[RedisManager] = None, async_redis: Optional[AsyncRedisManager] = None):
+        self.redis = redis or redis_manager
+        self.async_redis = async_redis or async_redis_manager
+
+    async def request(self, task_id: str):
+        """태스크 취소 요청 (워커가 다음 확인 시점에 중단)"""
+        await self.async_redis.client.set(_cancel_key(task_id), REASON_REQUESTED, ex=FLAG_TTL)
+
+    def requested(self, task_id: str) -> bool:
+        try:
+            return bool(self.redis.client.exists(_cancel_key(task_id)))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to check cancellation of task {task_id}: {e}")
+            return False
+
+    async def arequested(self, task_id: str) -> bool:
+        try:
+            return bool(await self.async_redis.client.exists(_cancel_key(task_id)))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to check cancellation of task {task_id}: {e}")
+            return False
+
+    def requested_many(self, task_ids: Iterable[str]) -> Set[str]:
+        """취소 요청된 태스크 ID 집합"""
+        task_ids = list(task_ids)
+        if not task_ids:
+            return set()
+        try:
+            flags = self.redis.client.mget([_cancel_key(task_id) for task_id in task_ids])
+        except redis.RedisError as e:
+            logger.warning(f"Failed to check cancellation of {len(task_ids)} task(s): {e}")
+            return set()
+        return {task_id for task_id, flag in zip(task_ids, flags) if flag}
+
+    def watch(self, task_id: str) -> CancellationWatch:
+        """생성 하나의 취소 감시 시작"""
+        return CancellationWatch(self, task_id)
+
+
+# 프로세스 공용 취소 레지스트리
+cancellation = CancellationRegistry()
@@ -0,0 +1,205 @@
+"""대화 컨텍스트(프롬프트) 조립
+
+채팅별로 토큰 수가 기록된 최근 메시지 윈도우를 Redis에 유지하고,
+매 턴마다 토큰 예산 안에서 시스템 프롬프트 + 대화 기록 + 현재 메시지를 만든다.
+윈도우가 없을 때(새 워커, TTL 만료)만 DB에서 최근 메시지를 한 번 읽어 채운다.
+"""
+import json
+import logging
+from typing import List, Dict, Optional
+
+import redis
+
+from src.core.config import settings
+from src.core.redis import RedisManager, redis_manager
+from src.core.database import MessageType, MessageStatus
+
+try:
+    import tiktoken
+except ImportError:  # 선택 의존성: 없으면 바이트 길이로 추정
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# 시스템 프롬프트
+SYSTEM_PROMPT = "당신은 도움이 되는 AI 어시스턴트입니다."
+
+# 채팅 메시지 하나에 붙는 역할/구분자 토큰 수 (OpenAI chat 형식 기준)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+ROLES = {MessageType.USER.value: "user", MessageType.ASSISTANT.value: "assistant"}
+
+# 윈도우에 메시지 추가 후 예산을 넘는 오래된 메시지 제거 (윈도우가 없으면 아무것도 하지 않음)
+# KEYS: 메시지 리스트, 토큰 합계 / ARGV: TTL, 토큰 예산, (항목 JSON, 토큰 수) 반복
+APPEND_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    return 0
+end
+for i = 3, #ARGV, 2 do
+    redis.call('RPUSH', KEYS[1], ARGV[i])
+    redis.call('INCRBY', KEYS[2], ARGV[i + 1])
+end
+while tonumber(redis.call('GET', KEYS[2])) > tonumber(ARGV[2]) and redis.call('LLEN', KEYS[1]) > 0 do
+    local head = cjson.decode(redis.call('LPOP', KEYS[1]))
+    redis.call('DECRBY', KEYS[2], head['tokens'])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """메시지 하나의 토큰 수 (tiktoken이 없으면 UTF-8 3바이트당 1토큰으로 넉넉하게 추정)"""
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            try:
+                _encoding = tiktoken.encoding_for_model(settings.openai_model)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("o200k_base")
+        return len(_encoding.encode(text)) + MESSAGE_OVERHEAD_TOKENS
+    return -(-len(text.encode("utf-8")) // 3) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _messages_key(chat_id: str) -> str:
+    return f"chatctx:{chat_id}:messages"
+
+
+def _tokens_key(chat_id: str) -> str:
+    return f"chatctx:{chat_id}:tokens"
+
+
+class ContextBuilder:
+    """채팅별 토큰 윈도우 관리 및 프롬프트 조립
+
+    윈도우는 Redis 리스트(`chatctx:{id}:messages`)에 `{"role", "content", "tokens"}`
+    항목으로, 토큰 합계는 `chatctx:{id}:tokens`에 보관한다. 턴이 완료되면
+    사용자 메시지와 응답을 추가하고 예산을 넘는 오래된 메시지를 제거한다.
+    """
+
+    def __init__(self, redis: Optional[RedisManager] = None, store=None):
+        self.redis = redis or redis_manager
+        self._store = store
+        self.ttl = settings.context_ttl
+        self._append = None
+
+    @property
+    def budget(self) -> int:
+        """프롬프트 토큰 예산 (`openai_max_tokens`를 넘지 않음)"""
+        return min(settings.context_token_budget, settings.openai_max_tokens)
+
+    @property
+    def store(self):
+        """채팅 저장소 (순환 import를 피하기 위해 lazy loading)"""
+        if self._store is None:
+            from src.core.cache import chat_store
+            self._store = chat_store
+        return self._store
+
+    def build(self, user_message: str, chat_id: Optional[str] = None,
+              task_id: Optional[str] = None) -> List[Dict[str, str]]:
+        """모델에 전달할 메시지 목록 생성
+
+        Args:
+            user_message: 현재 사용자 메시지
+            chat_id: 채팅 ID (없으면 대화 기록 없이 생성)
+            task_id: 현재 태스크 ID (콜드 스타트 시 현재 턴 메시지를 제외하는 데 사용)
+        """
+        system = {"role": "system", "content": SYSTEM_PROMPT}
+        current = {"role": "user", "content": user_message}
+        if not chat_id or not settings.context_enabled:
+            return [system, current]
+
+        try:
+            window = self._window(chat_id, task_id)
+        except redis.RedisError as e:
+            logger.warning(f"Context window unavailable for chat {chat_id}: {e}")
+            window = []
+
+        # 최신 메시지부터 예산 안에 들어가는 만큼 포함
+        remaining = self.budget - count_tokens(SYSTEM_PROMPT) - count_tokens(user_message)
+        history = []
+        for entry in reversed(window):
+            remaining -= entry["tokens"]
+            if remaining < 0:
+                break
+            history.append({"role": entry["role"], "content": entry["content"]})
+        history.reverse()
+
+        return [system, *history, current]
+
+    def _window(self, chat_id: str, task_id: Optional[str]) -> List[dict]:
+        """Redis 윈도우 조회 (없으면 DB에서 채움)"""
+        pipe = self.redis.client.pipeline(transaction=False)
+        pipe.get(_tokens_key(chat_id))
+        pipe.lrange(_messages_key(chat_id), 0, -1)
+        total, raw_entries = pipe.execute()
+        if total is not None:
+            return [json.loads(raw) for raw in raw_entries]
+        return self._load(chat_id, task_id)
+
+    def _load(self, chat_id: str, task_id: Optional[str]) -> List[dict]:
+        """DB의 최근 메시지로 윈도우 채우기 (쿼리 한 번)"""
+        chat = self.store.get_chat(chat_id, limit=settings.context_max_messages)
+        excluded = {task_id, f"user-{task_id}"} if task_id else set()
+
+        entries = []
+        for message in chat["messages"] if chat else []:
+            if (message["task_id"] in excluded
+                    or message["status"] != MessageStatus.COMPLETED.value
+                    or message["type"] not in ROLES
+                    or not message["content"]):
+                continue
+            entries.append(self._entry(ROLES[message["type"]], message["content"]))
+
+        # 예산을 넘는 오래된 메시지는 저장하지 않음
+        total = 0
+        for index in range(len(entries) - 1, -1, -1):
+            total += entries[index]["tokens"]
+            if total > self.budget:
+                total -= entries[index]["tokens"]
+                entries = entries[index + 1:]
+                break
+
+        pipe = self.redis.client.pipeline(transaction=True)
+        pipe.delete(_messages_key(chat_id))
+        if entries:
+            pipe.rpush(_messages_key(chat_id), *[json.dumps(entry, ensure_ascii=False) for entry in entries])
+            pipe.expire(_messages_key(chat_id), self.ttl)
+        pipe.set(_tokens_key(chat_id), total, ex=self.ttl)
+        pipe.execute()
+        return entries
+
+    @staticmethod
+    def _entry(role: str, content: str) -> dict:
+        return {"role": role, "content": content, "tokens": count_tokens(content)}
+
+    def append_turn(self, chat_id: str, user_message: str, response: str):
+        """완료된 턴(사용자 메시지 + 응답)을 윈도우에 추가"""
+        if not settings.context_enabled:
+            return
+
+        args: List = [self.ttl, self.budget]
+        for entry in (self._entry("user", user_message), self._entry("assistant", response)):
+            args.extend([json.dumps(entry, ensure_ascii=False), entry["tokens"]])
+        try:
+            if self._append is None:
+                self._append = self.redis.client.register_script(APPEND_SCRIPT)
+            self._append(keys=[_messages_key(chat_id), _tokens_key(chat_id)], args=args)
+        except redis.RedisError as e:
+            logger.warning(f"Failed to update context window for chat {chat_id}: {e}")
+            self.clear(chat_id)
+
+    def clear(self, chat_id: str):
+        """채팅의 컨텍스트 윈도우 삭제"""
+        try:
+            self.redis.client.delete(_messages_key(chat_id), _tokens_key(chat_id))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to clear context window for chat {chat_id}: {e}")
+
+
+# 프로세스 공용 컨텍스트 빌더 인스턴스
+context_builder = ContextBuilder()
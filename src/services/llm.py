@@ -0,0 +1,287 @@
+"""LLM 스트리밍 제공자
+
+`process_chat_message`와 asyncio 워커는 이 모듈의 제공자를 통해 토큰을 받는다.
+`llm_provider` 설정으로 실제 OpenAI API, 지연 분포를 흉내 내는 가짜 제공자,
+기록된 스트림을 재생하는 제공자 중 하나를 선택한다.
+"""
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Iterator, AsyncIterator, List, Dict, Optional, Tuple
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ChatMessages = List[Dict[str, str]]
+
+# 가짜 제공자가 만드는 토큰 어휘
+FAKE_VOCABULARY = (
+    "스트리밍", " 응답", " 테스트", " 토큰", "입니다", ".", " Redis", " Celery",
+    " 벤치마크", " 데이터", " 처리", "를", " 위한", " 가짜", " 모델", ",",
+)
+
+
+class LatencyDistribution:
+    """지연/개수 분포
+
+    명세 문자열 형식:
+        fixed:V            항상 V
+        uniform:A,B        A~B 균등 분포
+        normal:MU,SIGMA    정규 분포 (0 미만은 0)
+        lognormal:M,SIGMA  중앙값 M, 로그 표준편차 SIGMA인 로그정규 분포
+        exp:MEAN           평균 MEAN인 지수 분포
+    """
+
+    def __init__(self, spec: str):
+        kind, _, params = spec.partition(":")
+        if not params:
+            kind, params = "fixed", kind
+        self.spec = spec
+        self.kind = kind.strip().lower()
+        self.params = [float(p) for p in params.split(",")]
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal", "exp"):
+            raise ValueError(f"Unknown distribution: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        """분포에서 값 하나 추출"""
+        p = self.params
+        if self.kind == "fixed":
+            return p[0]
+        if self.kind == "uniform":
+            return rng.uniform(p[0], p[1])
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(p[0], p[1]))
+        if self.kind == "lognormal":
+            return p[0] * rng.lognormvariate(0.0, p[1])
+        return rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+
+
+class LLMProvider:
+    """LLM 스트리밍 제공자 인터페이스
+
+    `stream`/`astream`은 모델이 생성한 텍스트 조각을 순서대로 내보낸다.
+    반환된 제너레이터를 닫으면 업스트림 스트림도 닫힌다.
+    """
+
+    name = "base"
+
+    def stream(self, messages: ChatMessages, model: str, temperature: float,
+               max_tokens: int) -> Iterator[str]:
+        raise NotImplementedError
+
+    async def astream(self, messages: ChatMessages, model: str, temperature: float,
+                      max_tokens: int) -> AsyncIterator[str]:
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI Chat Completions 스트리밍 제공자"""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or settings.openai_api_key
+        self._client = None
+        self._async_client = None
+
+    @property
+    def client(self):
+        """동기 OpenAI 클라이언트 (lazy loading)"""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key)
+        return self._client
+
+    @property
+    def async_client(self):
+        """비동기 OpenAI 클라이언트 (lazy loading)"""
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            self._async_client = AsyncOpenAI(api_key=self.api_key)
+        return self._async_client
+
+    def stream(self, messages, model, temperature, max_tokens):
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        try:
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            response.close()
+
+    async def astream(self, messages, model, temperature, max_tokens):
+        response = await self.async_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        try:
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await response.close()
+
+
+class FakeProvider(LLMProvider):
+    """설정된 분포에 따라 토큰 수, 첫 토큰 지연(TTFT), 토큰 간 지연을 흉내 내는 제공자
+
+    같은 시드와 같은 프롬프트에 대해서는 항상 같은 토큰 열과 지연을 만든다.
+    """
+
+    name = "fake"
+
+    def __init__(self, tokens: Optional[str] = None, ttft_ms: Optional[str] = None,
+                 itl_ms: Optional[str] = None, seed: Optional[int] = None):
+        self.tokens = LatencyDistribution(tokens or settings.fake_llm_tokens)
+        self.ttft = LatencyDistribution(ttft_ms or settings.fake_llm_ttft_ms)
+        self.itl = LatencyDistribution(itl_ms or settings.fake_llm_itl_ms)
+        self.seed = settings.fake_llm_seed if seed is None else seed
+
+    def _rng(self, messages: ChatMessages) -> random.Random:
+        """프롬프트별 결정적 난수 생성기"""
+        digest = hashlib.sha256(json.dumps(messages, ensure_ascii=False).encode()).digest()
+        return random.Random(self.seed ^ int.from_bytes(digest[:8], "big"))
+
+    def plan(self, messages: ChatMessages, max_tokens: int) -> List[Tuple[float, str]]:
+        """(대기 시간 초, 토큰) 목록 생성"""
+        rng = self._rng(messages)
+        count = min(max(1, int(self.tokens.sample(rng))), max_tokens)
+        plan = []
+        for i in range(count):
+            delay = self.ttft.sample(rng) if i == 0 else self.itl.sample(rng)
+            plan.append((delay / 1000, FAKE_VOCABULARY[rng.randrange(len(FAKE_VOCABULARY))]))
+        return plan
+
+    def stream(self, messages, model, temperature, max_tokens):
+        for delay, token in self.plan(messages, max_tokens):
+            if delay:
+                time.sleep(delay)
+            yield token
+
+    async def astream(self, messages, model, temperature, max_tokens):
+        for delay, token in self.plan(messages, max_tokens):
+            if delay:
+                await asyncio.sleep(delay)
+            yield token
+
+
+class ReplayProvider(LLMProvider):
+    """기록된 스트림을 원래 타이밍대로 재생하는 제공자
+
+    기록 파일은 JSONL이며 한 줄이 스트림 하나다:
+        {"prompt": "...", "chunks": [[오프셋 ms, "텍스트"], ...]}
+    마지막 사용자 메시지와 같은 프롬프트의 기록이 있으면 그것을,
+    없으면 프롬프트 해시로 고른 기록을 재생한다. `speed`가 2면 두 배 빠르게 재생한다.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: Optional[Path] = None, speed: Optional[float] = None):
+        self.path = Path(path or settings.llm_replay_path)
+        self.speed = speed or settings.llm_replay_speed
+        self.recordings = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    self.recordings.append(json.loads(line))
+        if not self.recordings:
+            raise ValueError(f"No recordings in {self.path}")
+        self._by_prompt = {rec.get("prompt"): rec for rec in self.recordings}
+
+    def _select(self, messages: ChatMessages) -> dict:
+        prompt = messages[-1]["content"] if messages else ""
+        if prompt in self._by_prompt:
+            return self._by_prompt[prompt]
+        digest = hashlib.sha256(prompt.encode()).digest()
+        return self.recordings[int.from_bytes(digest[:8], "big") % len(self.recordings)]
+
+    def _plan(self, messages: ChatMessages, max_tokens: int) -> List[Tuple[float, str]]:
+        chunks = self._select(messages)["chunks"][:max_tokens]
+        plan, previous = [], 0.0
+        for offset_ms, text in chunks:
+            plan.append((max(0.0, offset_ms - previous) / 1000 / self.speed, text))
+            previous = offset_ms
+        return plan
+
+    def stream(self, messages, model, temperature, max_tokens):
+        for delay, text in self._plan(messages, max_tokens):
+            if delay:
+                time.sleep(delay)
+            yield text
+
+    async def astream(self, messages, model, temperature, max_tokens):
+        for delay, text in self._plan(messages, max_tokens):
+            if delay:
+                await asyncio.sleep(delay)
+            yield text
+
+
+class RecordingProvider(LLMProvider):
+    """다른 제공자의 스트림을 `ReplayProvider` 형식으로 기록하는 래퍼"""
+
+    def __init__(self, inner: LLMProvider, path: Path):
+        self.inner = inner
+        self.name = inner.name
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def _write(self, messages: ChatMessages, chunks: List[Tuple[float, str]]):
+        record = {"prompt": messages[-1]["content"] if messages else "", "chunks": chunks}
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def stream(self, messages, model, temperature, max_tokens):
+        started, chunks = time.monotonic(), []
+        stream = self.inner.stream(messages, model, temperature, max_tokens)
+        try:
+            for text in stream:
+                chunks.append([round((time.monotonic() - started) * 1000, 3), text])
+                yield text
+        finally:
+            stream.close()
+        self._write(messages, chunks)
+
+    async def astream(self, messages, model, temperature, max_tokens):
+        started, chunks = time.monotonic(), []
+        stream = self.inner.astream(messages, model, temperature, max_tokens)
+        try:
+            async for text in stream:
+                chunks.append([round((time.monotonic() - started) * 1000, 3), text])
+                yield text
+        finally:
+            await stream.aclose()
+        self._write(messages, chunks)
+
+
+def get_provider(name: Optional[str] = None) -> LLMProvider:
+    """설정에 맞는 LLM 제공자 생성"""
+    name = name or settings.llm_provider
+    if name == "fake":
+        provider = FakeProvider()
+    elif name == "replay":
+        provider = ReplayProvider()
+    elif name == "openai":
+        provider = OpenAIProvider()
+    else:
+        raise ValueError(f"Unknown LLM provider: {name}")
+
+    if settings.llm_record_path:
+        provider = RecordingProvider(provider, settings.llm_record_path)
+    logger.info(f"Using LLM provider: {provider.name}")
+    return provider
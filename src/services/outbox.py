@@ -0,0 +1,112 @@
+"""Celery 태스크 발행 아웃박스
+
+메시지 저장과 태스크 발행 사이에 API가 중단되면 태스크 없이 PENDING 상태로 남는 메시지가 생긴다.
+`post_message`가 메시지와 같은 트랜잭션으로 아웃박스 행(`task_outbox`)을 기록하고,
+요청 처리 중 발행에 성공하면 행을 삭제한다. 발행하지 못했거나 삭제 전에 중단된 행은
+`OutboxRelay`가 주기적으로 다시 발행한다.
+
+재발행은 at-least-once이므로 같은 태스크가 두 번 실행될 수 있다. 워커는
+`claim_message`(PENDING → PROCESSING)에 성공한 경우에만 생성을 진행한다.
+
+같은 주기로 리더 워커가 사라진 single-flight 팔로워도 정리한다(`SingleFlight.sweep`).
+"""
+import asyncio
+import logging
+from typing import Optional, Set
+
+from src.core.celery_app import app
+from src.core.config import settings
+from src.core.async_database import AsyncDatabaseChatStore, async_db_chat_store
+from src.core.metrics import OUTBOX_DISPATCHES
+from src.services.single_flight import single_flight
+
+logger = logging.getLogger(__name__)
+
+
+def send_task(task_id: str, name: str, args: list, kwargs: dict, options: Optional[dict] = None):
+    """Celery 브로커로 태스크 발행 (태스크 ID는 메시지 task_id와 동일, `options`는 큐/우선순위 등 발행 옵션)"""
+    app.send_task(name, args=args, kwargs=kwargs, task_id=task_id, **(options or {}))
+
+
+class OutboxRelay:
+    """아웃박스 태스크 발행 및 미확인 태스크 재발행 (API 프로세스당 하나)"""
+
+    def __init__(self, store: Optional[AsyncDatabaseChatStore] = None):
+        self.store = store or async_db_chat_store
+        self.interval = settings.outbox_relay_interval
+        self._relay_task: Optional[asyncio.Task] = None
+        self._confirmations: Set[asyncio.Task] = set()
+
+    async def dispatch(self, task_id: str, name: str, args: list, kwargs: dict,
+                       options: Optional[dict] = None) -> bool:
+        """아웃박스에 기록된 태스크 발행
+
+        브로커 호출은 동기 I/O이므로 스레드에서 실행한다. 발행에 성공하면 응답을 기다리지 않고
+        백그라운드에서 아웃박스 행을 삭제하고, 실패하면 행을 남겨 두고 릴레이가 재발행한다.
+
+        Returns:
+            발행 성공 여부
+        """
+        try:
+            await asyncio.to_thread(send_task, task_id, name, args, kwargs, options)
+        except Exception as e:
+            OUTBOX_DISPATCHES.labels("failed").inc()
+            logger.warning(f"Failed to dispatch task {task_id}, leaving it to the outbox relay: {e}")
+            return False
+
+        OUTBOX_DISPATCHES.labels("direct").inc()
+        confirmation = asyncio.create_task(self._confirm(task_id))
+        self._confirmations.add(confirmation)
+        confirmation.add_done_callback(self._confirmations.discard)
+        return True
+
+    async def _confirm(self, task_id: str):
+        try:
+            await self.store.confirm_dispatch(task_id)
+        except Exception as e:
+            # 행이 남아 있으면 릴레이가 다시 발행하고 워커가 중복 실행을 걸러낸다
+            logger.warning(f"Failed to confirm dispatch of task {task_id}: {e}")
+
+    async def relay_once(self) -> int:
+        """발행이 확인되지 않은 태스크를 한 번 재발행"""
+        relayed = await self.store.relay_outbox(
+            send_task, settings.outbox_dispatch_grace, settings.outbox_relay_batch
+        )
+        if relayed:
+            OUTBOX_DISPATCHES.labels("relayed").inc(relayed)
+            logger.info(f"Relayed {relayed} outbox task(s)")
+        return relayed
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.relay_once()
+            except Exception as e:
+                logger.warning(f"Outbox relay failed: {e}")
+            try:
+                await asyncio.to_thread(single_flight.sweep)
+            except Exception as e:
+                logger.warning(f"Single-flight sweep failed: {e}")
+
+    async def start(self):
+        """릴레이 태스크 시작"""
+        if self._relay_task is None:
+            self._relay_task = asyncio.create_task(self._run())
+            logger.info("Outbox relay started")
+
+    async def stop(self):
+        """릴레이 태스크 종료 (진행 중인 발행 확인은 끝까지 기다림)"""
+        if self._relay_task is not None:
+            self._relay_task.cancel()
+            try:
+                await self._relay_task
+            except asyncio.CancelledError:
+                pass
+            self._relay_task = None
+        if self._confirmations:
+            await asyncio.gather(*self._confirmations, return_exceptions=True)
+
+
+# 프로세스 공용 아웃박스 릴레이
+outbox_relay = OutboxRelay()
@@ -0,0 +1,218 @@
+"""LLM 응답 캐시 (정확히 일치하는 요청)
+
+정규화한 사용자 메시지 + 모델 + temperature + 이전 대화(컨텍스트) 해시가 같으면
+저장된 응답을 LLM 호출 없이 일반 토큰 스트림으로 재생한다. 재생된 응답도
+메시지 저장, 컨텍스트 갱신 등 나머지 처리는 일반 생성과 같다.
+
+항목은 `respcache:{key}`에 `ReplayProvider` 기록과 같은 `[[오프셋 ms, "텍스트"], ...]`
+형식으로 저장하고, 마지막 접근 시각을 점수로 하는 정렬 집합(`respcache:lru`)으로
+항목 수를 제한한다(가장 오래 접근하지 않은 항목부터 제거).
+"""
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Iterator, AsyncIterator, List, Dict, Optional
+
+import redis
+
+from src.core.config import settings
+from src.core.redis import RedisManager, redis_manager
+from src.core.metrics import (
+    RESPONSE_CACHE_LOOKUPS,
+    RESPONSE_CACHE_SAVED_TOKENS,
+    RESPONSE_CACHE_SAVED_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+ChatMessages = List[Dict[str, str]]
+
+# 캐시 적중 시 메트릭에 기록할 제공자 이름
+CACHE_PROVIDER = "cache"
+
+LRU_KEY = "respcache:lru"
+
+# 항목 저장 후 만료/초과 항목 정리
+# KEYS: 항목, LRU 집합 / ARGV: 항목 JSON, TTL, 현재 시각, 최대 항목 수
+STORE_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[3], KEYS[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', tonumber(ARGV[3]) - tonumber(ARGV[2]))
+local excess = redis.call('ZCARD', KEYS[2]) - tonumber(ARGV[4])
+if excess > 0 then
+    local victims = redis.call('ZRANGE', KEYS[2], 0, excess - 1)
+    redis.call('ZREMRANGEBYRANK', KEYS[2], 0, excess - 1)
+    redis.call('DEL', unpack(victims))
+end
+return excess
+"""
+
+
+def normalize_prompt(text: str) -> str:
+    """캐시 키용 사용자 메시지 정규화 (앞뒤 공백 제거, 연속 공백 축약, 대소문자 무시)"""
+    return " ".join(text.split()).casefold()
+
+
+def request_key(messages: ChatMessages, model: str, temperature: float) -> str:
+    """요청 식별 해시 (마지막 사용자 메시지는 정규화, 그 앞의 메시지는 해시로 포함)"""
+    context = hashlib.sha256(
+        json.dumps(messages[:-1], ensure_ascii=False, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    prompt = normalize_prompt(messages[-1]["content"]) if messages else ""
+    material = json.dumps([model, temperature, context, prompt], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _entry_key(digest: str) -> str:
+    return f"respcache:{digest}"
+
+
+class CachedResponse:
+    """캐시에 저장된 응답 (재생용 청크와 원래 타이밍)"""
+
+    def __init__(self, chunks: List[List]):
+        self.chunks = chunks
+
+    @property
+    def duration(self) -> float:
+        """원래 생성에 걸린 시간(초)"""
+        return self.chunks[-1][0] / 1000 if self.chunks else 0.0
+
+    def _plan(self, speed: float) -> List[tuple]:
+        plan, previous = [], 0.0
+        for offset_ms, text in self.chunks:
+            delay = max(0.0, offset_ms - previous) / 1000 / speed if speed > 0 else 0.0
+            plan.append((delay, text))
+            previous = offset_ms
+        return plan
+
+    def replay(self, speed: Optional[float] = None) -> Iterator[str]:
+        """청크 재생 (`speed`배 빠르게, 0이면 지연 없이)"""
+        for delay, text in self._plan(settings.response_cache_replay_speed if speed is None else speed):
+            if delay:
+                time.sleep(delay)
+            yield text
+
+    async def areplay(self, speed: Optional[float] = None) -> AsyncIterator[str]:
+        """`replay`의 비동기 버전"""
+        for delay, text in self._plan(settings.response_cache_replay_speed if speed is None else speed):
+            if delay:
+                await asyncio.sleep(delay)
+            yield text
+
+
+class CacheLookup:
+    """요청 하나의 캐시 조회 결과
+
+    적중하면 `response`로 재생하고, 아니면 `record()`로 LLM 스트림을 감싸 두었다가
+    생성이 완료된 뒤 `save()`로 저장한다. 캐시가 꺼져 있으면 아무것도 하지 않는다.
+    """
+
+    def __init__(self, cache: "ResponseCache", key: Optional[str] = None,
+                 response: Optional[CachedResponse] = None):
+        self.cache = cache
+        self.key = key
+        self.response = response
+        self._chunks: List[List] = []
+        self._started: Optional[float] = None
+
+    @property
+    def hit(self) -> bool:
+        return self.response is not None
+
+    def _add(self, text: str):
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        self._chunks.append([round((now - self._started) * 1000, 3), text])
+
+    def record(self, stream: Iterator[str]) -> Iterator[str]:
+        """LLM 스트림을 그대로 전달하면서 청크 기록"""
+        try:
+            for text in stream:
+                if self.key is not None:
+                    self._add(text)
+                yield text
+        finally:
+            # 소비자가 중간에 닫으면 업스트림 스트림도 닫음
+            stream.close()
+
+    async def arecord(self, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        """`record`의 비동기 버전"""
+        try:
+            async for text in stream:
+                if self.key is not None:
+                    self._add(text)
+                yield text
+        finally:
+            await stream.aclose()
+
+    def save(self):
+        """기록한 응답 저장 (적중했거나 캐시가 꺼져 있으면 무시)"""
+        if self.key is not None and not self.hit and self._chunks:
+            self.cache.put(self.key, self._chunks)
+
+
+class ResponseCache:
+    """Redis에 저장하는 정확 일치 응답 캐시"""
+
+    def __init__(self, redis: Optional[RedisManager] = None):
+        self.redis = redis or redis_manager
+        self.enabled = settings.response_cache_enabled
+        self.ttl = settings.response_cache_ttl
+        self.max_entries = settings.response_cache_max_entries
+        self.max_entry_bytes = settings.response_cache_max_entry_bytes
+        self._store = None
+
+    def lookup(self, messages: ChatMessages, model: str, temperature: float) -> CacheLookup:
+        """요청에 해당하는 캐시 항목 조회 (적중 시 LRU 순서와 TTL 갱신)"""
+        if not self.enabled:
+            return CacheLookup(self)
+
+        key = _entry_key(request_key(messages, model, temperature))
+        try:
+            pipe = self.redis.client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.zadd(LRU_KEY, {key: time.time()}, xx=True)
+            pipe.expire(key, self.ttl)
+            raw = pipe.execute()[0]
+        except redis.RedisError as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            return CacheLookup(self)
+
+        if raw is None:
+            RESPONSE_CACHE_LOOKUPS.labels("miss").inc()
+            return CacheLookup(self, key)
+
+        response = CachedResponse(json.loads(raw))
+        RESPONSE_CACHE_LOOKUPS.labels("hit").inc()
+        RESPONSE_CACHE_SAVED_TOKENS.inc(len(response.chunks))
+        RESPONSE_CACHE_SAVED_SECONDS.inc(response.duration)
+        return CacheLookup(self, key, response)
+
+    def put(self, key: str, chunks: List[List]):
+        """응답 저장 (`response_cache_max_entry_bytes`보다 크면 저장하지 않음)"""
+        data = json.dumps(chunks, ensure_ascii=False, separators=(",", ":"))
+        if len(data.encode("utf-8")) > self.max_entry_bytes:
+            logger.debug(f"Response too large to cache ({len(data)} chars)")
+            return
+        try:
+            if self._store is None:
+                self._store = self.redis.client.register_script(STORE_SCRIPT)
+            self._store(keys=[key, LRU_KEY], args=[data, self.ttl, time.time(), self.max_entries])
+        except redis.RedisError as e:
+            logger.warning(f"Failed to store cached response: {e}")
+
+    def clear(self) -> int:
+        """모든 캐시 항목 삭제"""
+        keys = self.redis.client.zrange(LRU_KEY, 0, -1)
+        if keys:
+            self.redis.client.delete(*keys)
+        self.redis.client.delete(LRU_KEY)
+        return len(keys)
+
+
+# 프로세스 공용 응답 캐시 인스턴스
+response_cache = ResponseCache()
@@ -0,0 +1,129 @@
+"""태스크 스케줄링: 요청 레인별 큐와 채팅별 가중 공정 큐잉
+
+요청은 레인(interactive/background)에 따라 다른 Celery 큐로 보내고, 같은 큐 안에서는
+start-time fair queuing으로 채팅 사이의 순서를 정한다. 레인마다 가상 시계 V가 있고,
+채팅마다 마지막으로 등록한 요청의 종료 태그 F를 기록한다.
+
+    등록: S = max(V, F[chat]),  F[chat] = S + 1 / weight[chat]
+          브로커 우선순위 = min(S - V, 단계 수 - 1)   (0이 가장 먼저 소비됨)
+    시작: V = max(V, S)
+
+요청을 몰아서 보낸 채팅은 S가 V보다 앞서 나가 낮은 우선순위로 들어가고, 대기 중인 요청이
+없던 채팅은 곧바로 가장 높은 우선순위를 받는다. 가중치가 2인 채팅은 같은 시간에 두 배의 요청을
+높은 우선순위로 넣을 수 있다. 가중치는 `sched:weights` 해시에 채팅별로 지정한다.
+
+    sched:{lane}:vclock   → 가상 시계
+    sched:{lane}:finish   → 채팅별 종료 태그 (V 이하가 되면 삭제)
+    sched:weights         → 채팅별 가중치 (없으면 `schedule_default_weight`)
+
+가상 시계와 종료 태그는 레인에 요청이 없는 채로 `IDLE_TTL`이 지나면 함께 만료되어 0부터 다시 시작한다.
+"""
+import logging
+from typing import Optional, Tuple
+
+import redis
+
+from src.core.config import settings
+from src.core.redis import RedisManager, redis_manager, AsyncRedisManager, async_redis_manager
+
+logger = logging.getLogger(__name__)
+
+LANES = ("interactive", "background")
+
+WEIGHTS_KEY = "sched:weights"
+
+# 레인 상태 만료 시간(초). 이보다 오래 대기하는 태스크는 없다고 보고 태스크 시간 제한보다 넉넉하게
+IDLE_TTL = 3600
+
+# 시작 태그와 우선순위 단계 계산 후 채팅의 종료 태그 갱신
+# KEYS: 가상 시계, 종료 태그 해시, 가중치 해시 / ARGV: 채팅 ID, 기본 가중치, 우선순위 단계 수, 만료 시간
+ENQUEUE_SCRIPT = """
+local vclock = tonumber(redis.call('GET', KEYS[1]) or '0')
+local start = math.max(vclock, tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or '0'))
+local weight = tonumber(redis.call('HGET', KEYS[3], ARGV[1]) or ARGV[2])
+if weight <= 0 then
+    weight = tonumber(ARGV[2])
+end
+redis.call('HSET', KEYS[2], ARGV[1], tostring(start + 1 / weight))
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+local priority = math.min(math.floor(start - vclock), tonumber(ARGV[3]) - 1)
+return {tostring(start), priority}
+"""
+
+# 태스크 시작 시 가상 시계 전진, 따라잡힌 채팅의 종료 태그 삭제
+# KEYS: 가상 시계, 종료 태그 해시 / ARGV: 시작 태그, 채팅 ID, 만료 시간
+STARTED_SCRIPT = """
+local vclock = math.max(tonumber(redis.call('GET', KEYS[1]) or '0'), tonumber(ARGV[1]))
+redis.call('SET', KEYS[1], tostring(vclock), 'EX', ARGV[3])
+local finish = redis.call('HGET', KEYS[2], ARGV[2])
+if finish and tonumber(finish) <= vclock then
+    redis.call('HDEL', KEYS[2], ARGV[2])
+end
+return tostring(vclock)
+"""
+
+
+def _keys(lane: str) -> list:
+    return [f"sched:{lane}:vclock", f"sched:{lane}:finish"]
+
+
+def lane_queue(lane: str) -> str:
+    """레인의 Celery 큐 이름"""
+    return settings.background_queue if lane == "background" else settings.interactive_queue
+
+
+class FairScheduler:
+    """요청을 레인 큐와 채팅별 공정 우선순위로 배치"""
+
+    def __init__(self, redis: Optional[RedisManager] = None, async_redis: Optional[AsyncRedisManager] = None):
+        self.redis = redis or redis_manager
+        self.async_redis = async_redis or async_redis_manager
+        self.levels = max(1, settings.schedule_priority_levels)
+        self._enqueue = None
+        self._started = None
+
+    async def route(self, chat_id: str, lane: Optional[str] = None) -> Tuple[dict, dict]:
+        """요청의 발행 옵션과 스케줄 정보 계산
+
+        Returns:
+            (Celery 발행 옵션 {"queue", "priority"}, 태스크에 넘길 스케줄 정보 {"lane", "tag"}).
+            Redis 오류 시에는 가장 높은 우선순위로 보내고 태그는 None
+        """
+        lane = lane or settings.default_lane
+        options = {"queue": lane_queue(lane), "priority": 0}
+        try:
+            if self._enqueue is None:
+                self._enqueue = self.async_redis.client.register_script(ENQUEUE_SCRIPT)
+            tag, priority = await self._enqueue(
+                keys=_keys(lane) + [WEIGHTS_KEY],
+                args=[chat_id, settings.schedule_default_weight, self.levels, IDLE_TTL]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Fair scheduling unavailable, using top priority: {e}")
+            return options, {"lane": lane, "tag": None}
+
+        options["priority"] = int(priority)
+        return options, {"lane": lane, "tag": float(tag)}
+
+    def started(self, chat_id: str, schedule: Optional[dict]):
+        """워커가 태스크를 시작할 때 레인의 가상 시계를 시작 태그까지 전진"""
+        if not schedule or schedule.get("tag") is None:
+            return
+        try:
+            if self._started is None:
+                self._started = self.redis.client.register_script(STARTED_SCRIPT)
+            self._started(keys=_keys(schedule["lane"]), args=[schedule["tag"], chat_id, IDLE_TTL])
+        except redis.RedisError as e:
+            logger.warning(f"Failed to advance scheduler clock: {e}")
+
+    def set_weight(self, chat_id: str, weight: Optional[float]):
+        """채팅 가중치 지정 (None이면 기본값으로 되돌림)"""
+        if weight is None:
+            self.redis.client.hdel(WEIGHTS_KEY, chat_id)
+        else:
+            self.redis.client.hset(WEIGHTS_KEY, chat_id, weight)
+
+
+# 프로세스 공용 스케줄러
+fair_scheduler = FairScheduler()
@@ -0,0 +1,318 @@
+"""진행 중인 동일 생성 합치기 (single-flight)
+
+temperature가 0이고 이전 대화까지 같은 요청이 이미 생성 중이면, 새 태스크를 만들지 않고
+먼저 시작한 태스크(리더)의 토큰 스트림에 붙는다(팔로워). 팔로워도 자기 채팅에
+메시지가 따로 저장되며, 리더가 완료/실패하면 같은 결과로 팔로워 메시지를 마무리한다.
+
+    singleflight:{요청 해시}            → 리더 태스크 ID (리더가 끝나면 삭제, TTL로 보호)
+    singleflight:followers:{리더 ID}    → 팔로워 목록 (JSON: task_id, chat_id, message)
+    singleflight:alias:{팔로워 ID}      → 리더 태스크 ID (SSE/상태 조회 시 리더 스트림으로 연결)
+    singleflight:leaders                → 리더별 정리 기한 (zset, "리더 ID|리더 키" → 기한)
+
+리더 워커가 비정상 종료하면 완료/실패 처리가 없어 팔로워가 PENDING으로 남는다.
+`sweep`이 기한이 지난 리더의 메시지 상태를 보고 팔로워를 마무리한다.
+
+늦게 붙은 팔로워도 리더의 이벤트를 처음부터 받아야 하므로 Streams 전송에서만 동작한다.
+"""
+import json
+import time
+import logging
+from typing import List, Optional, Tuple
+
+import redis
+
+from src.core.config import settings
+from src.core.redis import RedisManager, redis_manager, async_redis_manager
+from src.core.database import MessageStatus
+from src.core.cache import chat_store
+from src.core.metrics import SINGLE_FLIGHT_REQUESTS
+from src.services.context import context_builder
+from src.services.response_cache import request_key
+from src.services.cancellation import cancellation, REASON_MESSAGES, REASON_REQUESTED
+from src.services.admission import admission
+
+logger = logging.getLogger(__name__)
+
+# 리더가 있으면 팔로워로 등록하고 리더 ID 반환, 없으면 자신을 리더로 등록
+# 팔로워 목록은 리더 키보다 오래 남겨 리더가 사라진 뒤에도 sweep이 팔로워를 찾을 수 있게 한다
+# KEYS: 리더 키, 리더 기한 zset / ARGV: 태스크 ID, 팔로워 JSON, 리더 TTL, 별칭 TTL, 정리 기한
+JOIN_SCRIPT = """
+local leader = redis.call('GET', KEYS[1])
+if leader then
+    local followers = 'singleflight:followers:' .. leader
+    redis.call('RPUSH', followers, ARGV[2])
+    redis.call('EXPIRE', followers, ARGV[4])
+    redis.call('SET', 'singleflight:alias:' .. ARGV[1], leader, 'EX', ARGV[4])
+    return leader
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+redis.call('ZADD', KEYS[2], ARGV[5], ARGV[1] .. '|' .. KEYS[1])
+return false
+"""
+
+# 리더 생성 시작: 대기열에서 보낸 시간만큼 리더 키와 정리 기한 연장
+# KEYS: 리더 키, 팔로워 목록, 리더 기한 zset / ARGV: 리더 태스크 ID, 리더 TTL, 팔로워 목록 TTL, 정리 기한
+START_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+redis.call('ZADD', KEYS[3], 'XX', ARGV[4], ARGV[1] .. '|' .. KEYS[1])
+"""
+
+# 리더 등록 해제 후 팔로워 목록 반환 (이후 요청은 새 리더가 됨)
+# KEYS: 리더 키, 팔로워 목록, 리더 기한 zset / ARGV: 리더 태스크 ID
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+end
+redis.call('ZREM', KEYS[3], ARGV[1] .. '|' .. KEYS[1])
+local followers = redis.call('LRANGE', KEYS[2], 0, -1)
+redis.call('DEL', KEYS[2])
+return followers
+"""
+
+# 정리 기한이 지난 리더를 꺼냄 (여러 API 프로세스가 같은 리더를 중복 처리하지 않도록 원자적으로 제거)
+# KEYS: 리더 기한 zset / ARGV: 현재 시각, 최대 개수
+EXPIRED_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #expired > 0 then
+    redis.call('ZREM', KEYS[1], unpack(expired))
+end
+return expired
+"""
+
+# 팔로워 합류 취소: 별칭 삭제 후 리더의 팔로워 목록에서 자기 항목 제거
+# KEYS: 팔로워 목록, 별칭 / ARGV: 팔로워 태스크 ID
+LEAVE_SCRIPT = """
+redis.call('DEL', KEYS[2])
+for _, raw in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do
+    if cjson.decode(raw)['task_id'] == ARGV[1] then
+        redis.call('LREM', KEYS[1], 1, raw)
+        return 1
+    end
+end
+return 0
+"""
+
+
+LEADERS_KEY = "singleflight:leaders"
+LOST_LEADER_ERROR = "Generation lost"
+ACTIVE_STATUSES = (MessageStatus.PROCESSING.value, MessageStatus.STREAMING.value)
+
+
+def _flight_key(digest: str) -> str:
+    return f"singleflight:{digest}"
+
+
+def _followers_key(leader_id: str) -> str:
+    return f"singleflight:followers:{leader_id}"
+
+
+def _alias_key(task_id: str) -> str:
+    return f"singleflight:alias:{task_id}"
+
+
+class SingleFlight:
+    """동일 요청의 생성을 하나로 합치는 리더/팔로워 관리"""
+
+    def __init__(self, redis: Optional[RedisManager] = None):
+        self.redis = redis or redis_manager
+        self.ttl = settings.single_flight_ttl
+        self._join = None
+        self._start = None
+        self._release = None
+        self._leave = None
+        self._expired = None
+
+    @property
+    def active(self) -> bool:
+        """결정적 생성(temperature 0)이고 Streams 전송일 때만 동작"""
+        return (settings.single_flight_enabled
+                and settings.openai_temperature == 0
+                and settings.stream_transport == "streams")
+
+    def join(self, task_id: str, chat_id: str, user_message: str) -> Tuple[Optional[str], Optional[str]]:
+        """요청을 리더 또는 팔로워로 등록
+
+        Returns:
+            (요청 키, 리더 태스크 ID). 리더가 되면 리더 ID는 None이고,
+            비활성이거나 Redis 오류면 (None, None)으로 평소처럼 태스크를 실행한다.
+        """
+        if not self.active:
+            return None, None
+
+        messages = context_builder.build(user_message, chat_id, task_id)
+        key = _flight_key(request_key(messages, settings.openai_model, settings.openai_temperature))
+        follower = json.dumps({"task_id": task_id, "chat_id": chat_id, "message": user_message},
+                              ensure_ascii=False)
+        try:
+            if self._join is None:
+                self._join = self.redis.client.register_script(JOIN_SCRIPT)
+            leader = self._join(keys=[key, LEADERS_KEY],
+                                args=[task_id, follower, self.ttl, self.ttl + settings.stream_ttl,
+                                      time.time() + self.ttl])
+        except redis.RedisError as e:
+            logger.warning(f"Single-flight join failed, running task {task_id} alone: {e}")
+            return None, None
+
+        SINGLE_FLIGHT_REQUESTS.labels("follower" if leader else "leader").inc()
+        return key, leader
+
+    def started(self, key: Optional[str], leader_id: str):
+        """리더 생성 시작 시 정리 기한을 지금부터 `single_flight_ttl` 뒤로 연장"""
+        if not key:
+            return
+        try:
+            if self._start is None:
+                self._start = self.redis.client.register_script(START_SCRIPT)
+            self._start(keys=[key, _followers_key(leader_id), LEADERS_KEY],
+                        args=[leader_id, self.ttl, self.ttl + settings.stream_ttl, time.time() + self.ttl])
+        except redis.RedisError as e:
+            logger.warning(f"Failed to extend single-flight leader {leader_id}: {e}")
+
+    async def resolve(self, task_id: str) -> str:
+        """팔로워면 이벤트를 받을 리더 태스크 ID, 아니면 그대로 반환"""
+        if not self.active:
+            return task_id
+        try:
+            return await async_redis_manager.client.get(_alias_key(task_id)) or task_id
+        except redis.RedisError as e:
+            logger.warning(f"Single-flight alias lookup failed for {task_id}: {e}")
+            return task_id
+
+    def leave(self, task_id: str, leader_id: str) -> bool:
+        """팔로워 합류 취소 (메시지를 저장하지 못했거나 취소된 팔로워, 리더와 다른 팔로워는 그대로 둠)
+
+        Returns:
+            팔로워 목록에서 제거했는지 여부 (리더가 이미 팔로워를 마무리했으면 False)
+        """
+        try:
+            if self._leave is None:
+                self._leave = self.redis.client.register_script(LEAVE_SCRIPT)
+            return bool(self._leave(keys=[_followers_key(leader_id), _alias_key(task_id)], args=[task_id]))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to remove single-flight follower {task_id} of {leader_id}: {e}")
+            return False
+
+    def _release_followers(self, key: str, leader_id: str) -> List[dict]:
+        if self._release is None:
+            self._release = self.redis.client.register_script(RELEASE_SCRIPT)
+        raw = self._release(keys=[key, _followers_key(leader_id), LEADERS_KEY], args=[leader_id])
+        return [json.loads(item) for item in raw]
+
+    def complete(self, key: Optional[str], leader_id: str, response: str) -> int:
+        """리더 완료: 팔로워 메시지를 같은 응답으로 완료 처리
+
+        Returns:
+            완료 처리한 팔로워 수
+        """
+        if not key:
+            return 0
+        try:
+            followers = self._release_followers(key, leader_id)
+        except redis.RedisError as e:
+            logger.error(f"Failed to release single-flight followers of {leader_id}: {e}")
+            return 0
+        # 따로 취소를 요청한 팔로워는 응답을 받지 않은 것으로 남김
+        cancelled = cancellation.requested_many(follower["task_id"] for follower in followers)
+        for follower in followers:
+            if follower["task_id"] in cancelled:
+                chat_store.update_message_status(follower["task_id"], MessageStatus.CANCELLED,
+                                                 error="Cancelled by user")
+                continue
+            chat_store.update_message_status(follower["task_id"], MessageStatus.COMPLETED, content=response)
+            context_builder.append_turn(follower["chat_id"], follower["message"], response)
+        if followers:
+            logger.info(f"Task {leader_id} completed {len(followers)} follower message(s)")
+        return len(followers)
+
+    def fail(self, key: Optional[str], leader_id: str, error: str) -> int:
+        """리더 실패: 팔로워 메시지도 실패 처리 (리더 스트림의 error 이벤트를 함께 받음)"""
+        if not key:
+            return 0
+        try:
+            followers = self._release_followers(key, leader_id)
+        except redis.RedisError as e:
+            logger.error(f"Failed to release single-flight followers of {leader_id}: {e}")
+            return 0
+        for follower in followers:
+            chat_store.update_message_status(follower["task_id"], MessageStatus.FAILED, error=error)
+        return len(followers)
+
+    def cancel(self, key: Optional[str], leader_id: str, content: str, reason: str) -> int:
+        """리더 취소: 팔로워 메시지도 받은 데까지의 내용으로 취소 처리 (리더 스트림의 cancelled 이벤트를 함께 받음)"""
+        if not key:
+            return 0
+        try:
+            followers = self._release_followers(key, leader_id)
+        except redis.RedisError as e:
+            logger.error(f"Failed to release single-flight followers of {leader_id}: {e}")
+            return 0
+        for follower in followers:
+            chat_store.update_message_status(follower["task_id"], MessageStatus.CANCELLED,
+                                             content=content, error=reason)
+        return len(followers)
+
+    def sweep(self, now: Optional[float] = None, limit: int = 100) -> int:
+        """정리 기한이 지난 리더의 팔로워 마무리
+
+        리더가 아직 대기 중이면 기한만 연장한다. 생성 중인 채로 기한이 지났으면 워커 시간 제한을
+        넘긴 것이므로 워커가 사라진 것으로 보고 리더도 실패 처리한다(스트림에 error 이벤트 발행).
+        이미 끝난 리더는 그 결과대로 팔로워를 마무리한다.
+
+        Returns:
+            정리한 리더 수
+        """
+        if not self.active:
+            return 0
+        now = time.time() if now is None else now
+        try:
+            if self._expired is None:
+                self._expired = self.redis.client.register_script(EXPIRED_SCRIPT)
+            expired = self._expired(keys=[LEADERS_KEY], args=[now, limit])
+        except redis.RedisError as e:
+            logger.warning(f"Single-flight sweep failed: {e}")
+            return 0
+
+        swept = 0
+        for member in expired:
+            leader_id, key = member.split("|", 1)
+            try:
+                swept += self._settle(key, leader_id, now)
+            except Exception as e:
+                logger.warning(f"Failed to settle followers of single-flight leader {leader_id}: {e}")
+                self._rearm(key, leader_id, now)
+        return swept
+
+    def _rearm(self, key: str, leader_id: str, now: float):
+        try:
+            self.redis.client.zadd(LEADERS_KEY, {f"{leader_id}|{key}": now + self.ttl})
+        except redis.RedisError as e:
+            logger.warning(f"Failed to re-arm single-flight leader {leader_id}: {e}")
+
+    def _settle(self, key: str, leader_id: str, now: float) -> int:
+        leader = chat_store.get_message(leader_id)
+        status = leader["status"] if leader else None
+        if status == MessageStatus.PENDING.value:
+            self._rearm(key, leader_id, now)
+            return 0
+        if status == MessageStatus.COMPLETED.value:
+            self.complete(key, leader_id, leader["content"])
+        elif status == MessageStatus.CANCELLED.value:
+            self.cancel(key, leader_id, leader["content"], leader["error"] or REASON_MESSAGES[REASON_REQUESTED])
+        elif status == MessageStatus.FAILED.value:
+            self.fail(key, leader_id, leader["error"] or LOST_LEADER_ERROR)
+        else:
+            # 생성 중에 워커가 사라졌거나 메시지가 없음: 팔로워 SSE도 끝나도록 리더 스트림에 error 발행
+            if status in ACTIVE_STATUSES:
+                chat_store.update_message_status(leader_id, MessageStatus.FAILED, error=LOST_LEADER_ERROR)
+                admission.release(leader_id, leader["chat_id"])
+            self.fail(key, leader_id, LOST_LEADER_ERROR)
+            self.redis.publish_event(leader_id, {"type": "error", "error": LOST_LEADER_ERROR})
+        logger.warning(f"Settled followers of single-flight leader {leader_id} (status {status})")
+        return 1
+
+
+# 프로세스 공용 single-flight 인스턴스
+single_flight = SingleFlight()
@@ -1,20 +1,37 @@
 """Celery 태스크 정의"""
 import logging
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List
 from celery import Task
-from openai import OpenAI
+from celery.signals import worker_init, worker_process_shutdown
 
 from src.core.celery_app import app
 from src.core.redis import redis_manager
 from src.core.config import settings
 from src.models.schemas import StreamMessage
-from src.core.database import db_chat_store, MessageStatus
+from src.core.database import MessageStatus
+from src.core.cache import chat_store
+from src.core.metrics import GenerationMetrics, start_metrics_server, mark_process_dead
+from src.services.buffer import message_buffer
+from src.services.coalescer import TokenCoalescer, TokenFrame
+from src.services.llm import get_provider
+from src.services.context import context_builder
+from src.services.response_cache import response_cache, CACHE_PROVIDER
+from src.services.single_flight import single_flight
+from src.services.admission import admission
+from src.services.scheduling import fair_scheduler
+from src.services.cancellation import cancellation, CancellationWatch
 
 logger = logging.getLogger(__name__)
 
-# OpenAI 클라이언트
-openai_client = OpenAI(api_key=settings.openai_api_key)
+# LLM 제공자 (llm_provider 설정에 따라 OpenAI/가짜/재생)
+llm_provider = get_provider()
+
+
+def build_chat_messages(user_message: str, chat_id: Optional[str] = None,
+                        task_id: Optional[str] = None) -> List[Dict[str, str]]:
+    """모델에 전달할 메시지 목록 생성 (토큰 예산 안의 이전 대화 포함)"""
+    return context_builder.build(user_message, chat_id, task_id)
 
 
 class ChatTask(Task):
@@ -22,46 +39,105 @@ class ChatTask(Task):
     
     def on_failure(self, exc, task_id, args, kwargs, einfo):
         """태스크 실패 시 처리"""
-        channel = f"chat:{kwargs.get('task_id', task_id)}"
         error_msg = StreamMessage(
             type="error",
             error=str(exc)
         )
-        redis_manager.publish(channel, error_msg.model_dump())
+        redis_manager.publish_event(kwargs.get('task_id', task_id), error_msg.model_dump())
         
         # 채팅 저장소 업데이트
         if len(args) >= 2:
-            db_chat_store.update_message_status(args[1], MessageStatus.FAILED, error=f"Error: {str(exc)}")
+            message_buffer.fail(args[1])
+            chat_store.update_message_status(args[1], MessageStatus.FAILED, error=f"Error: {str(exc)}")
+            single_flight.fail(kwargs.get('flight_key'), args[1], f"Error: {str(exc)}")
+        if len(args) >= 3:
+            admission.release(args[1], args[2])
         
 
+@worker_init.connect
+def start_worker_metrics(**kwargs):
+    """워커 시작 시 메트릭 HTTP 서버 실행"""
+    if settings.worker_metrics_port:
+        start_metrics_server(settings.worker_metrics_port)
+
+
+@worker_process_shutdown.connect
+def cleanup_worker_metrics(pid=None, **kwargs):
+    """종료된 자식 프로세스의 메트릭 정리"""
+    if pid:
+        mark_process_dead(pid)
+
+
+def finish_cancelled(task_id: str, flight_key: Optional[str], watch: CancellationWatch,
+                     content: str, token_count: int) -> Dict[str, Any]:
+    """중단된 생성 마무리: 받은 데까지의 내용을 CANCELLED로 저장하고 cancelled 이벤트로 스트림 종료"""
+    message_buffer.discard(task_id)
+    chat_store.update_message_status(task_id, MessageStatus.CANCELLED, content=content, error=watch.message)
+    single_flight.cancel(flight_key, task_id, content, watch.message)
+    cancelled_msg = StreamMessage(type="cancelled", content=content, token_count=token_count, error=watch.message)
+    redis_manager.publish_event(task_id, cancelled_msg.model_dump())
+    return {'status': 'cancelled', 'reason': watch.reason, 'response': content,
+            'token_count': token_count, 'task_id': task_id}
+
+
+def publish_token_frame(task_id: str, frame: TokenFrame) -> int:
+    """병합된 토큰 프레임을 token 이벤트로 발행"""
+    token_msg = StreamMessage(
+        type="token",
+        content=frame.content,
+        token_start=frame.token_start,
+        token_count=frame.token_count
+    )
+    return redis_manager.publish_event(task_id, token_msg.model_dump())
+
+
 @app.task(base=ChatTask, bind=True, name='chat.process_message')
-def process_chat_message(self, user_message: str, task_id: str, chat_id: str) -> Dict[str, Any]:
+def process_chat_message(self, user_message: str, task_id: str, chat_id: str,
+                         stream_profile: Optional[str] = None,
+                         enqueued_at: Optional[float] = None,
+                         flight_key: Optional[str] = None,
+                         schedule: Optional[dict] = None) -> Dict[str, Any]:
     """사용자 메시지를 처리하고 LLM 응답을 스트리밍
     
     Args:
         user_message: 사용자 입력 메시지
         task_id: 고유 태스크 ID
         chat_id: 채팅 ID
+        stream_profile: 토큰 병합 프로파일 ("latency"/"throughput", 미지정 시 설정값)
+        enqueued_at: 태스크 등록 시각 (큐 대기 시간 메트릭용)
+        flight_key: single-flight 리더로 등록된 요청 키 (완료 시 팔로워 메시지도 완료 처리)
+        schedule: 공정 큐잉 정보 {"lane", "tag"} (시작 시 레인의 가상 시계를 전진)
         
     Returns:
         처리 결과 딕셔너리
     """
-    channel = f"chat:{task_id}"
+    # 상태 업데이트: PENDING → PROCESSING (아웃박스 재발행으로 중복 전달된 태스크는 건너뜀)
+    if not chat_store.claim_message(task_id):
+        logger.warning(f"Task {task_id} is no longer pending, skipping duplicate delivery")
+        return {'status': 'skipped', 'task_id': task_id}
     
+    fair_scheduler.started(chat_id, schedule)
+    single_flight.started(flight_key, task_id)
+    metrics = GenerationMetrics(llm_provider.name, settings.openai_model, enqueued_at,
+                                (schedule or {}).get("lane", settings.default_lane))
+    watch = cancellation.watch(task_id)
     try:
         logger.info(f"Starting task {task_id} for chat {chat_id}")
         
-        # 상태 업데이트: PROCESSING
-        db_chat_store.update_message_status(task_id, MessageStatus.PROCESSING)
-        logger.info(f"Updated status to processing for task {task_id}")
+        # 대기 중에 취소된 태스크는 LLM을 호출하지 않고 종료
+        if watch.check():
+            result = finish_cancelled(task_id, flight_key, watch, "", 0)
+            metrics.finish("cancelled")
+            admission.release(task_id, chat_id)
+            return result
         
         # 시작 메시지
         start_msg = StreamMessage(
             type="start",
             content="처리를 시작합니다..."
         )
-        redis_manager.publish(channel, start_msg.model_dump())
-        logger.info(f"Published start message to channel {channel}")
+        watch.observe(redis_manager.publish_event(task_id, start_msg.model_dump()))
+        logger.info(f"Published start message for task {task_id}")
         
         # 진행 상태 업데이트
         self.update_state(
@@ -71,63 +147,83 @@ def process_chat_message(self, user_message: str, task_id: str, chat_id: str) ->
         
         progress_msg = StreamMessage(
             type="progress",
-            content="OpenAI 모델에 요청을 보내는 중...",
+            content="LLM 모델에 요청을 보내는 중...",
             progress=10
         )
-        redis_manager.publish(channel, progress_msg.model_dump())
+        watch.observe(redis_manager.publish_event(task_id, progress_msg.model_dump()))
         
         # 상태 업데이트: STREAMING
-        db_chat_store.update_message_status(task_id, MessageStatus.STREAMING)
+        chat_store.update_message_status(task_id, MessageStatus.STREAMING)
         logger.info(f"Updated status to streaming for task {task_id}")
         
-        # OpenAI 스트리밍 호출
-        logger.info(f"Calling OpenAI API with model {settings.openai_model}")
-        stream = openai_client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[
-                {"role": "system", "content": "당신은 도움이 되는 AI 어시스턴트입니다."},
-                {"role": "user", "content": user_message}
-            ],
-            stream=True,
-            temperature=settings.openai_temperature,
-            max_tokens=settings.openai_max_tokens
-        )
-        logger.info("OpenAI stream created successfully")
+        # LLM 스트리밍 호출 (응답 캐시에 적중하면 저장된 응답 재생)
+        messages = build_chat_messages(user_message, chat_id, task_id)
+        cached = response_cache.lookup(messages, settings.openai_model, settings.openai_temperature)
+        metrics.requested()
+        if cached.hit:
+            logger.info(f"Replaying cached response for task {task_id}")
+            metrics.set_provider(CACHE_PROVIDER)
+            stream = cached.response.replay()
+        else:
+            logger.info(f"Calling {llm_provider.name} provider with model {settings.openai_model}")
+            stream = cached.record(llm_provider.stream(
+                messages,
+                model=settings.openai_model,
+                temperature=settings.openai_temperature,
+                max_tokens=settings.openai_max_tokens
+            ))
         
         # 스트리밍 응답 처리
         full_response = ""
         token_count = 0
+        coalescer = TokenCoalescer.for_profile(stream_profile)
         
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                content = chunk.choices[0].delta.content
-                full_response += content
-                token_count += 1
-                
-                # 토큰 발행
-                token_msg = StreamMessage(
-                    type="token",
-                    content=content,
-                    token_count=token_count
+        for content in stream:
+            metrics.token()
+            full_response += content
+            token_count += 1
+            
+            # 토큰 발행 (윈도우 안의 토큰은 하나의 이벤트로 병합)
+            frame = coalescer.add(content, token_count)
+            if frame:
+                watch.observe(publish_token_frame(task_id, frame))
+            
+            # 응답 내용 저장 (버퍼링 후 일괄 기록)
+            message_buffer.append(task_id, content)
+            
+            # 취소 요청 또는 구독자 없음: 업스트림 스트림을 닫고 중단
+            if watch.check():
+                break
+            
+            # 진행률 업데이트 (10토큰마다)
+            if token_count % 10 == 0:
+                progress = min(10 + (token_count / 10), 90)
+                self.update_state(
+                    state='PROCESSING',
+                    meta={
+                        'status': f'토큰 생성 중... ({token_count}개)',
+                        'progress': progress
+                    }
                 )
-                redis_manager.publish(channel, token_msg.model_dump())
-                
-                # 응답 내용 저장
-                db_chat_store.append_message_content(task_id, content)
-                
-                # 진행률 업데이트 (10토큰마다)
-                if token_count % 10 == 0:
-                    progress = min(10 + (token_count / 10), 90)
-                    self.update_state(
-                        state='PROCESSING',
-                        meta={
-                            'status': f'토큰 생성 중... ({token_count}개)',
-                            'progress': progress
-                        }
-                    )
-        
-        # 상태 업데이트: COMPLETED
-        db_chat_store.update_message_status(task_id, MessageStatus.COMPLETED)
+        
+        if watch.reason:
+            stream.close()
+            result = finish_cancelled(task_id, flight_key, watch, full_response, token_count)
+            metrics.finish("cancelled")
+            admission.release(task_id, chat_id)
+            return {**result, 'duration': time.time() - start_msg.timestamp}
+        
+        # 남은 토큰 발행
+        frame = coalescer.flush()
+        if frame:
+            publish_token_frame(task_id, frame)
+        
+        # 상태 업데이트: COMPLETED (최종 내용을 한 번에 기록)
+        message_buffer.discard(task_id)
+        chat_store.update_message_status(task_id, MessageStatus.COMPLETED, content=full_response)
+        context_builder.append_turn(chat_id, user_message, full_response)
+        cached.save()
+        single_flight.complete(flight_key, task_id, full_response)
         
         # 완료 메시지
         complete_msg = StreamMessage(
@@ -135,7 +231,9 @@ def process_chat_message(self, user_message: str, task_id: str, chat_id: str) ->
             content=full_response,
             token_count=token_count
         )
-        redis_manager.publish(channel, complete_msg.model_dump())
+        redis_manager.publish_event(task_id, complete_msg.model_dump())
+        metrics.finish("completed")
+        admission.release(task_id, chat_id, time.time() - start_msg.timestamp)
         
         # 최종 결과 반환
         return {
@@ -148,5 +246,6 @@ def process_chat_message(self, user_message: str, task_id: str, chat_id: str) ->
         
     except Exception as e:
         logger.error(f"Task failed: {e}", exc_info=True)
+        metrics.finish("failed")
         # on_failure에서 에러 메시지 발행
         raise
\ No newline at end of file
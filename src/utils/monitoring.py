@@ -1,10 +1,10 @@
 """모니터링 유틸리티"""
-import json
 import asyncio
 from datetime import datetime
 from typing import Optional
 
 from src.core.redis import RedisManager
+from src.core.wire import WireEvent
 from src.core.celery_app import app as celery_app
 
 
@@ -31,7 +31,7 @@ class RedisMonitor:
                     channel = message.get('channel', '').decode('utf-8') if isinstance(message.get('channel'), bytes) else message.get('channel', '')
                     
                     try:
-                        data = json.loads(message['data'])
+                        data = WireEvent.from_payload(message['data']).to_dict()
                         print(f"[{timestamp}] {channel}")
                         print(f"  Type: {data.get('type', 'unknown')}")
                         
@@ -41,9 +41,9 @@ class RedisMonitor:
                             print(f"  Error: {data.get('error', '')}")
                         else:
                             for key, value in data.items():
-                                if key != 'type':
+                                if key != 'type' and value is not None:
                                     print(f"  {key}: {value}")
-                    except json.JSONDecodeError:
+                    except ValueError:
                         print(f"[{timestamp}] {channel} - RAW: {message['data']}")
                     
                     print()
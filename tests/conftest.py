@@ -0,0 +1,147 @@
+"""테스트 공용 fixture
+
+- Redis: fakeredis. URL마다 FakeServer 하나를 두고 동기/비동기 클라이언트가 함께 쓴다.
+- PostgreSQL: `TEST_DATABASE_URL`, 없으면 `pgserver` 패키지로 임시 서버를 띄운다.
+  둘 다 없으면 `pg` fixture를 쓰는 테스트는 건너뛴다.
+
+src를 import하기 전에 환경 변수(DATABASE_URL, LLM_PROVIDER)를 정해야 하므로 이 파일 맨 위에서 설정한다.
+pytest-asyncio 없이 테스트 안에서 `asyncio.run`으로 코루틴을 실행한다.
+"""
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+_pg_server = None
+_pg_dir = None
+if not TEST_DATABASE_URL:
+    try:
+        import pgserver
+    except ImportError:
+        pgserver = None
+    if pgserver is not None:
+        _pg_dir = tempfile.mkdtemp(prefix="streaming-test-pg-")
+        _pg_server = pgserver.get_server(_pg_dir, cleanup_mode="stop")
+        TEST_DATABASE_URL = _pg_server.get_uri()
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+
+import fakeredis
+import pytest
+from redis.commands.core import AsyncScript, Script
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.core import redis as redis_module
+from src.core.redis import redis_manager, async_redis_manager
+
+
+def pytest_unconfigure(config):
+    if _pg_server is not None:
+        _pg_server.cleanup()
+        shutil.rmtree(_pg_dir, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Redis
+# ---------------------------------------------------------------------------
+
+class FakeRedisServers:
+    """URL별 FakeServer (스트림 샤딩 테스트는 노드마다 다른 서버를 씀)"""
+
+    def __init__(self):
+        self.servers = {}
+
+    def server(self, url: str) -> fakeredis.FakeServer:
+        if url not in self.servers:
+            self.servers[url] = fakeredis.FakeServer()
+        return self.servers[url]
+
+    def sync_client(self, url: str, **kwargs) -> fakeredis.FakeRedis:
+        kwargs.setdefault("decode_responses", True)
+        return fakeredis.FakeRedis(server=self.server(url), **kwargs)
+
+    def async_client(self, url: str) -> fakeredis.aioredis.FakeRedis:
+        return fakeredis.aioredis.FakeRedis(server=self.server(url), decode_responses=True)
+
+
+def _reset_manager(monkeypatch, manager):
+    monkeypatch.setattr(manager, "_client", None)
+    monkeypatch.setattr(manager, "_stream_publish", None)
+    monkeypatch.setattr(manager, "_pin", None)
+    monkeypatch.setattr(manager, "_node_clients", {})
+    monkeypatch.setattr(manager, "_pins", type(manager._pins)())
+
+
+def _reset_scripts(monkeypatch, *instances):
+    """이전 테스트의 클라이언트에 등록된 Lua 스크립트 해제 (다음 호출 때 새 클라이언트에 다시 등록)"""
+    for instance in instances:
+        for name, value in list(vars(instance).items()):
+            if isinstance(value, (Script, AsyncScript)):
+                monkeypatch.setattr(instance, name, None)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """redis_manager/async_redis_manager를 fakeredis로 연결 (테스트마다 빈 서버)"""
+    from src.core.cache import chat_store, async_chat_store
+    from src.services.admission import admission
+    from src.services.context import context_builder
+    from src.services.response_cache import response_cache
+    from src.services.scheduling import fair_scheduler
+    from src.services.single_flight import single_flight
+
+    servers = FakeRedisServers()
+    monkeypatch.setattr(redis_module.redis, "from_url", lambda url, **kwargs: servers.sync_client(url, **kwargs))
+    monkeypatch.setattr(redis_module.AsyncRedisManager, "_connect", lambda self, url: servers.async_client(url))
+    _reset_manager(monkeypatch, redis_manager)
+    _reset_manager(monkeypatch, async_redis_manager)
+    _reset_scripts(monkeypatch, chat_store, async_chat_store, admission, context_builder, response_cache,
+                   fair_scheduler, single_flight)
+    return servers
+
+
+@pytest.fixture
+def redis_client(fake_redis):
+    """기본 노드의 동기 클라이언트"""
+    return redis_manager.client
+
+
+# ---------------------------------------------------------------------------
+# PostgreSQL
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="session")
+def pg_schema():
+    """마이그레이션을 head까지 적용한 데이터베이스 (세션당 한 번)"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("PostgreSQL이 없음 (TEST_DATABASE_URL 또는 pgserver 필요)")
+    from src.core.database import engine, init_db
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    init_db()
+    return engine
+
+
+@pytest.fixture
+def pg(pg_schema, monkeypatch):
+    """테스트마다 빈 테이블과 새 비동기 엔진 (asyncpg 연결은 이벤트 루프에 묶이므로 풀을 쓰지 않음)"""
+    from src.core import async_database
+    from src.core.async_database import async_database_url
+    from src.core.database import DATABASE_URL
+
+    with pg_schema.begin() as conn:
+        conn.execute(text("TRUNCATE chats, messages, message_chunks, task_outbox, chat_archives CASCADE"))
+
+    async_engine = create_async_engine(async_database_url(DATABASE_URL), poolclass=NullPool)
+    monkeypatch.setattr(async_database, "_engine", async_engine)
+    monkeypatch.setattr(async_database, "_sessionmaker",
+                        async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False))
+    yield pg_schema
+    pg_schema.dispose()
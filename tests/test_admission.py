@@ -0,0 +1,149 @@
+"""메시지 전송 수락 제어 (user-020)"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+import redis
+from fastapi import HTTPException
+
+from src.api import routes
+from src.core.config import settings
+from src.core.database import db_chat_store
+from src.core.redis import redis_manager, async_redis_manager
+from src.models.schemas import ChatRequest
+from src.core.celery_app import app as celery_app, lane_queue_keys
+from src.services.admission import ACTIVE_KEY, STATS_KEY, AdmissionController
+
+
+@pytest.fixture
+def controller(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "admission_enabled", True)
+    monkeypatch.setattr(settings, "admission_default_generation_seconds", 10.0)
+    controller = AdmissionController(redis_manager, async_redis_manager)
+    controller.max_active = 3
+    controller.max_active_per_chat = 1
+    controller.max_queued = 2
+    controller.capacity = 2
+    return controller
+
+
+def enqueue(key, count=1):
+    """브로커 리스트에 대기 중인 태스크 추가 (내용은 확인하지 않음)"""
+    redis_manager.client.lpush(key, *["{}"] * count)
+
+
+def lease(*task_ids):
+    redis_manager.client.zadd(ACTIVE_KEY, {task_id: time.time() + 60 for task_id in task_ids})
+
+
+def admit_all(controller, *requests):
+    async def run():
+        return [await controller.admit(task_id, chat_id) for task_id, chat_id in requests]
+    return asyncio.run(run())
+
+
+def test_global_and_per_chat_limits(controller):
+    decisions = admit_all(controller, ("t1", "a"), ("t2", "a"), ("t3", "b"), ("t4", "c"), ("t5", "d"))
+    assert [d.admitted for d in decisions] == [True, False, True, True, False]
+    assert (decisions[1].reason, decisions[1].retry_after) == ("chat", 10)
+    # 한도(3)에서 1건이 끝나야 하고, 워커 2개가 평균 10초씩 처리
+    assert (decisions[4].reason, decisions[4].active, decisions[4].retry_after) == ("global", 3, 5)
+
+
+def test_release_frees_slot_and_updates_average(controller):
+    async def run():
+        await controller.admit("t1", "a")
+        await asyncio.to_thread(controller.release, "t1", "a", 20.0)
+        # 이미 해제된 임대는 평균에 반영하지 않음
+        await asyncio.to_thread(controller.release, "t1", "a", 100.0)
+        return await controller.admit("t2", "a")
+
+    assert asyncio.run(run()).admitted
+    assert float(redis_manager.client.hget(STATS_KEY, "avg_seconds")) == 20.0
+    assert redis_manager.client.zrange(ACTIVE_KEY, 0, -1) == ["t2"]
+
+
+def test_expired_leases_are_reclaimed(controller):
+    redis_manager.client.zadd(ACTIVE_KEY, {f"lost-{i}": time.time() - 1 for i in range(3)})
+    assert admit_all(controller, ("t1", "a"))[0].admitted
+    assert redis_manager.client.zcard(ACTIVE_KEY) == 1
+
+
+def test_lane_queue_keys_match_broker_priority_lists():
+    sep = celery_app.conf.broker_transport_options["sep"]
+    keys = lane_queue_keys()
+    assert keys[0] == settings.interactive_queue
+    assert f"{settings.background_queue}{sep}{settings.schedule_priority_levels - 1}" in keys
+    assert len(keys) == 2 * settings.schedule_priority_levels
+
+
+def test_status_measures_broker_backlog(controller):
+    lease("t1", "t2", "t3", "t4", "t5")
+    enqueue(settings.interactive_queue)
+    enqueue(f"{settings.background_queue}:3")
+
+    status = asyncio.run(controller.status())
+    assert status["queue_measured"] is True
+    assert (status["active"], status["running"], status["queued"]) == (5, 3, 2)
+    # 대기 건이 있으면 실행 중인 수가 워커 용량 (설정값 2가 아니라 측정한 3)
+    assert status["capacity"] == 3
+    assert status["estimated_wait_seconds"] == round(2 * 10.0 / 3, 1)
+
+
+def test_status_without_backlog_uses_configured_capacity(controller):
+    lease("t1")
+    status = asyncio.run(controller.status())
+    assert (status["running"], status["queued"], status["capacity"]) == (1, 0, 2)
+    assert status["estimated_wait_seconds"] == 0
+
+
+def test_status_estimates_when_broker_is_not_redis(controller, monkeypatch):
+    monkeypatch.setattr(settings, "celery_broker_url", "amqp://guest@localhost//")
+    lease("t1", "t2", "t3")
+    status = asyncio.run(controller.status())
+    assert status["queue_measured"] is False
+    assert (status["running"], status["queued"]) == (2, 1)
+
+
+def test_broker_backlog_rejects_without_taking_a_slot(controller):
+    key = f"{settings.interactive_queue}:1"
+    enqueue(key, 2)
+
+    async def run():
+        rejected = await controller.admit("t1", "a")
+        leases = await asyncio.to_thread(redis_manager.client.zcard, ACTIVE_KEY)
+        # 워커가 하나를 가져가면 다시 수락
+        await asyncio.to_thread(redis_manager.client.rpop, key)
+        return rejected, leases, await controller.admit("t1", "a")
+
+    rejected, leases, admitted = asyncio.run(run())
+    assert (rejected.admitted, rejected.reason) == (False, "queue")
+    # 한도(2) 아래로 내려가려면 1건이 시작되어야 하고, 워커 2개가 평균 10초씩 처리
+    assert rejected.retry_after == 5
+    assert leases == 0
+    assert admitted.admitted
+
+
+def test_redis_failure_admits(monkeypatch):
+    monkeypatch.setattr(settings, "admission_enabled", True)
+    down = redis.asyncio.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.2)
+    controller = AdmissionController(SimpleNamespace(client=None),
+                                     SimpleNamespace(client=down, url=settings.celery_broker_url))
+    assert admit_all(controller, ("t1", "a"))[0].admitted
+
+
+def test_route_rejects_without_storing_message(pg, controller, monkeypatch):
+    monkeypatch.setattr(routes, "admission", controller)
+    chat_id = str(db_chat_store.create_chat().id)
+    lease = {"running": time.time() + 60}
+    redis_manager.client.zadd(ACTIVE_KEY, lease)
+    redis_manager.client.zadd(f"admission:chat:{chat_id}", lease)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(routes.send_message(chat_id, ChatRequest(message="질문")))
+
+    assert error.value.status_code == 429
+    assert error.value.headers == {"Retry-After": "10"}
+    assert error.value.detail["reason"] == "chat"
+    assert db_chat_store.get_chat(chat_id)["messages"] == []
@@ -0,0 +1,209 @@
+"""채팅 콜드 스토리지와 메시지 파티션 관리 (user-025)"""
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select, text
+
+from src.core.config import settings
+from src.core.database import ChatArchive, Message, MessageStatus, MessageType, SessionLocal, db_chat_store
+from src.core.partitions import (
+    _attach_partition,
+    add_months,
+    drop_empty_partitions,
+    ensure_partitions,
+    list_partitions,
+    month_start,
+    partition_name,
+)
+from src.services.archive import chat_archiver
+
+OLD_MONTH = datetime(2025, 1, 1)
+OLD_PARTITION = partition_name(OLD_MONTH)
+
+
+def make_chat(at: datetime, *contents, status=MessageStatus.COMPLETED) -> str:
+    """`at` 시각에 마지막으로 쓴 채팅 (메시지는 `at` 뒤 1초 간격으로 옮김)"""
+    chat_id = str(db_chat_store.create_chat().id)
+    for content in contents or ("안녕",):
+        db_chat_store.add_message(chat_id, str(uuid.uuid4()), MessageType.USER, content, status)
+    with SessionLocal() as db:
+        db.execute(text("UPDATE messages m SET created_at = :at + o.n * interval '1 second' "
+                        "FROM (SELECT id, row_number() OVER (ORDER BY created_at) AS n FROM messages "
+                        "WHERE chat_id = :id) o WHERE m.id = o.id"), {"at": at, "id": chat_id})
+        db.execute(text("UPDATE chats SET updated_at = :at WHERE id = :id"), {"at": at, "id": chat_id})
+        db.commit()
+    return chat_id
+
+
+def message_count(table="messages", chat_id=None) -> int:
+    with SessionLocal() as db:
+        query = f"SELECT count(*) FROM {table}" + (" WHERE chat_id = :id" if chat_id else "")
+        return db.execute(text(query), {"id": chat_id}).scalar()
+
+
+def partitions(engine):
+    with engine.connect() as conn:
+        return list_partitions(conn)
+
+
+@pytest.fixture
+def old_partition(pg):
+    """오래된 달의 월별 파티션 (이번 달 이전이라 비면 삭제 대상)"""
+    with pg.begin() as conn:
+        if OLD_PARTITION not in list_partitions(conn):
+            _attach_partition(conn, OLD_MONTH)
+    yield OLD_MONTH
+    with pg.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {OLD_PARTITION}"))
+
+
+def test_ensure_partitions_moves_default_rows_into_new_month(pg):
+    ahead = settings.message_partitions_ahead + 1
+    month = add_months(month_start(datetime.utcnow()), ahead)
+    chat_id = make_chat(month + timedelta(days=3))
+    assert message_count("messages_default") == 1
+    try:
+        with pg.begin() as conn:
+            assert ensure_partitions(conn, ahead=ahead) == [partition_name(month)]
+            assert ensure_partitions(conn, ahead=ahead) == []
+
+        assert message_count("messages_default") == 0
+        assert message_count(partition_name(month), chat_id) == 1
+    finally:
+        with pg.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {partition_name(month)}"))
+
+
+def test_archive_chat_moves_messages_and_get_chat_rehydrates(pg):
+    chat_id = make_chat(datetime.utcnow() - timedelta(days=60), "첫 질문", "두 번째 질문")
+
+    assert chat_archiver.archive_chat(chat_id) is True
+    assert message_count(chat_id=chat_id) == 0
+    with SessionLocal() as db:
+        assert db.get(ChatArchive, uuid.UUID(chat_id)).message_count == 2
+    assert chat_archiver.archive_chat(chat_id) is False
+
+    chat = db_chat_store.get_chat(chat_id)
+    assert [message["content"] for message in chat["messages"]] == ["첫 질문", "두 번째 질문"]
+    assert message_count(chat_id=chat_id) == 2
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(ChatArchive)) == 0
+
+    # 복원한 채팅은 rehydrated_at부터 다시 비활성 기간이 지나야 옮김
+    assert chat_archiver.archive_chat(chat_id) is False
+
+
+def test_recent_and_active_chats_stay_hot(pg):
+    recent = make_chat(datetime.utcnow())
+    active = make_chat(datetime.utcnow() - timedelta(days=60), status=MessageStatus.PROCESSING)
+
+    assert chat_archiver.run_once()["archived"] == 0
+    assert message_count(chat_id=recent) == 1
+    assert message_count(chat_id=active) == 1
+
+
+def test_run_once_continues_past_chats_it_could_not_move(pg, monkeypatch):
+    monkeypatch.setattr(chat_archiver, "batch_size", 1)
+    old = datetime.utcnow() - timedelta(days=90)
+    locked = make_chat(old)
+    later = [make_chat(old + timedelta(days=day)) for day in (1, 2)]
+
+    # 가장 오래된 채팅을 다른 트랜잭션이 잡고 있으면 건너뛰고 다음 배치로 넘어감
+    with pg.connect() as conn:
+        conn.execute(text("SELECT 1 FROM chats WHERE id = :id FOR UPDATE"), {"id": locked})
+        assert chat_archiver.run_once()["archived"] == 2
+        conn.rollback()
+
+    assert message_count(chat_id=locked) == 1
+    assert all(message_count(chat_id=chat_id) == 0 for chat_id in later)
+    assert chat_archiver.run_once()["archived"] == 1
+
+
+def test_empty_old_partition_is_dropped(pg, old_partition):
+    chat_id = make_chat(old_partition + timedelta(days=10))
+    assert message_count(OLD_PARTITION, chat_id) == 1
+
+    with pg.begin() as conn:
+        assert drop_empty_partitions(conn) == []
+
+    result = chat_archiver.run_once()
+    assert result["archived"] == 1
+    assert OLD_PARTITION in result["partitions"]["dropped"]
+    assert OLD_PARTITION not in partitions(pg)
+
+    # 파티션이 없어진 달의 메시지는 기본 파티션으로 복원됨
+    assert len(db_chat_store.get_chat(chat_id)["messages"]) == 1
+    assert message_count("messages_default", chat_id) == 1
+
+
+def test_rehydrated_old_month_survives_partition_maintenance(pg, old_partition):
+    chat_id = make_chat(old_partition + timedelta(days=10), "질문", "답변")
+    assert chat_archiver.archive_chat(chat_id) is True
+    assert message_count(OLD_PARTITION) == 0
+
+    assert len(db_chat_store.get_chat(chat_id)["messages"]) == 2
+    assert message_count(OLD_PARTITION, chat_id) == 2
+
+    result = chat_archiver.maintain_partitions()
+    assert OLD_PARTITION not in result["dropped"]
+    assert OLD_PARTITION in partitions(pg)
+    assert len(db_chat_store.get_chat(chat_id)["messages"]) == 2
+
+
+def test_rows_written_while_detaching_keep_the_partition(pg, old_partition, monkeypatch):
+    """비어 있는지 확인한 뒤 분리 전에 커밋된 행이 있으면 분리를 되돌림"""
+    monkeypatch.setattr(settings, "archive_lock_timeout_ms", 10000)
+    chat_id = make_chat(datetime.utcnow(), "최근")
+
+    # 커밋 전 행은 빈 파티션 확인에 보이지 않고, DETACH는 이 트랜잭션이 끝날 때까지 기다림
+    writer = pg.connect()
+    writer.execute(insert(Message).values(
+        chat_id=chat_id, task_id="rehydrated", type=MessageType.USER, content="복원",
+        status=MessageStatus.COMPLETED, created_at=old_partition + timedelta(days=10),
+    ))
+
+    def commit_later():
+        time.sleep(0.5)
+        writer.commit()
+
+    thread = threading.Thread(target=commit_later)
+    thread.start()
+    try:
+        result = chat_archiver.maintain_partitions()
+    finally:
+        thread.join()
+        writer.close()
+
+    assert OLD_PARTITION not in result["dropped"]
+    assert OLD_PARTITION in partitions(pg)
+    assert message_count(OLD_PARTITION, chat_id) == 1
+
+
+def test_archived_message_is_readable_without_rehydrating(pg):
+    chat_id = make_chat(datetime.utcnow() - timedelta(days=60), "질문")
+    task_id = db_chat_store.get_chat(chat_id)["messages"][0]["task_id"]
+    assert chat_archiver.archive_chat(chat_id) is True
+
+    message = db_chat_store.get_message(task_id)
+    assert message["chat_id"] == chat_id and message["content"] == "질문"
+    assert db_chat_store.get_message("missing") is None
+    assert message_count(chat_id=chat_id) == 0
+
+
+def test_task_id_migration_backfills_existing_archives(pg):
+    from alembic import command
+    from alembic.config import Config as AlembicConfig
+    from src.core.database import ALEMBIC_INI
+
+    chat_id = make_chat(datetime.utcnow() - timedelta(days=60), "질문", "답변")
+    assert chat_archiver.archive_chat(chat_id) is True
+    config = AlembicConfig(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    command.downgrade(config, "0004")
+    command.upgrade(config, "head")
+
+    with SessionLocal() as db:
+        assert len(db.get(ChatArchive, uuid.UUID(chat_id)).task_ids) == 2
@@ -0,0 +1,67 @@
+"""redis.asyncio 매니저 (user-003)"""
+import asyncio
+
+import redis
+import redis.asyncio as aioredis
+
+from src.core.config import settings
+from src.core.redis import AsyncRedisManager, async_redis_manager, channel_name
+from src.core.wire import WireEvent
+
+
+def test_connection_pool_waits_instead_of_failing_when_exhausted():
+    manager = AsyncRedisManager("redis://localhost:6379/0", max_connections=7)
+    client = manager._connect(manager.url)
+
+    assert isinstance(client.connection_pool, aioredis.BlockingConnectionPool)
+    assert client.connection_pool.max_connections == 7
+
+
+def test_published_events_reach_subscribers_on_the_shard_node(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "stream_redis_urls", "redis://node-a:6379/0,redis://node-b:6379/0")
+    manager = AsyncRedisManager("redis://default:6379/0")
+
+    async def scenario():
+        client = await manager.stream_client("task-1")
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel_name("task-1"))
+        await pubsub.get_message(timeout=1)
+        receivers = await manager.publish_event("task-1", {"type": "token", "content": "hi"})
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=5)
+        await pubsub.aclose()
+        return await manager.stream_node("task-1"), receivers, message["data"]
+
+    node, receivers, payload = asyncio.run(scenario())
+    assert node in ("redis://node-a:6379/0", "redis://node-b:6379/0")
+    assert receivers == 1
+    event = WireEvent.from_payload(payload).to_dict()
+    assert event["type"] == "token" and event["content"] == "hi"
+
+
+def test_concurrent_stream_readers_share_one_manager(fake_redis):
+    async def read(task_id):
+        contents = []
+        async for _, event in async_redis_manager.read_stream(task_id):
+            contents.append(event["content"])
+            if event["type"] == "complete":
+                return contents
+
+    async def scenario():
+        readers = [asyncio.create_task(read(f"task-{i}")) for i in range(20)]
+        await asyncio.sleep(0.05)
+        for i in range(20):
+            await async_redis_manager.publish_event(f"task-{i}", {"type": "token", "content": "a"})
+            await async_redis_manager.publish_event(f"task-{i}", {"type": "complete", "content": str(i)})
+        return await asyncio.wait_for(asyncio.gather(*readers), timeout=10)
+
+    assert asyncio.run(scenario()) == [["a", str(i)] for i in range(20)]
+
+
+def test_health_check(fake_redis, monkeypatch):
+    assert asyncio.run(async_redis_manager.health_check()) is True
+
+    async def broken_ping():
+        raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(async_redis_manager.client, "ping", broken_ping)
+    assert asyncio.run(async_redis_manager.health_check()) is False
@@ -0,0 +1,88 @@
+"""API용 비동기 데이터베이스 저장소 (user-017)"""
+import asyncio
+
+import pytest
+
+from src.api import routes
+from src.core import database
+from src.core.async_database import async_database_url, async_db_chat_store
+from src.core.database import MessageStatus, MessageType, db_chat_store
+
+
+def seed_chat(messages=3):
+    chat_id = str(db_chat_store.create_chat("parity").id)
+    for i in range(messages):
+        db_chat_store.add_message(chat_id, f"{chat_id}-{i}", MessageType.USER if i % 2 == 0 else MessageType.ASSISTANT,
+                                  f"message {i}", MessageStatus.COMPLETED)
+    return chat_id
+
+
+def test_async_database_url_uses_asyncpg():
+    assert async_database_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert async_database_url("postgresql+psycopg2://u@db/app") == "postgresql+asyncpg://u@db/app"
+
+
+def test_reads_match_sync_store(pg):
+    chat_id = seed_chat()
+
+    async def read():
+        return (await async_db_chat_store.get_chat(chat_id),
+                await async_db_chat_store.get_chat(chat_id, limit=2),
+                await async_db_chat_store.get_all_chats(),
+                await async_db_chat_store.get_message(f"{chat_id}-1"))
+
+    chat, page, chats, message = asyncio.run(read())
+    assert chat == db_chat_store.get_chat(chat_id)
+    assert page == db_chat_store.get_chat(chat_id, limit=2)
+    assert chats == db_chat_store.get_all_chats()
+    assert message == db_chat_store.get_message(f"{chat_id}-1")
+
+
+def test_message_lifecycle(pg):
+    async def scenario():
+        chat_id = str((await async_db_chat_store.create_chat()).id)
+        await async_db_chat_store.add_message(chat_id, "task-1", MessageType.ASSISTANT, "", MessageStatus.PENDING)
+        active = await async_db_chat_store.get_active_task(chat_id)
+        owner = await async_db_chat_store.update_message_status("task-1", MessageStatus.COMPLETED, content="답")
+        finished = await async_db_chat_store.get_active_task(chat_id)
+        message = await async_db_chat_store.get_message("task-1")
+        await async_db_chat_store.archive_chat(chat_id)
+        listed = [chat["id"] for chat in (await async_db_chat_store.get_all_chats())["chats"]]
+        await async_db_chat_store.delete_chat(chat_id)
+        return chat_id, active, owner, finished, message, listed, await async_db_chat_store.chat_exists(chat_id)
+
+    chat_id, active, owner, finished, message, listed, exists = asyncio.run(scenario())
+    assert (active, owner, finished) == ("task-1", chat_id, None)
+    assert (message["status"], message["content"]) == (MessageStatus.COMPLETED.value, "답")
+    assert chat_id not in listed
+    assert not exists
+
+
+@pytest.mark.parametrize("chat_id", ["not-a-uuid", "00000000-0000-0000-0000-000000000000"])
+def test_unknown_chat_ids_are_missing(pg, chat_id):
+    async def lookup():
+        return (await async_db_chat_store.chat_exists(chat_id),
+                await async_db_chat_store.get_chat(chat_id),
+                await async_db_chat_store.get_active_task(chat_id))
+
+    assert asyncio.run(lookup()) == (False, None, None)
+
+
+def test_routes_do_not_use_sync_sessions(pg, fake_redis, monkeypatch):
+    def blocking_session():
+        raise AssertionError("route used the synchronous store")
+
+    monkeypatch.setattr(database, "SessionLocal", blocking_session)
+
+    async def scenario():
+        chat_id = (await routes.create_chat())["chat_id"]
+        listed = await routes.get_chats(limit=None, before=None)
+        chat = await routes.get_chat(chat_id, limit=None, before=None, after=None)
+        active = await routes.get_active_task(chat_id)
+        await routes.delete_chat(chat_id)
+        return chat_id, listed, chat, active
+
+    chat_id, listed, chat, active = asyncio.run(scenario())
+    assert chat_id in [item["chat_id"] for item in listed["chats"]]
+    assert chat["chat_id"] == chat_id and chat["messages"] == []
+    assert active == {"task_id": None}
@@ -0,0 +1,159 @@
+"""asyncio 스트리밍 워커 (user-006)"""
+import asyncio
+import threading
+import time
+import uuid
+
+import pytest
+from kombu import Connection, Producer
+from kombu.message import Message
+
+from src.core.celery_app import app
+from src.core.config import settings
+from src.services.async_worker import AsyncChatWorker
+from src.services.tasks import process_chat_message
+
+
+@pytest.fixture
+def memory_broker(monkeypatch):
+    url = f"memory://{uuid.uuid4().hex}"
+    monkeypatch.setattr(app.conf, "broker_url", url)
+    monkeypatch.setattr(app.conf, "broker_read_url", None)
+    return url
+
+
+@pytest.fixture
+def acks(monkeypatch):
+    """확인된 메시지의 태스크 ID와 확인한 스레드"""
+    acked = []
+    original = Message.ack
+
+    def ack(self, *args, **kwargs):
+        acked.append((self.headers["id"], threading.current_thread().name))
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Message, "ack", ack)
+    return acked
+
+
+def publish(url, task_id, name=process_chat_message.name):
+    with Connection(url, transport_options=app.conf.broker_transport_options) as connection:
+        Producer(connection).publish(
+            [["hello", task_id, "chat-1"], {}, {}],
+            routing_key=settings.interactive_queue,
+            headers={"task": name, "id": task_id},
+            serializer="json",
+            declare=[app.amqp.queues[settings.interactive_queue]],
+        )
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met")
+        time.sleep(0.01)
+
+
+def test_message_is_acked_by_consumer_thread_after_task_finishes(memory_broker, acks):
+    async def scenario():
+        worker = AsyncChatWorker(concurrency=2)
+        worker._loop = asyncio.get_running_loop()
+        started, release = asyncio.Event(), asyncio.Event()
+        ran = []
+
+        async def run(task_id, args, kwargs):
+            ran.append((task_id, args))
+            started.set()
+            await release.wait()
+
+        worker._run = run
+        publish(memory_broker, "task-1")
+        consumer = threading.Thread(target=worker._consume, name="consumer")
+        consumer.start()
+
+        await asyncio.wait_for(started.wait(), timeout=5)
+        await asyncio.sleep(3 * 0.2)
+        acked_while_running = list(acks)
+
+        release.set()
+        await asyncio.to_thread(wait_until, lambda: acks)
+        worker._stopping.set()
+        await asyncio.to_thread(consumer.join, 5)
+        return ran, acked_while_running, worker
+
+    ran, acked_while_running, worker = asyncio.run(scenario())
+    assert ran == [("task-1", ["hello", "task-1", "chat-1"])]
+    assert acked_while_running == []
+    assert acks == [("task-1", "consumer")]
+    assert worker._unacked == 0
+
+
+def test_consumer_waits_for_running_tasks_before_exiting(memory_broker, acks):
+    async def scenario():
+        worker = AsyncChatWorker(concurrency=2)
+        worker._loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+
+        async def run(task_id, args, kwargs):
+            started.set()
+            await asyncio.sleep(0.5)
+
+        worker._run = run
+        publish(memory_broker, "task-1")
+        consumer = threading.Thread(target=worker._consume, name="consumer")
+        consumer.start()
+        await asyncio.wait_for(started.wait(), timeout=5)
+
+        worker._stopping.set()
+        await asyncio.sleep(0.3)
+        still_running = consumer.is_alive()
+        await asyncio.to_thread(consumer.join, 5)
+        return still_running, consumer.is_alive()
+
+    assert asyncio.run(scenario()) == (True, False)
+    assert acks == [("task-1", "consumer")]
+
+
+def test_unsupported_task_is_requeued_without_running(memory_broker, acks):
+    requeued = []
+
+    class FakeMessage:
+        headers = {"task": "other.task", "id": "task-1"}
+
+        def requeue(self):
+            requeued.append(True)
+
+    worker = AsyncChatWorker(concurrency=1)
+    worker._on_message([[], {}, {}], FakeMessage())
+    assert requeued == [True]
+    assert worker._unacked == 0
+
+
+def test_process_chat_message_async_streams_and_completes(pg, fake_redis):
+    from src.core.database import MessageStatus, MessageType, db_chat_store
+    from src.core.redis import redis_manager, stream_key
+    from src.core.wire import WireEvent
+    from src.services.async_worker import process_chat_message_async
+    from src.services.llm import FakeProvider
+
+    chat = db_chat_store.create_chat("worker")
+    chat_id = str(chat.id)
+    db_chat_store.add_message(chat_id, "user-1", MessageType.USER, "hello", MessageStatus.COMPLETED)
+    db_chat_store.add_message(chat_id, "task-1", MessageType.ASSISTANT, "", MessageStatus.PENDING)
+    provider = FakeProvider(tokens="fixed:5", ttft_ms="fixed:0", itl_ms="fixed:0")
+
+    result = asyncio.run(process_chat_message_async(provider, "hello", "task-1", chat_id, "latency"))
+    duplicate = asyncio.run(process_chat_message_async(provider, "hello", "task-1", chat_id, "latency"))
+
+    assert result["status"] == "completed" and result["token_count"] == 5
+    assert duplicate["status"] == "skipped"
+    message = db_chat_store.get_message("task-1")
+    assert message["status"] == MessageStatus.COMPLETED.value
+    assert message["content"] == result["response"]
+
+    events = [WireEvent.from_fields(entry_id, fields).to_dict()
+              for entry_id, fields in redis_manager.client.xrange(stream_key("task-1"))]
+    assert [event["type"] for event in events][:2] == ["start", "progress"]
+    assert events[-1]["type"] == "complete"
+    assert "".join(event["content"] for event in events if event["type"] == "token") == result["response"]
@@ -0,0 +1,41 @@
+"""토큰당 처리 경로 마이크로벤치마크 (user-011)"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "benchmarks" / "bench_hot_path.py"
+
+
+def run(*args):
+    return subprocess.run(
+        [sys.executable, str(SCRIPT), "--stand-ins", "--iterations", "5", "--repeats", "2",
+         "--alloc-iterations", "2", *args],
+        capture_output=True, text=True, timeout=120, env={**os.environ, "LLM_PROVIDER": "fake"},
+    )
+
+
+def test_stand_in_run_writes_report_and_detects_regressions(tmp_path):
+    output = tmp_path / "hot_path.json"
+    result = run("--only", "coalesce", "deliver_compact", "--output", str(output))
+    assert result.returncode == 0, result.stderr
+
+    report = json.loads(output.read_text())
+    assert report["backend"] == "stand-ins"
+    assert "commit" in report and "dirty" in report
+    assert [r["name"] for r in report["results"]] == ["coalesce", "deliver_compact"]
+    assert all(r["ns_per_op"] > 0 for r in report["results"])
+
+    # 기준 ns/op를 크게 늘리면 통과, 크게 줄이면 회귀로 판단해 종료 코드 1
+    slow = tmp_path / "slow.json"
+    fast = tmp_path / "fast.json"
+    for path, factor in ((slow, 1000.0), (fast, 0.001)):
+        baseline = {**report, "results": [{**r, "ns_per_op": r["ns_per_op"] * factor}
+                                          for r in report["results"]]}
+        path.write_text(json.dumps(baseline))
+
+    assert run("--only", "coalesce", "--compare", str(slow)).returncode == 0
+    regressed = run("--only", "coalesce", "--compare", str(fast))
+    assert regressed.returncode == 1
+    assert "REGRESSION" in regressed.stdout
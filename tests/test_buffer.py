@@ -0,0 +1,157 @@
+"""write-behind 버퍼 (user-001)"""
+import time
+
+from src.core.database import MessageStatus, MessageType, db_chat_store
+from src.services.buffer import MessageWriteBuffer
+
+
+class RecordingStore:
+    def __init__(self, fail: bool = False):
+        self.writes = []
+        self.fail = fail
+
+    def append_message_content(self, task_id, content):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.writes.append((task_id, content))
+
+
+def make_buffer(store, **kwargs):
+    kwargs.setdefault("enabled", True)
+    kwargs.setdefault("max_chars", 10)
+    kwargs.setdefault("flush_interval", 3600)
+    kwargs.setdefault("on_failure", "flush")
+    return MessageWriteBuffer(store=store, **kwargs)
+
+
+def test_append_flushes_when_size_threshold_reached():
+    store = RecordingStore()
+    buffer = make_buffer(store)
+
+    assert buffer.append("t1", "hello") is False
+    assert store.writes == []
+    assert buffer.append("t1", "world") is True
+    assert store.writes == [("t1", "helloworld")]
+
+    # 기록 후에는 크기가 다시 0부터 쌓임
+    assert buffer.append("t1", "x") is False
+
+
+def test_append_flushes_when_interval_elapsed():
+    store = RecordingStore()
+    buffer = make_buffer(store, max_chars=1000, flush_interval=0)
+
+    assert buffer.append("t1", "a") is True
+    assert store.writes == [("t1", "a")]
+
+
+def test_flush_due_writes_only_overdue_tasks():
+    store = RecordingStore()
+    buffer = make_buffer(store, max_chars=1000, flush_interval=10)
+
+    buffer.append("t1", "a")
+    start = buffer._last_flush["t1"]
+    buffer.append("t2", "b")
+    buffer._last_flush["t2"] = start + 5
+
+    assert buffer.flush_due(start + 1) == 9
+    assert store.writes == []
+    assert buffer.flush_due(start + 10) == 5
+    assert store.writes == [("t1", "a")]
+    assert buffer.flush_due(start + 15) == 10
+    assert store.writes == [("t1", "a"), ("t2", "b")]
+
+
+def test_stalled_stream_is_flushed_without_another_token():
+    store = RecordingStore()
+    buffer = make_buffer(store, max_chars=1000, flush_interval=0.05)
+
+    assert buffer.append("t1", "partial") is False
+    deadline = time.monotonic() + 5
+    while not store.writes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.writes == [("t1", "partial")]
+
+
+def test_discarded_tokens_are_not_flushed_later():
+    store = RecordingStore()
+    buffer = make_buffer(store, max_chars=1000, flush_interval=10)
+
+    buffer.append("t1", "abc")
+    buffer.discard("t1")
+    buffer.flush_due(time.monotonic() + 60)
+    assert store.writes == []
+
+
+def test_disabled_buffer_writes_every_token():
+    store = RecordingStore()
+    buffer = make_buffer(store, enabled=False, max_chars=1000)
+
+    buffer.append("t1", "a")
+    buffer.append("t1", "b")
+    assert store.writes == [("t1", "a"), ("t1", "b")]
+
+
+def test_tasks_are_buffered_separately():
+    store = RecordingStore()
+    buffer = make_buffer(store)
+
+    buffer.append("t1", "12345")
+    buffer.append("t2", "abc")
+    buffer.append("t1", "67890")
+    assert store.writes == [("t1", "1234567890")]
+
+    buffer.flush_all()
+    assert store.writes == [("t1", "1234567890"), ("t2", "abc")]
+
+
+def test_discard_drops_pending_tokens():
+    store = RecordingStore()
+    buffer = make_buffer(store)
+
+    buffer.append("t1", "abc")
+    buffer.discard("t1")
+    buffer.flush("t1")
+    assert store.writes == []
+
+
+def test_fail_with_flush_policy_writes_remaining_tokens():
+    store = RecordingStore()
+    buffer = make_buffer(store, on_failure="flush")
+
+    buffer.append("t1", "partial")
+    buffer.fail("t1")
+    assert store.writes == [("t1", "partial")]
+    buffer.flush_all()
+    assert store.writes == [("t1", "partial")]
+
+
+def test_fail_with_discard_policy_drops_remaining_tokens():
+    store = RecordingStore()
+    buffer = make_buffer(store, on_failure="discard")
+
+    buffer.append("t1", "partial")
+    buffer.fail("t1")
+    buffer.flush_all()
+    assert store.writes == []
+
+
+def test_fail_survives_store_errors():
+    buffer = make_buffer(RecordingStore(fail=True), on_failure="flush")
+
+    buffer.append("t1", "abc")
+    buffer.fail("t1")
+    buffer.flush_all()
+
+
+def test_flushed_chunks_are_readable_from_postgres(pg):
+    chat = db_chat_store.create_chat("buffer")
+    db_chat_store.add_message(str(chat.id), "task-1", MessageType.ASSISTANT, "", MessageStatus.STREAMING)
+    buffer = make_buffer(db_chat_store, max_chars=4)
+
+    for token in ["ab", "cd", "ef"]:
+        buffer.append("task-1", token)
+    buffer.flush_all()
+
+    message = db_chat_store.get_message("task-1")
+    assert message["content"] == "abcdef"
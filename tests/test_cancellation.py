@@ -0,0 +1,128 @@
+"""진행 중인 생성 취소 (user-022)"""
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from src.api import routes
+from src.core.config import settings
+from src.core.database import MessageStatus, MessageType, db_chat_store
+from src.core.redis import redis_manager, async_redis_manager, stream_key
+from src.core.wire import WireEvent
+from src.services.async_worker import process_chat_message_async
+from src.services.cancellation import REASON_ABANDONED, REASON_REQUESTED, CancellationRegistry
+from src.services.llm import FakeProvider
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def registry(fake_redis):
+    return CancellationRegistry(redis_manager, async_redis_manager)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # src.services 패키지가 같은 이름의 인스턴스를 내보내므로 모듈은 sys.modules에서 찾음
+    monkeypatch.setattr(sys.modules["src.services.cancellation"], "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_requested_flag_is_checked_once_per_interval(registry, clock, monkeypatch):
+    monkeypatch.setattr(settings, "cancel_check_interval", 0.5)
+    watch = registry.watch("task-1")
+    assert watch.check() is None
+
+    redis_manager.client.set("cancel:task-1", REASON_REQUESTED)
+    clock.now += 0.1
+    assert watch.check() is None
+    clock.now += 0.5
+    assert watch.check() == REASON_REQUESTED
+    assert watch.message == "Cancelled by user"
+
+
+def test_generation_without_subscribers_is_abandoned(registry, clock, monkeypatch):
+    monkeypatch.setattr(settings, "cancel_idle_grace", 30)
+    watch = registry.watch("task-1")
+    clock.now += 20
+    watch.observe(1)
+    clock.now += 20
+    assert watch.check() is None
+    watch.observe(0)
+    clock.now += 11
+    assert watch.check() == REASON_ABANDONED
+
+
+def test_async_check_and_bulk_lookup(registry, clock):
+    async def run():
+        await registry.request("task-1")
+        return await registry.watch("task-1").acheck()
+
+    assert asyncio.run(run()) == REASON_REQUESTED
+    assert registry.requested_many(["task-1", "task-2"]) == {"task-1"}
+    assert registry.requested_many([]) == set()
+
+
+def test_cancel_route_checks_message_state(pg, fake_redis):
+    chat_id = str(db_chat_store.create_chat().id)
+    db_chat_store.add_message(chat_id, "running", MessageType.ASSISTANT, "", MessageStatus.PROCESSING)
+    db_chat_store.add_message(chat_id, "done", MessageType.ASSISTANT, "답", MessageStatus.COMPLETED)
+
+    async def cancel(task_id):
+        try:
+            return await routes.cancel_task(task_id)
+        except HTTPException as e:
+            return e.status_code
+
+    async def run():
+        return [await cancel(task_id) for task_id in ("running", "done", "missing")]
+
+    assert asyncio.run(run()) == [{"task_id": "running", "status": "cancelling"}, 409, 404]
+    assert redis_manager.client.exists("cancel:running")
+    assert not redis_manager.client.exists("cancel:done")
+
+
+def events(task_id):
+    return [WireEvent.from_fields(entry_id, fields).to_dict()
+            for entry_id, fields in redis_manager.client.xrange(stream_key(task_id))]
+
+
+@pytest.fixture
+def pending_reply(pg):
+    chat_id = str(db_chat_store.create_chat().id)
+    db_chat_store.add_message(chat_id, "task-1", MessageType.ASSISTANT, "", MessageStatus.PENDING)
+    return chat_id
+
+
+def test_queued_task_cancelled_before_start(pending_reply, fake_redis):
+    redis_manager.client.set("cancel:task-1", REASON_REQUESTED)
+    provider = FakeProvider(tokens="fixed:50", ttft_ms="fixed:0", itl_ms="fixed:0")
+
+    result = asyncio.run(process_chat_message_async(provider, "hello", "task-1", pending_reply))
+
+    assert (result["status"], result["reason"], result["token_count"]) == ("cancelled", REASON_REQUESTED, 0)
+    assert db_chat_store.get_message("task-1")["status"] == MessageStatus.CANCELLED.value
+    assert events("task-1")[-1]["type"] == "cancelled"
+
+
+def test_abandoned_generation_keeps_partial_content(pending_reply, fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "cancel_idle_grace", 0.05)
+    provider = FakeProvider(tokens="fixed:200", ttft_ms="fixed:0", itl_ms="fixed:5")
+
+    result = asyncio.run(process_chat_message_async(provider, "hello", "task-1", pending_reply, "latency"))
+
+    assert (result["status"], result["reason"]) == ("cancelled", REASON_ABANDONED)
+    assert 0 < result["token_count"] < 200
+    message = db_chat_store.get_message("task-1")
+    assert (message["status"], message["content"]) == (MessageStatus.CANCELLED.value, result["response"])
+    assert message["error"] == "Cancelled: no subscriber"
+    assert events("task-1")[-1]["type"] == "cancelled"
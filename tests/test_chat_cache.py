@@ -0,0 +1,109 @@
+"""채팅 read-through 캐시 (user-009)"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+from src.core.async_database import async_db_chat_store
+from src.core.cache import CachedChatStore, AsyncCachedChatStore, _meta_key, _recent_key
+from src.core.database import MessageStatus, MessageType, db_chat_store
+from src.core.redis import redis_manager, async_redis_manager
+
+
+@pytest.fixture
+def cache(pg, fake_redis):
+    return CachedChatStore(db_chat_store, redis_manager)
+
+
+def new_chat(store):
+    return str(store.create_chat().id)
+
+
+def test_read_through_miss_then_hit(cache, redis_client):
+    chat_id = new_chat(cache)
+    cache.add_message(chat_id, "u1", MessageType.USER, "hello", MessageStatus.COMPLETED)
+
+    first = cache.get_chat(chat_id)
+    assert redis_client.exists(_meta_key(chat_id), _recent_key(chat_id)) == 2
+    second = cache.get_chat(chat_id)
+
+    assert second["messages"] == first["messages"]
+    assert second["title"] == "hello"
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 1
+
+
+def test_add_message_updates_cached_chat(cache):
+    chat_id = new_chat(cache)
+    assert cache.get_chat(chat_id)["messages"] == []
+
+    cache.add_message(chat_id, "u1", MessageType.USER, "first question", MessageStatus.COMPLETED)
+    chat = cache.get_chat(chat_id)
+
+    assert cache.stats()["hits"] == 1
+    assert chat["title"] == "first question"
+    assert chat["message_count"] == 1
+    assert [message["content"] for message in chat["messages"]] == ["first question"]
+
+
+def test_active_messages_bypass_cache_and_status_change_invalidates(cache, redis_client):
+    chat_id = new_chat(cache)
+    cache.add_message(chat_id, "u1", MessageType.USER, "q", MessageStatus.COMPLETED)
+    cache.add_message(chat_id, "a1", MessageType.ASSISTANT, "", MessageStatus.PENDING)
+    cache.get_chat(chat_id)
+    cache.get_chat(chat_id)
+    assert cache.stats()["bypasses"] == 1
+
+    cache.update_message_status("a1", MessageStatus.COMPLETED, content="answer")
+    assert not redis_client.exists(_recent_key(chat_id))
+    assert cache.get_chat(chat_id)["messages"][-1]["content"] == "answer"
+
+
+def test_older_pages_are_read_from_database(cache):
+    chat_id = new_chat(cache)
+    for i in range(3):
+        cache.add_message(chat_id, f"u{i}", MessageType.USER, f"m{i}", MessageStatus.COMPLETED)
+    latest = cache.get_chat(chat_id, limit=2)
+
+    older = cache.get_chat(chat_id, limit=2, before=latest["messages"][0]["cursor"])
+    assert [message["content"] for message in older["messages"]] == ["m0"]
+
+
+def test_delete_invalidates_cache(cache, redis_client):
+    chat_id = new_chat(cache)
+    cache.get_chat(chat_id)
+    cache.delete_chat(chat_id)
+
+    assert not redis_client.exists(_meta_key(chat_id))
+    assert cache.get_chat(chat_id) is None
+    assert not cache.chat_exists(chat_id)
+
+
+def test_redis_errors_fall_back_to_database(pg):
+    broken = SimpleNamespace(client=redis.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.2))
+    cache = CachedChatStore(db_chat_store, broken)
+    chat_id = new_chat(cache)
+
+    cache.add_message(chat_id, "u1", MessageType.USER, "hello", MessageStatus.COMPLETED)
+    assert cache.chat_exists(chat_id)
+    assert cache.get_chat(chat_id)["messages"][0]["content"] == "hello"
+
+
+def test_async_cache_shares_keys_with_worker_cache(pg, fake_redis):
+    worker_cache = CachedChatStore(db_chat_store, redis_manager)
+    api_cache = AsyncCachedChatStore(async_db_chat_store, async_redis_manager)
+    chat_id = new_chat(worker_cache)
+
+    async def scenario():
+        await api_cache.get_chat(chat_id)
+        await api_cache.post_message(chat_id, "task-1", "hello")
+        posted = await api_cache.get_chat(chat_id)
+        await asyncio.to_thread(worker_cache.update_message_status, "task-1", MessageStatus.COMPLETED,
+                                content="answer")
+        return posted, await api_cache.get_chat(chat_id)
+
+    posted, completed = asyncio.run(scenario())
+    assert [message["type"] for message in posted["messages"]] == ["user", "assistant"]
+    assert api_cache.stats()["bypasses"] == 1  # 대기 중인 응답 메시지
+    assert completed["messages"][-1]["content"] == "answer"
+    assert api_cache.stats()["misses"] == 2
@@ -0,0 +1,89 @@
+"""채팅 목록 비정규화 컬럼과 목록 페이지네이션 (user-008)"""
+import asyncio
+import importlib.util
+from pathlib import Path
+
+from sqlalchemy import text, update
+
+from src.core.async_database import async_db_chat_store
+from src.core.database import (
+    Chat, MessageStatus, MessageType, PREVIEW_LENGTH, db_chat_store, engine,
+)
+
+BACKFILL_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "backfill_chat_counters.py"
+
+
+def summary(chat_id, include_archived=True):
+    chats = db_chat_store.get_all_chats(include_archived=include_archived, limit=100)["chats"]
+    return next((chat for chat in chats if chat["id"] == chat_id), None)
+
+
+def test_add_message_maintains_counters_preview_and_title(pg):
+    chat_id = str(db_chat_store.create_chat().id)
+    question = "첫   질문입니다\n" + "가" * 120
+
+    db_chat_store.add_message(chat_id, "u1", MessageType.USER, question, MessageStatus.COMPLETED)
+    db_chat_store.add_message(chat_id, "a1", MessageType.ASSISTANT, "", MessageStatus.PENDING)
+
+    chat = summary(chat_id)
+    assert chat["message_count"] == 2
+    assert chat["title"] == question[:50] + "..."
+    assert chat["last_message_preview"].startswith("첫 질문입니다 가")
+    assert len(chat["last_message_preview"]) == PREVIEW_LENGTH
+
+    db_chat_store.update_message_status("a1", MessageStatus.COMPLETED, content="짧은 답")
+    assert summary(chat_id)["last_message_preview"] == "짧은 답"
+
+
+def test_post_message_maintains_counters(pg, fake_redis):
+    chat_id = str(db_chat_store.create_chat().id)
+    asyncio.run(async_db_chat_store.post_message(chat_id, "task-1", "hello there"))
+
+    chat = summary(chat_id)
+    assert chat["message_count"] == 2
+    assert chat["title"] == "hello there"
+    assert chat["last_message_preview"] == "hello there"
+
+
+def test_list_pages_by_updated_at(pg):
+    chat_ids = [str(db_chat_store.create_chat(f"c{i}").id) for i in range(5)]
+    for chat_id in chat_ids:
+        db_chat_store.add_message(chat_id, f"t-{chat_id}", MessageType.USER, "x", MessageStatus.COMPLETED)
+
+    page = db_chat_store.get_all_chats(limit=2)
+    seen = [chat["id"] for chat in page["chats"]]
+    while page["has_more"]:
+        page = db_chat_store.get_all_chats(limit=2, before=page["chats"][-1]["cursor"])
+        seen += [chat["id"] for chat in page["chats"]]
+    assert seen == list(reversed(chat_ids))
+
+    async_page = asyncio.run(async_db_chat_store.get_all_chats(limit=2))
+    assert [chat["id"] for chat in async_page["chats"]] == seen[:2]
+
+
+def test_archived_chats_are_hidden_by_default(pg):
+    active = str(db_chat_store.create_chat("active").id)
+    archived = str(db_chat_store.create_chat("archived").id)
+    db_chat_store.archive_chat(archived)
+
+    assert summary(archived, include_archived=False) is None
+    assert summary(active, include_archived=False) is not None
+    assert summary(archived)["status"].value == "archived"
+
+
+def test_backfill_script_recomputes_counters(pg):
+    chat_id = str(db_chat_store.create_chat().id)
+    db_chat_store.add_message(chat_id, "u1", MessageType.USER, "question", MessageStatus.COMPLETED)
+    db_chat_store.add_message(chat_id, "a1", MessageType.ASSISTANT, "answer", MessageStatus.COMPLETED)
+    with engine.begin() as conn:
+        conn.execute(update(Chat).values(message_count=0, last_message_preview=None))
+
+    spec = importlib.util.spec_from_file_location("backfill_chat_counters", BACKFILL_SCRIPT)
+    backfill = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(backfill)
+    assert backfill.main() == 0
+
+    with engine.connect() as conn:
+        row = conn.execute(text("SELECT message_count, last_message_preview FROM chats")).one()
+    assert row.message_count == 2
+    assert row.last_message_preview == "answer"
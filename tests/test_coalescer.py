@@ -0,0 +1,74 @@
+"""토큰 병합 (user-005)"""
+import pytest
+
+from src.core.config import settings
+from src.services import coalescer
+from src.services.coalescer import TokenCoalescer, TokenFrame
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(coalescer.time, "monotonic", clock)
+    return clock
+
+
+def test_zero_window_emits_every_token(clock):
+    merger = TokenCoalescer(window_ms=0)
+    assert merger.add("a", 1) == TokenFrame("a", 1, 1)
+    assert merger.add("b", 2) == TokenFrame("b", 2, 2)
+    assert not merger.pending
+
+
+def test_first_token_after_idle_is_sent_immediately(clock):
+    merger = TokenCoalescer(window_ms=50)
+    assert merger.add("first", 1) == TokenFrame("first", 1, 1)
+
+
+def test_tokens_within_window_are_merged(clock):
+    merger = TokenCoalescer(window_ms=50)
+    merger.add("a", 1)
+
+    clock.now += 0.01
+    assert merger.add("b", 2) is None
+    clock.now += 0.01
+    assert merger.add("c", 3) is None
+    assert merger.pending
+
+    clock.now += 0.05
+    assert merger.add("d", 4) == TokenFrame("bcd", 2, 4)
+
+
+def test_byte_limit_flushes_before_window(clock):
+    merger = TokenCoalescer(window_ms=1000, max_bytes=6)
+    merger.add("x", 1)
+
+    assert merger.add("가", 2) is None  # 3 bytes
+    assert merger.add("나", 3) == TokenFrame("가나", 2, 3)
+
+
+def test_flush_returns_pending_tokens_once(clock):
+    merger = TokenCoalescer(window_ms=1000)
+    merger.add("a", 1)
+    merger.add("b", 2)
+
+    assert merger.flush() == TokenFrame("b", 2, 2)
+    assert merger.flush() is None
+
+
+def test_for_profile_uses_configured_windows(monkeypatch):
+    monkeypatch.setattr(settings, "stream_throughput_window_ms", 40)
+    monkeypatch.setattr(settings, "stream_throughput_max_bytes", 512)
+    monkeypatch.setattr(settings, "stream_latency_window_ms", 0)
+
+    throughput = TokenCoalescer.for_profile("throughput")
+    assert (throughput.window, throughput.max_bytes) == (0.04, 512)
+    assert TokenCoalescer.for_profile("latency").window == 0
@@ -0,0 +1,95 @@
+"""토큰 예산 기반 대화 컨텍스트 (user-014)"""
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+from src.core.config import settings
+from src.core.redis import redis_manager
+from src.services.context import ContextBuilder, SYSTEM_PROMPT, count_tokens
+
+
+def message(task_id, type, content, status="completed"):
+    return {"task_id": task_id, "type": type, "content": content, "status": status}
+
+
+class FakeStore:
+    """`get_chat` 호출을 기록하는 채팅 저장소"""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.calls = 0
+
+    def get_chat(self, chat_id, limit=None):
+        self.calls += 1
+        return {"id": chat_id, "messages": self.messages[-limit:] if limit else self.messages}
+
+
+@pytest.fixture
+def history():
+    return [
+        message("t1", "user", "첫 질문"),
+        message("t1", "assistant", "첫 답변"),
+        message("t2", "user", "실패한 질문"),
+        message("t2", "assistant", "", status="failed"),
+        message("user-t3", "user", "현재 질문", status="completed"),
+        message("t3", "assistant", "", status="pending"),
+    ]
+
+
+def test_cold_start_loads_completed_history_once(fake_redis, history):
+    store = FakeStore(history)
+    builder = ContextBuilder(redis_manager, store)
+
+    messages = builder.build("현재 질문", "chat-1", "t3")
+    assert messages == [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": "첫 질문"},
+        {"role": "assistant", "content": "첫 답변"},
+        {"role": "user", "content": "실패한 질문"},
+        {"role": "user", "content": "현재 질문"},
+    ]
+    assert builder.build("현재 질문", "chat-1", "t3") == messages
+    assert store.calls == 1
+
+
+def test_append_turn_extends_window_and_evicts_oldest(fake_redis, monkeypatch):
+    builder = ContextBuilder(redis_manager, FakeStore([]))
+    builder.build("질문 0", "chat-1")
+    turn_tokens = count_tokens("질문 1") + count_tokens("답변 1")
+    monkeypatch.setattr(settings, "context_token_budget", turn_tokens * 2)
+
+    for turn in (1, 2, 3):
+        builder.append_turn("chat-1", f"질문 {turn}", f"답변 {turn}")
+
+    window = builder._window("chat-1", None)
+    assert [entry["content"] for entry in window] == ["질문 2", "답변 2", "질문 3", "답변 3"]
+    assert int(redis_manager.client.get("chatctx:chat-1:tokens")) == turn_tokens * 2
+
+
+def test_append_turn_without_window_waits_for_cold_start(fake_redis):
+    builder = ContextBuilder(redis_manager, FakeStore([]))
+    builder.append_turn("chat-1", "질문", "답변")
+    assert not redis_manager.client.exists("chatctx:chat-1:messages", "chatctx:chat-1:tokens")
+
+
+def test_build_keeps_newest_history_within_budget(fake_redis, monkeypatch):
+    history = [message(f"t{i}", "user", f"메시지 {i}") for i in range(10)]
+    monkeypatch.setattr(settings, "context_token_budget",
+                        count_tokens(SYSTEM_PROMPT) + count_tokens("현재") + 3 * count_tokens("메시지 0"))
+
+    messages = ContextBuilder(redis_manager, FakeStore(history)).build("현재", "chat-1")
+    assert [m["content"] for m in messages[1:]] == ["메시지 7", "메시지 8", "메시지 9", "현재"]
+
+
+def test_redis_failure_falls_back_to_current_message(history, monkeypatch):
+    down = SimpleNamespace(client=redis.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.2))
+    messages = ContextBuilder(down, FakeStore(history)).build("현재 질문", "chat-1")
+    assert messages == [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": "현재 질문"}]
+
+
+def test_clear_removes_window(fake_redis, history):
+    builder = ContextBuilder(redis_manager, FakeStore(history))
+    builder.build("질문", "chat-1")
+    builder.clear("chat-1")
+    assert not redis_manager.client.exists("chatctx:chat-1:tokens")
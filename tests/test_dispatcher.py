@@ -0,0 +1,76 @@
+"""프로세스 공용 Pub/Sub 디스패처 (user-004)"""
+import asyncio
+
+from src.core.dispatcher import StreamDispatcher
+from src.core.redis import async_redis_manager, channel_name
+
+
+async def numsub(channel):
+    return dict(await async_redis_manager.client.pubsub_numsub(channel))[channel]
+
+
+def test_listeners_share_one_subscription_per_channel(fake_redis):
+    async def scenario():
+        dispatcher = StreamDispatcher(async_redis_manager)
+        channel = channel_name("task-1")
+        async with dispatcher.listen("task-1") as first:
+            async with dispatcher.listen("task-1") as second:
+                assert dispatcher.active_channels == 1
+                assert dispatcher.active_listeners == 2
+                assert await numsub(channel) == 1
+
+                await async_redis_manager.publish_event("task-1", {"type": "token", "content": "hi"})
+                events = await asyncio.wait_for(asyncio.gather(first.get(), second.get()), timeout=5)
+                assert events[0] is events[1]
+            assert dispatcher.active_listeners == 1
+            assert await numsub(channel) == 1
+
+        assert dispatcher.active_channels == 0
+        assert await numsub(channel) == 0
+        await dispatcher.stop()
+        return events[0]
+
+    event = asyncio.run(scenario())
+    assert event.to_dict()["content"] == "hi"
+
+
+def test_events_are_routed_to_their_own_task(fake_redis):
+    async def scenario():
+        dispatcher = StreamDispatcher(async_redis_manager)
+        async with dispatcher.listen("task-1") as first, dispatcher.listen("task-2") as second:
+            await async_redis_manager.publish_event("task-2", {"type": "token", "content": "two"})
+            await async_redis_manager.publish_event("task-1", {"type": "token", "content": "one"})
+            received = await asyncio.wait_for(asyncio.gather(first.get(), second.get()), timeout=5)
+            assert len(first) == len(second) == 0
+        await dispatcher.stop()
+        return [event.to_dict()["content"] for event in received]
+
+    assert asyncio.run(scenario()) == ["one", "two"]
+
+
+def test_subscribe_stream_for_pubsub_transport(fake_redis):
+    async def scenario():
+        dispatcher = StreamDispatcher(async_redis_manager)
+        events = dispatcher.subscribe("task-1")
+        receive = asyncio.create_task(events.__anext__())
+        while dispatcher.active_channels == 0:
+            await asyncio.sleep(0.01)
+        await async_redis_manager.publish_event("task-1", {"type": "complete", "content": "done"})
+        event = await asyncio.wait_for(receive, timeout=5)
+        await events.aclose()
+        await dispatcher.stop()
+        return event
+
+    assert asyncio.run(scenario()).type == "complete"
+
+
+def test_stop_finishes_reader_tasks(fake_redis):
+    async def scenario():
+        dispatcher = StreamDispatcher(async_redis_manager)
+        await dispatcher.start()
+        async with dispatcher.listen("task-1"):
+            pass
+        await asyncio.wait_for(dispatcher.stop(), timeout=5)
+        return dispatcher._reader_tasks
+
+    assert asyncio.run(scenario()) == []
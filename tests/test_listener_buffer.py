@@ -0,0 +1,82 @@
+"""느린 SSE 클라이언트 버퍼 한도 (user-023)"""
+import asyncio
+
+import pytest
+
+from src.core.config import settings
+from src.core.dispatcher import ListenerBuffer, StreamDispatcher
+from src.core.redis import async_redis_manager
+from src.core.wire import WireEvent
+
+
+def token(index):
+    return WireEvent.from_message({"type": "token", "content": f"<{index}>", "token_start": index,
+                                   "token_count": index + 1}, f"{index + 1}-0")
+
+
+def drain(buffer):
+    async def run():
+        events = []
+        while len(buffer):
+            events.append(await buffer.get())
+        return events
+    return asyncio.run(run())
+
+
+def test_coalesce_merges_pending_tokens_without_losing_content():
+    buffer = ListenerBuffer(4, "coalesce")
+    buffer.put(WireEvent.from_message({"type": "start"}, "0-1"))
+    for index in range(10):
+        buffer.put(token(index))
+        assert len(buffer) <= 4
+
+    events = drain(buffer)
+    assert events[0].type == "start"
+    assert "".join(event.to_dict()["content"] for event in events[1:]) == "".join(f"<{i}>" for i in range(10))
+    assert events[-1].entry_id == "10-0"
+
+
+def test_resync_drops_buffer_and_signals_consumer():
+    buffer = ListenerBuffer(2, "resync")
+    for index in range(3):
+        buffer.put(token(index))
+    buffer.put(token(3))
+
+    async def run():
+        return [await buffer.get(), await buffer.get()]
+
+    dropped, after = asyncio.run(run())
+    assert dropped is None
+    assert after.entry_id == "4-0"
+
+
+@pytest.mark.parametrize("policy", ["coalesce", "resync"])
+def test_slow_stream_consumer_receives_every_token_once(fake_redis, monkeypatch, policy):
+    monkeypatch.setattr(settings, "stream_buffer_size", 4)
+    monkeypatch.setattr(settings, "stream_overflow_policy", policy)
+
+    async def scenario():
+        dispatcher = StreamDispatcher(async_redis_manager)
+        await async_redis_manager.publish_event("task-1", {"type": "start"})
+        events = dispatcher.stream("task-1")
+        received = [await events.__anext__()]
+
+        # 클라이언트가 읽지 않는 동안 버퍼 한도를 넘는 이벤트가 들어옴
+        for index in range(30):
+            await async_redis_manager.publish_event(
+                "task-1", {"type": "token", "content": f"<{index}>", "token_start": index})
+        await async_redis_manager.publish_event("task-1", {"type": "complete", "content": "done"})
+        await asyncio.sleep(0.2)
+
+        async for event in events:
+            received.append(event)
+        await dispatcher.stop()
+        return received
+
+    received = asyncio.run(asyncio.wait_for(scenario(), timeout=10))
+    contents = [event.to_dict()["content"] for event in received if event.type == "token"]
+    assert "".join(contents) == "".join(f"<{i}>" for i in range(30))
+    assert len(contents) < 30
+    assert received[-1].type == "complete"
+    ids = [event.entry_id for event in received]
+    assert len(ids) == len(set(ids))
@@ -0,0 +1,86 @@
+"""LLM 제공자 (user-010)"""
+import asyncio
+import json
+import random
+
+import pytest
+
+from src.core.config import settings
+from src.services import llm
+from src.services.llm import (
+    FakeProvider, LatencyDistribution, RecordingProvider, ReplayProvider, get_provider,
+)
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.parametrize("spec, low, high", [
+    ("fixed:5", 5, 5),
+    ("7", 7, 7),
+    ("uniform:2,4", 2, 4),
+    ("normal:10,3", 0, float("inf")),
+    ("lognormal:20,0.5", 0, float("inf")),
+    ("exp:15", 0, float("inf")),
+])
+def test_distribution_samples_in_range(spec, low, high):
+    distribution = LatencyDistribution(spec)
+    rng = random.Random(1)
+    assert all(low <= distribution.sample(rng) <= high for _ in range(100))
+
+
+def test_unknown_distribution_is_rejected():
+    with pytest.raises(ValueError):
+        LatencyDistribution("poisson:3")
+
+
+def test_fake_provider_is_deterministic_per_prompt_and_seed():
+    provider = FakeProvider(tokens="uniform:5,30", ttft_ms="fixed:0", itl_ms="fixed:0", seed=7)
+    first = list(provider.stream(MESSAGES, "m", 0, 1000))
+
+    assert list(provider.stream(MESSAGES, "m", 0, 1000)) == first
+    assert asyncio.run(collect(provider.astream(MESSAGES, "m", 0, 1000))) == first
+    assert FakeProvider(tokens="uniform:5,30", seed=8).plan(MESSAGES, 1000) != provider.plan(MESSAGES, 1000)
+    assert 5 <= len(first) <= 30
+
+
+def test_fake_provider_respects_max_tokens():
+    provider = FakeProvider(tokens="fixed:50", ttft_ms="fixed:0", itl_ms="fixed:0")
+    assert len(list(provider.stream(MESSAGES, "m", 0, 3))) == 3
+
+
+def test_recorded_stream_replays_with_original_timing(tmp_path, monkeypatch):
+    path = tmp_path / "streams.jsonl"
+    inner = FakeProvider(tokens="fixed:4", ttft_ms="fixed:0", itl_ms="fixed:0")
+    recorded = list(RecordingProvider(inner, path).stream(MESSAGES, "m", 0, 100))
+
+    (record,) = [json.loads(line) for line in path.read_text().splitlines()]
+    assert record["prompt"] == "hello"
+    assert [text for _, text in record["chunks"]] == recorded
+
+    sleeps = []
+    monkeypatch.setattr(llm.time, "sleep", sleeps.append)
+    replay = ReplayProvider(path, speed=2)
+    assert list(replay.stream(MESSAGES, "m", 0, 100)) == recorded
+    assert asyncio.run(collect(replay.astream([{"role": "user", "content": "other"}], "m", 0, 2))) == recorded[:2]
+
+
+def test_replay_plan_scales_offsets_by_speed(tmp_path):
+    path = tmp_path / "streams.jsonl"
+    path.write_text(json.dumps({"prompt": "hello", "chunks": [[100, "a"], [300, "b"]]}) + "\n")
+
+    assert ReplayProvider(path, speed=2)._plan(MESSAGES, 10) == [(0.05, "a"), (0.1, "b")]
+
+
+def test_get_provider(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "llm_record_path", None)
+    assert isinstance(get_provider("fake"), FakeProvider)
+
+    monkeypatch.setattr(settings, "llm_record_path", str(tmp_path / "rec.jsonl"))
+    assert isinstance(get_provider("fake"), RecordingProvider)
+
+    with pytest.raises(ValueError):
+        get_provider("unknown")
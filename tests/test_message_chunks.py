@@ -0,0 +1,81 @@
+"""append-only 메시지 청크와 완료 시 압축 (user-019)"""
+import asyncio
+
+import pytest
+from sqlalchemy import func, select, text
+
+from src.core.async_database import async_db_chat_store
+from src.core.database import MessageChunk, MessageStatus, MessageType, SessionLocal, db_chat_store
+
+
+def chunk_count(task_id=None):
+    query = select(func.count()).select_from(MessageChunk)
+    if task_id is not None:
+        query = query.where(MessageChunk.task_id == task_id)
+    with SessionLocal() as db:
+        return db.scalar(query)
+
+
+def row_version(engine, task_id):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT xmin::text, content FROM messages WHERE task_id = :id"),
+                            {"id": task_id}).one()
+
+
+@pytest.fixture
+def streaming(pg):
+    chat_id = str(db_chat_store.create_chat().id)
+    db_chat_store.add_message(chat_id, "task-1", MessageType.ASSISTANT, "", MessageStatus.PROCESSING)
+    return chat_id
+
+
+def test_streaming_appends_chunks_without_rewriting_message(pg, streaming):
+    before = row_version(pg, "task-1")
+    for part in ("안녕", "하세", "요"):
+        db_chat_store.append_message_content("task-1", part)
+
+    assert row_version(pg, "task-1") == before
+    assert chunk_count("task-1") == 3
+    assert db_chat_store.get_message("task-1")["content"] == "안녕하세요"
+    assert db_chat_store.get_chat(streaming)["messages"][0]["content"] == "안녕하세요"
+
+    async def read():
+        return (await async_db_chat_store.get_message("task-1"),
+                await async_db_chat_store.get_chat(streaming))
+
+    message, chat = asyncio.run(read())
+    assert message["content"] == chat["messages"][0]["content"] == "안녕하세요"
+
+
+def test_completion_with_final_content_drops_chunks(pg, streaming):
+    db_chat_store.append_message_content("task-1", "부분")
+    db_chat_store.update_message_status("task-1", MessageStatus.COMPLETED, content="최종 답변")
+
+    assert chunk_count() == 0
+    assert db_chat_store.get_message("task-1")["content"] == "최종 답변"
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_failure_folds_chunks_into_content(pg, streaming, use_async):
+    for part in ("받은 ", "데까지"):
+        db_chat_store.append_message_content("task-1", part)
+
+    if use_async:
+        asyncio.run(async_db_chat_store.update_message_status("task-1", MessageStatus.FAILED, error="boom"))
+    else:
+        db_chat_store.update_message_status("task-1", MessageStatus.FAILED, error="boom")
+
+    message = db_chat_store.get_message("task-1")
+    assert (message["content"], message["status"], message["error"]) == ("받은 데까지", "failed", "boom")
+    assert chunk_count() == 0
+
+
+def test_append_to_missing_message_is_ignored(pg):
+    db_chat_store.append_message_content("missing", "x")
+    assert chunk_count() == 0
+
+
+def test_delete_chat_removes_chunks(pg, streaming):
+    db_chat_store.append_message_content("task-1", "x")
+    db_chat_store.delete_chat(streaming)
+    assert chunk_count() == 0
@@ -0,0 +1,93 @@
+"""Prometheus 메트릭 (user-012)"""
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from src.api import routes
+from src.core import metrics
+from src.core.metrics import GenerationMetrics, observe_delivery, render_metrics
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(metrics.time, "perf_counter", clock)
+    return clock
+
+
+def test_generation_metrics_record_ttft_gaps_and_rate(clock):
+    labels = {"provider": "test-provider", "model": "test-model"}
+    active = sample("chat_active_generations")
+    completed = sample("chat_generations_total", status="completed")
+
+    generation = GenerationMetrics("test-provider", "test-model", enqueued_at=None, lane="interactive")
+    assert sample("chat_active_generations") == active + 1
+    generation.requested()
+    for step in (0.5, 0.1, 0.1, 0.1):
+        clock.now += step
+        generation.token()
+    generation.finish("completed")
+
+    assert sample("chat_active_generations") == active
+    assert sample("chat_generations_total", status="completed") == completed + 1
+    assert sample("llm_time_to_first_token_seconds_sum", **labels) == pytest.approx(0.5)
+    assert sample("llm_inter_token_seconds_count", **labels) == 3
+    assert sample("llm_inter_token_seconds_sum", **labels) == pytest.approx(0.3)
+    assert sample("llm_tokens_total", **labels) == 4
+    assert sample("llm_tokens_per_second_sum", **labels) == pytest.approx(10.0)
+
+
+def test_cache_hits_are_recorded_under_cache_provider(clock):
+    generation = GenerationMetrics("test-provider", "cache-model")
+    generation.set_provider("cache")
+    generation.requested()
+    generation.token()
+    generation.finish("completed")
+
+    assert sample("llm_tokens_total", provider="cache", model="cache-model") == 1
+    assert sample("llm_tokens_total", provider="test-provider", model="cache-model") == 0
+
+
+def test_queue_wait_is_observed_per_lane():
+    before = sample("chat_queue_wait_seconds_count", lane="test-lane")
+    GenerationMetrics("p", "m", enqueued_at=1.0, lane="test-lane").finish("failed")
+    assert sample("chat_queue_wait_seconds_count", lane="test-lane") == before + 1
+
+
+def test_delivery_lag_skips_events_without_timestamp():
+    before = sample("chat_stream_delivery_lag_seconds_count", type="test-event")
+    observe_delivery("test-event", None)
+    observe_delivery("test-event", 1.0)
+    assert sample("chat_stream_delivery_lag_seconds_count", type="test-event") == before + 1
+
+
+def test_metrics_route_renders_prometheus_text():
+    body, content_type = render_metrics()
+    assert content_type.startswith("text/plain")
+    assert b"llm_time_to_first_token_seconds" in body
+
+    response = asyncio.run(routes.metrics())
+    assert response.media_type == content_type
+    assert b"redis_call_seconds" in response.body
+
+
+def test_database_calls_are_timed(pg):
+    from sqlalchemy import text
+
+    before = sample("db_call_seconds_count", statement="SELECT")
+    with pg.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert sample("db_call_seconds_count", statement="SELECT") == before + 1
@@ -0,0 +1,130 @@
+"""한 번의 왕복으로 메시지 저장 + 아웃박스 태스크 발행 (user-018)"""
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, select, text
+
+from src.core import async_database
+from src.core.async_database import async_db_chat_store
+from src.core.database import Message, MessageStatus, OutboxTask, SessionLocal, db_chat_store
+from src.services import outbox
+from src.services.outbox import OutboxRelay
+
+DISPATCH = ("process_chat_message", ["hi", "task-1", "chat"], {"flight_key": None}, {"queue": "chat.interactive"})
+MISSING_CHAT = "00000000-0000-0000-0000-000000000000"
+
+
+def outbox_rows():
+    with SessionLocal() as db:
+        return {row.task_id: row for row in db.scalars(select(OutboxTask))}
+
+
+def add_outbox_row(task_id, age=60.0, dispatched_age=None):
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        db.add(OutboxTask(task_id=task_id, task_name="process_chat_message",
+                          payload=json.dumps({"args": [task_id], "kwargs": {}, "options": {"priority": 3}}),
+                          created_at=now - timedelta(seconds=age),
+                          dispatched_at=None if dispatched_age is None else now - timedelta(seconds=dispatched_age)))
+        db.commit()
+
+
+def count_statements(engine):
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+def test_post_message_writes_messages_and_outbox_in_one_statement(pg):
+    chat_id = str(db_chat_store.create_chat().id)
+
+    async def post():
+        await async_db_chat_store.post_message(chat_id, "warmup", "연결 초기화")
+        statements = count_statements(async_database.get_async_engine())
+        posted = await async_db_chat_store.post_message(chat_id, "task-1", "질문", dispatch=DISPATCH)
+        return posted, statements
+
+    (user_message, reply), statements = asyncio.run(post())
+    assert len(statements) == 1
+    assert (user_message.task_id, reply.task_id) == ("user-task-1", "task-1")
+    assert db_chat_store.get_message("task-1")["status"] == MessageStatus.PENDING.value
+    row = outbox_rows()["task-1"]
+    assert row.task_name == "process_chat_message" and row.dispatched_at is None
+    assert json.loads(row.payload) == {"args": DISPATCH[1], "kwargs": DISPATCH[2], "options": DISPATCH[3]}
+
+
+@pytest.mark.parametrize("chat_id", [MISSING_CHAT, "not-a-uuid"])
+def test_post_message_to_missing_chat_writes_nothing(pg, chat_id):
+    assert asyncio.run(async_db_chat_store.post_message(chat_id, "task-1", "질문", dispatch=DISPATCH)) is None
+    with SessionLocal() as db:
+        assert db.scalar(select(Message.id).limit(1)) is None
+    assert outbox_rows() == {}
+
+
+def test_relay_publishes_outside_the_transaction(pg, pg_schema):
+    add_outbox_row("stale")
+    add_outbox_row("fresh", age=0)
+    add_outbox_row("in-flight", dispatched_age=1)
+    calls = []
+
+    def send(task_id, name, args, kwargs, options):
+        # 행 잠금 없이 발행하고, 발행 시작 시각은 이미 커밋되어 있어야 함
+        with pg_schema.connect() as conn:
+            row = conn.execute(text("SELECT dispatched_at FROM task_outbox WHERE task_id = :id FOR UPDATE NOWAIT"),
+                               {"id": task_id}).one()
+        calls.append((task_id, args, options, row.dispatched_at is not None, threading.get_ident()))
+
+    relayed = asyncio.run(async_db_chat_store.relay_outbox(send, older_than=10))
+
+    assert relayed == 1
+    assert [call[:4] for call in calls] == [("stale", ["stale"], {"priority": 3}, True)]
+    assert calls[0][4] != threading.get_ident()
+    assert set(outbox_rows()) == {"fresh", "in-flight"}
+
+
+def test_failed_relay_keeps_row_for_next_cycle(pg):
+    add_outbox_row("task-1")
+
+    def send(*args):
+        raise ConnectionError("broker down")
+
+    assert asyncio.run(async_db_chat_store.relay_outbox(send, older_than=10)) == 0
+    row = outbox_rows()["task-1"]
+    assert (row.attempts, row.dispatched_at) == (1, None)
+
+
+def test_dispatch_sends_in_thread_and_confirms(pg, monkeypatch):
+    chat_id = str(db_chat_store.create_chat().id)
+    threads = []
+    monkeypatch.setattr(outbox, "send_task", lambda *args: threads.append(threading.get_ident()))
+
+    async def scenario():
+        relay = OutboxRelay(async_db_chat_store)
+        await async_db_chat_store.post_message(chat_id, "task-1", "질문", dispatch=DISPATCH)
+        sent = await relay.dispatch("task-1", *DISPATCH)
+        await relay.stop()
+        return sent
+
+    assert asyncio.run(scenario()) is True
+    assert threads and threads[0] != threading.get_ident()
+    assert outbox_rows() == {}
+
+
+def test_failed_dispatch_leaves_row_for_relay(pg, monkeypatch):
+    chat_id = str(db_chat_store.create_chat().id)
+
+    def send_task(*args):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(outbox, "send_task", send_task)
+
+    async def scenario():
+        await async_db_chat_store.post_message(chat_id, "task-1", "질문", dispatch=DISPATCH)
+        return await OutboxRelay(async_db_chat_store).dispatch("task-1", *DISPATCH)
+
+    assert asyncio.run(scenario()) is False
+    assert set(outbox_rows()) == {"task-1"}
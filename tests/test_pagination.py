@@ -0,0 +1,83 @@
+"""채팅 이력 키셋 페이지네이션 (user-007)"""
+import asyncio
+import inspect
+from datetime import datetime
+
+import pytest
+
+from src.core.async_database import async_db_chat_store
+from src.core.database import (
+    MessageStatus, MessageType, db_chat_store, encode_cursor, decode_cursor,
+)
+
+
+@pytest.fixture(params=["sync", "async"])
+def store(request):
+    return db_chat_store if request.param == "sync" else async_db_chat_store
+
+
+def call(store, method, *args, **kwargs):
+    result = getattr(store, method)(*args, **kwargs)
+    return asyncio.run(result) if inspect.isawaitable(result) else result
+
+
+def make_chat(count):
+    chat_id = str(db_chat_store.create_chat("history").id)
+    for i in range(count):
+        db_chat_store.add_message(chat_id, f"task-{i}", MessageType.USER, f"m{i}", MessageStatus.COMPLETED)
+    return chat_id
+
+
+def contents(page):
+    return [message["content"] for message in page["messages"]]
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 17, 12, 30, 1, 123456)
+    message_id = "0b7f63a4-3c4b-4d5e-9f6a-7b8c9d0e1f2a"
+    decoded = decode_cursor(encode_cursor(created_at, message_id))
+    assert decoded[0] == created_at and str(decoded[1]) == message_id
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_latest_page_then_older_pages(pg, store):
+    chat_id = make_chat(5)
+
+    page = call(store, "get_chat", chat_id, limit=2)
+    assert contents(page) == ["m3", "m4"] and page["has_more"]
+
+    page = call(store, "get_chat", chat_id, limit=2, before=page["messages"][0]["cursor"])
+    assert contents(page) == ["m1", "m2"] and page["has_more"]
+
+    page = call(store, "get_chat", chat_id, limit=2, before=page["messages"][0]["cursor"])
+    assert contents(page) == ["m0"] and not page["has_more"]
+
+
+def test_newer_messages_after_cursor(pg, store):
+    chat_id = make_chat(4)
+    oldest = call(store, "get_chat", chat_id, limit=10)["messages"][0]["cursor"]
+
+    page = call(store, "get_chat", chat_id, limit=2, after=oldest)
+    assert contents(page) == ["m1", "m2"] and page["has_more"]
+
+    page = call(store, "get_chat", chat_id, limit=2, after=page["messages"][-1]["cursor"])
+    assert contents(page) == ["m3"] and not page["has_more"]
+
+
+def test_page_size_is_capped(pg, store, monkeypatch):
+    from src.core.config import settings
+    monkeypatch.setattr(settings, "chat_history_max_page_size", 3)
+    chat_id = make_chat(5)
+
+    page = call(store, "get_chat", chat_id, limit=100)
+    assert contents(page) == ["m2", "m3", "m4"] and page["has_more"]
+
+
+def test_bad_cursor_raises_value_error(pg, store):
+    chat_id = make_chat(1)
+    with pytest.raises(ValueError):
+        call(store, "get_chat", chat_id, before="garbage")
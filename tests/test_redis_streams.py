@@ -0,0 +1,89 @@
+"""Redis Streams 전송과 재생/이어 받기 (user-002)"""
+import asyncio
+from itertools import islice
+
+from src.api.routes import _final_event_from_message
+from src.core.config import settings
+from src.core.redis import redis_manager, async_redis_manager, stream_key, channel_name
+from src.core.wire import WireEvent
+
+
+def publish_tokens(task_id, count):
+    for i in range(count):
+        redis_manager.publish_event(task_id, {"type": "token", "content": f"t{i}", "timestamp": 1700000000.0 + i})
+    redis_manager.publish_event(task_id, {"type": "complete", "content": "done", "timestamp": 1700000100.0})
+
+
+def test_publish_event_appends_to_stream_with_ttl(redis_client, monkeypatch):
+    monkeypatch.setattr(settings, "stream_ttl", 120)
+    publish_tokens("task-1", 3)
+
+    entries = redis_client.xrange(stream_key("task-1"))
+    assert [fields["t"] for _, fields in entries] == ["token", "token", "token", "complete"]
+    assert 0 < redis_client.ttl(stream_key("task-1")) <= 120
+
+
+def test_read_stream_replays_from_start_and_resumes_after_last_id(fake_redis):
+    publish_tokens("task-1", 3)
+
+    replay = list(islice(redis_manager.read_stream("task-1"), 4))
+    assert [event["content"] for _, event in replay] == ["t0", "t1", "t2", "done"]
+
+    resumed = list(islice(redis_manager.read_stream("task-1", replay[1][0]), 2))
+    assert [entry_id for entry_id, _ in resumed] == [replay[2][0], replay[3][0]]
+    assert resumed[-1][1]["type"] == "complete"
+
+
+def test_pubsub_payload_carries_stream_entry_id(redis_client):
+    pubsub = redis_client.pubsub()
+    pubsub.subscribe(channel_name("task-1"))
+    pubsub.get_message(timeout=1)
+
+    redis_manager.publish_event("task-1", {"type": "token", "content": "hi", "timestamp": 1700000000.0})
+    message = pubsub.get_message(timeout=1)
+    event = WireEvent.from_payload(message["data"])
+
+    (entry_id, _), = redis_client.xrange(stream_key("task-1"))
+    assert event.entry_id == entry_id
+    assert event.to_dict()["content"] == "hi"
+
+
+def test_pubsub_transport_skips_stream(redis_client, monkeypatch):
+    monkeypatch.setattr(settings, "stream_transport", "pubsub")
+    redis_manager.publish_event("task-1", {"type": "token", "content": "hi"})
+    assert not redis_client.exists(stream_key("task-1"))
+
+
+def test_async_read_stream_resumes_after_last_id(fake_redis):
+    async def scenario():
+        for i in range(3):
+            await async_redis_manager.publish_event("task-1", {"type": "token", "content": f"t{i}"})
+        assert await async_redis_manager.stream_exists("task-1")
+
+        events = []
+        first_id = None
+        async for entry_id, event in async_redis_manager.read_stream("task-1"):
+            first_id = first_id or entry_id
+            events.append(event["content"])
+            if len(events) == 3:
+                break
+
+        resumed = []
+        async for _, event in async_redis_manager.read_stream("task-1", first_id):
+            resumed.append(event["content"])
+            if len(resumed) == 2:
+                break
+        return events, resumed
+
+    assert asyncio.run(scenario()) == (["t0", "t1", "t2"], ["t1", "t2"])
+
+
+def test_expired_stream_falls_back_to_stored_message():
+    assert _final_event_from_message(None) is None
+    assert _final_event_from_message({"status": "streaming", "content": "", "error": None}) is None
+    assert _final_event_from_message({"status": "completed", "content": "answer", "error": None}) == {
+        "type": "complete", "content": "answer"}
+    assert _final_event_from_message({"status": "failed", "content": "", "error": None}) == {
+        "type": "error", "error": "Task failed"}
+    assert _final_event_from_message({"status": "cancelled", "content": "part", "error": "stop"}) == {
+        "type": "cancelled", "content": "part", "error": "stop"}
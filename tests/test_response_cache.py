@@ -0,0 +1,121 @@
+"""LLM 응답 캐시 (user-015)"""
+import asyncio
+
+import pytest
+
+from src.core.redis import redis_manager
+from src.services.response_cache import (
+    LRU_KEY,
+    CachedResponse,
+    ResponseCache,
+    normalize_prompt,
+    request_key,
+)
+
+
+def tokens(*texts):
+    """LLM 제공자처럼 제너레이터로 토큰 전달"""
+    yield from texts
+
+
+def conversation(prompt, history=()):
+    return [{"role": "system", "content": "sys"}, *history, {"role": "user", "content": prompt}]
+
+
+@pytest.fixture
+def cache(fake_redis):
+    cache = ResponseCache(redis_manager)
+    cache.enabled = True
+    return cache
+
+
+def test_request_key_normalizes_prompt_but_not_context():
+    assert normalize_prompt("  Hello \n  World ") == "hello world"
+    key = request_key(conversation("Hello  world"), "gpt", 0.0)
+    assert request_key(conversation(" hello world "), "gpt", 0.0) == key
+    assert request_key(conversation("hello world"), "gpt", 0.7) != key
+    assert request_key(conversation("hello world"), "other", 0.0) != key
+    history = [{"role": "user", "content": "이전"}, {"role": "assistant", "content": "답"}]
+    assert request_key(conversation("hello world", history), "gpt", 0.0) != key
+
+
+def test_miss_records_stream_and_hit_replays_it(cache):
+    lookup = cache.lookup(conversation("질문"), "gpt", 0.0)
+    assert not lookup.hit
+    assert list(lookup.record(tokens("안", "녕"))) == ["안", "녕"]
+    lookup.save()
+
+    cached = cache.lookup(conversation(" 질문 "), "gpt", 0.0)
+    assert cached.hit
+    assert list(cached.response.replay(speed=0)) == ["안", "녕"]
+    cached.save()  # 적중한 항목은 다시 저장하지 않음
+    assert redis_manager.client.zcard(LRU_KEY) == 1
+
+
+def test_async_record_and_replay(cache):
+    async def stream():
+        for text in ("a", "b"):
+            yield text
+
+    async def scenario():
+        lookup = cache.lookup(conversation("q"), "gpt", 0.0)
+        recorded = [text async for text in lookup.arecord(stream())]
+        lookup.save()
+        cached = cache.lookup(conversation("q"), "gpt", 0.0)
+        return recorded, [text async for text in cached.response.areplay(speed=0)]
+
+    assert asyncio.run(scenario()) == (["a", "b"], ["a", "b"])
+
+
+def test_replay_keeps_original_timing_scaled_by_speed():
+    response = CachedResponse([[0, "a"], [100, "b"], [300, "c"]])
+    assert response.duration == 0.3
+    assert response._plan(2.0) == [(0.0, "a"), (0.05, "b"), (0.1, "c")]
+    assert response._plan(0) == [(0.0, "a"), (0.0, "b"), (0.0, "c")]
+
+
+def test_store_evicts_least_recently_used(cache):
+    cache.max_entries = 2
+    for prompt in ("one", "two"):
+        cache.put(f"respcache:{prompt}", [[0, prompt]])
+    redis_manager.client.zadd(LRU_KEY, {"respcache:one": 9e12}, xx=True)  # 최근 접근
+    cache.put("respcache:three", [[0, "three"]])
+
+    assert set(redis_manager.client.zrange(LRU_KEY, 0, -1)) == {"respcache:one", "respcache:three"}
+    assert not redis_manager.client.exists("respcache:two")
+
+
+def test_oversized_and_disabled_entries_are_not_stored(cache):
+    cache.max_entry_bytes = 10
+    cache.put("respcache:big", [[0, "x" * 100]])
+    assert not redis_manager.client.exists("respcache:big")
+
+    cache.enabled = False
+    lookup = cache.lookup(conversation("q"), "gpt", 0.0)
+    assert lookup.key is None
+    list(lookup.record(tokens("a")))
+    lookup.save()
+    assert redis_manager.client.zcard(LRU_KEY) == 0
+
+
+def test_record_closes_upstream_when_consumer_stops(cache):
+    closed = []
+
+    def stream():
+        try:
+            yield "a"
+            yield "b"
+        finally:
+            closed.append(True)
+
+    lookup = cache.lookup(conversation("q"), "gpt", 0.0)
+    recorded = lookup.record(stream())
+    next(recorded)
+    recorded.close()
+    assert closed == [True]
+
+
+def test_clear_removes_all_entries(cache):
+    cache.put("respcache:a", [[0, "a"]])
+    assert cache.clear() == 1
+    assert not redis_manager.client.exists("respcache:a", LRU_KEY)
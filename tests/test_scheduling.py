@@ -0,0 +1,127 @@
+"""요청 레인과 채팅별 공정 큐잉 (user-021)"""
+import asyncio
+import importlib.util
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import redis
+from kombu import Connection, Exchange, Producer, Queue
+from kombu.utils.scheduling import cycle_by_name
+
+from src.core.celery_app import app
+from src.core.config import settings
+from src.core.redis import redis_manager, async_redis_manager
+from src.services.scheduling import FairScheduler
+
+DRAIN_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "drain_legacy_queue.py"
+
+INTERACTIVE, BACKGROUND = settings.interactive_queue, settings.background_queue
+
+
+@pytest.fixture
+def scheduler(fake_redis):
+    return FairScheduler(redis_manager, async_redis_manager)
+
+
+def route_all(scheduler, *requests):
+    async def run():
+        return [await scheduler.route(chat_id, lane) for chat_id, lane in requests]
+    return asyncio.run(run())
+
+
+def test_flooding_chat_sinks_and_idle_chat_enters_at_top(scheduler):
+    routed = route_all(scheduler, *[("flood", None)] * 4, ("quiet", None), ("batch", "background"))
+    assert [options["priority"] for options, _ in routed] == [0, 1, 2, 3, 0, 0]
+    assert {options["queue"] for options, _ in routed[:5]} == {INTERACTIVE}
+    assert routed[5][0]["queue"] == BACKGROUND
+    assert routed[5][1] == {"lane": "background", "tag": 0.0}
+
+
+def test_weighted_chat_gets_more_top_slots(scheduler):
+    scheduler.set_weight("vip", 2)
+    routed = route_all(scheduler, *[("vip", None)] * 4)
+    assert [options["priority"] for options, _ in routed] == [0, 0, 1, 1]
+
+
+def test_started_task_advances_lane_clock(scheduler):
+    async def run():
+        await scheduler.route("flood", None)
+        _, schedule = await scheduler.route("flood", None)
+        await asyncio.to_thread(scheduler.started, "flood", schedule)
+        return await scheduler.route("flood", None)
+
+    options, _ = asyncio.run(run())
+    # 가상 시계가 1로 전진했으므로 다음 요청은 한 단계만 뒤로 밀림
+    assert options["priority"] == 1
+
+
+def test_redis_failure_routes_at_top_priority():
+    down = redis.asyncio.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.2)
+    scheduler = FairScheduler(SimpleNamespace(client=None), SimpleNamespace(client=down))
+    (options, schedule), = route_all(scheduler, ("chat", "background"))
+    assert options == {"queue": BACKGROUND, "priority": 0}
+    assert schedule == {"lane": "background", "tag": None}
+
+
+def lane_order(cycle, backlog, deliveries):
+    """레인별 남은 메시지 수(backlog)에서 `deliveries`건을 꺼낸 순서"""
+    order = []
+    for _ in range(deliveries):
+        queue = next((queue for queue in cycle.consume(2) if backlog[queue]), None)
+        if queue is None:
+            break
+        backlog[queue] -= 1
+        cycle.rotate(queue)
+        order.append("i" if queue == INTERACTIVE else "b")
+    return "".join(order)
+
+
+@pytest.fixture
+def cycle():
+    cycle = cycle_by_name(app.conf.broker_transport_options["queue_order_strategy"])()
+    cycle.update([INTERACTIVE, BACKGROUND])
+    return cycle
+
+
+def test_lanes_share_workers_by_weight(cycle, monkeypatch):
+    monkeypatch.setattr(settings, "interactive_lane_weight", 4)
+    monkeypatch.setattr(settings, "background_lane_weight", 1)
+    order = lane_order(cycle, {INTERACTIVE: 100, BACKGROUND: 100}, 50)
+    assert order.count("b") == 10
+    assert "iiiii" not in order
+
+
+def test_idle_lane_does_not_burst_when_it_returns(cycle):
+    assert lane_order(cycle, {INTERACTIVE: 100, BACKGROUND: 0}, 40) == "i" * 40
+    order = lane_order(cycle, {INTERACTIVE: 100, BACKGROUND: 100}, 10)
+    assert "bbb" not in order and order.count("b") <= 3
+
+
+def test_drain_moves_legacy_tasks_to_interactive_queue(monkeypatch):
+    url = f"memory://{uuid.uuid4().hex}"
+    monkeypatch.setattr(app.conf, "broker_url", url)
+    monkeypatch.setattr(app.conf, "broker_write_url", None)
+    spec = importlib.util.spec_from_file_location("drain_legacy_queue", DRAIN_SCRIPT)
+    script = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(script)
+
+    legacy = Queue("celery", Exchange("celery"), routing_key="celery")
+    with Connection(url) as connection:
+        producer = Producer(connection)
+        for task_id in ("t1", "t2"):
+            producer.publish([["hi", task_id, "chat"], {}, {}], exchange=legacy.exchange, routing_key="celery",
+                             declare=[legacy], headers={"task": "process_chat_message", "id": task_id},
+                             serializer="json", correlation_id=task_id)
+
+    assert script.drain("celery", INTERACTIVE, dry_run=True) == 2
+    assert script.drain("celery", INTERACTIVE) == 2
+    assert script.drain("celery", INTERACTIVE, dry_run=True) == 0
+
+    with Connection(url) as connection:
+        queue = app.amqp.queues[INTERACTIVE](connection.default_channel)
+        moved = [queue.get(no_ack=True) for _ in range(2)]
+    assert [message.headers["id"] for message in moved] == ["t1", "t2"]
+    assert [message.properties["correlation_id"] for message in moved] == ["t1", "t2"]
+    assert moved[0].decode() == [["hi", "t1", "chat"], {}, {}]
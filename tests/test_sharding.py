@@ -0,0 +1,104 @@
+"""스트림 채널 샤딩 (user-024)"""
+import asyncio
+from collections import Counter
+
+import pytest
+
+from src.core.config import settings
+from src.core.dispatcher import StreamDispatcher
+from src.core.redis import AsyncRedisManager, RedisManager, stream_key
+from src.core.sharding import HashRing, PinCache, pin_key, stream_node_urls
+
+DEFAULT = "redis://default:6379/0"
+NODES = ["redis://stream-a:6379/0", "redis://stream-b:6379/0"]
+TASKS = [f"task-{i}" for i in range(200)]
+
+
+@pytest.fixture
+def sharded(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "stream_redis_urls", ",".join(NODES))
+    return fake_redis
+
+
+def test_node_urls_fall_back_to_default_and_deduplicate(monkeypatch):
+    monkeypatch.setattr(settings, "stream_redis_urls", "")
+    assert stream_node_urls(DEFAULT) == [DEFAULT]
+    monkeypatch.setattr(settings, "stream_redis_urls", f" {NODES[0]}, {NODES[1]},{NODES[0]} ")
+    assert stream_node_urls(DEFAULT) == NODES
+
+
+def test_ring_spreads_tasks_and_moves_few_on_growth():
+    three = NODES + ["redis://stream-c:6379/0"]
+    ring, grown = HashRing(NODES), HashRing(three)
+    before = {task: ring.node_for(task) for task in TASKS}
+    after = {task: grown.node_for(task) for task in TASKS}
+
+    assert min(Counter(before.values()).values()) > len(TASKS) * 0.3
+    moved = [task for task in TASKS if before[task] != after[task]]
+    assert all(after[task] == three[2] for task in moved)
+    assert len(moved) < len(TASKS) * 0.5
+    with pytest.raises(ValueError):
+        HashRing([])
+
+
+def test_pin_cache_evicts_least_recently_used():
+    cache = PinCache(maxsize=2)
+    cache.put("a", NODES[0])
+    cache.put("b", NODES[1])
+    cache.get("a")
+    cache.put("c", NODES[0])
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (NODES[0], None, NODES[0])
+
+
+def test_events_land_on_pinned_node(sharded):
+    manager = RedisManager(DEFAULT)
+    for task in TASKS[:20]:
+        manager.publish_event(task, {"type": "token", "content": task})
+
+    default = sharded.sync_client(DEFAULT)
+    by_node = {node: sharded.sync_client(node) for node in NODES}
+    for task in TASKS[:20]:
+        node = default.get(pin_key(task))
+        assert node in NODES
+        assert by_node[node].xlen(stream_key(task)) == 1
+        assert not default.exists(stream_key(task))
+    assert {default.get(pin_key(task)) for task in TASKS[:20]} == set(NODES)
+
+
+def test_pins_survive_adding_a_node(sharded, monkeypatch):
+    before = RedisManager(DEFAULT)
+    nodes = {task: before.stream_node(task) for task in TASKS}
+
+    monkeypatch.setattr(settings, "stream_redis_urls", ",".join(NODES + ["redis://stream-c:6379/0"]))
+    after = RedisManager(DEFAULT)
+    assert {task: after.stream_node(task) for task in TASKS} == nodes
+
+    async def async_nodes():
+        manager = AsyncRedisManager(DEFAULT)
+        return {task: await manager.stream_node(task) for task in TASKS}
+
+    assert asyncio.run(async_nodes()) == nodes
+
+
+def test_dispatcher_receives_events_from_every_node(sharded):
+    worker = RedisManager(DEFAULT)
+    tasks = TASKS[:6]
+
+    async def scenario():
+        api = AsyncRedisManager(DEFAULT)
+        dispatcher = StreamDispatcher(api)
+        streams = [dispatcher.stream(task) for task in tasks]
+        pending = [asyncio.create_task(stream.__anext__()) for stream in streams]
+        while dispatcher.active_channels < len(tasks):
+            await asyncio.sleep(0.01)
+        for task in tasks:
+            await asyncio.to_thread(worker.publish_event, task, {"type": "complete", "content": task})
+        received = await asyncio.wait_for(asyncio.gather(*pending), timeout=5)
+        for stream in streams:
+            await stream.aclose()
+        await dispatcher.stop()
+        return {await api.stream_node(task) for task in tasks}, received
+
+    nodes, received = asyncio.run(scenario())
+    assert nodes == set(NODES)
+    assert [event.to_dict()["content"] for event in received] == tasks
@@ -0,0 +1,177 @@
+"""진행 중인 동일 생성 합치기 (user-016)"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from src.api import routes
+from src.core.config import settings
+from src.core.database import MessageStatus, MessageType, db_chat_store
+from src.core.dispatcher import StreamDispatcher
+from src.core.redis import async_redis_manager, redis_manager, stream_key
+from src.models.schemas import ChatRequest
+from src.services.admission import ACTIVE_KEY
+from src.services.cancellation import cancellation
+from src.services.single_flight import LEADERS_KEY, LOST_LEADER_ERROR, single_flight
+
+
+@pytest.fixture
+def flights(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "openai_temperature", 0.0)
+    monkeypatch.setattr(settings, "context_enabled", False)
+    return single_flight
+
+
+def resolve(*task_ids):
+    async def run():
+        return [await single_flight.resolve(task_id) for task_id in task_ids]
+    return asyncio.run(run())
+
+
+def add_messages(*task_ids, status=MessageStatus.PENDING):
+    chat_id = str(db_chat_store.create_chat().id)
+    for task_id in task_ids:
+        db_chat_store.add_message(chat_id, task_id, MessageType.ASSISTANT, "", status)
+    return chat_id
+
+
+def event_type(frame: bytes) -> str:
+    return json.loads(frame.decode().split("data: ", 1)[1])["type"]
+
+
+def followers(leader_id):
+    return [json.loads(raw) for raw in redis_manager.client.lrange(f"singleflight:followers:{leader_id}", 0, -1)]
+
+
+def test_same_request_joins_running_leader(flights):
+    key, leader = flights.join("leader", "chat-1", "질문")
+    assert key and leader is None
+    assert flights.join("follower", "chat-2", "  질문 ") == (key, "leader")
+    other_key, other_leader = flights.join("other", "chat-3", "다른 질문")
+    assert other_key != key and other_leader is None
+
+    assert [follower["task_id"] for follower in followers("leader")] == ["follower"]
+    assert resolve("follower", "leader") == ["leader", "leader"]
+
+
+def test_inactive_when_sampling(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "openai_temperature", 0.7)
+    assert single_flight.join("task", "chat", "질문") == (None, None)
+
+
+def test_leader_completion_finishes_follower_messages(pg, flights):
+    chat_id = str(db_chat_store.create_chat().id)
+    for task_id in ("follower", "cancelled"):
+        db_chat_store.add_message(chat_id, task_id, MessageType.ASSISTANT, "", MessageStatus.PENDING)
+    key, _ = flights.join("leader", chat_id, "질문")
+    flights.join("follower", chat_id, "질문")
+    flights.join("cancelled", chat_id, "질문")
+    asyncio.run(cancellation.request("cancelled"))
+
+    assert flights.complete(key, "leader", "답변") == 2
+    assert db_chat_store.get_message("follower")["content"] == "답변"
+    assert db_chat_store.get_message("follower")["status"] == MessageStatus.COMPLETED.value
+    assert db_chat_store.get_message("cancelled")["status"] == MessageStatus.CANCELLED.value
+    # 이후 같은 요청은 새 리더가 됨
+    assert flights.join("next", chat_id, "질문") == (key, None)
+
+
+def test_leave_removes_only_own_follower_entry(flights):
+    key, _ = flights.join("leader", "chat-1", "질문")
+    flights.join("a", "chat-2", "질문")
+    flights.join("b", "chat-3", "질문")
+
+    flights.leave("a", "leader")
+    assert [follower["task_id"] for follower in followers("leader")] == ["b"]
+    assert redis_manager.client.get(key) == "leader"
+    assert resolve("a", "b") == ["a", "leader"]
+
+
+def test_follower_posting_to_missing_chat_leaves_leader_running(pg, flights):
+    key, _ = flights.join("leader", "existing-chat", "질문")
+    flights.join("other-follower", "chat-2", "질문")
+    missing = "00000000-0000-0000-0000-000000000000"
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(routes.send_message(missing, ChatRequest(message="질문")))
+
+    assert error.value.status_code == 404
+    assert redis_manager.client.get(key) == "leader"
+    assert [follower["task_id"] for follower in followers("leader")] == ["other-follower"]
+
+
+def test_leader_posting_to_missing_chat_releases_flight(pg, flights):
+    missing = "00000000-0000-0000-0000-000000000000"
+    with pytest.raises(HTTPException):
+        asyncio.run(routes.send_message(missing, ChatRequest(message="질문")))
+
+    assert not redis_manager.client.keys("singleflight:*")
+    assert redis_manager.client.zcard(ACTIVE_KEY) == 0
+
+
+def test_cancelled_follower_stream_ends_with_own_cancelled_event(pg, flights, monkeypatch):
+    monkeypatch.setattr(settings, "cancel_check_interval", 0.05)
+    dispatcher = StreamDispatcher(async_redis_manager)
+    monkeypatch.setattr(routes, "stream_dispatcher", dispatcher)
+    chat_id = add_messages("leader", "follower")
+    key, _ = flights.join("leader", chat_id, "질문")
+    flights.join("follower", chat_id, "질문")
+
+    async def scenario():
+        await async_redis_manager.publish_event("leader", {"type": "token", "content": "답"})
+        response = await routes.stream_chat("follower", SimpleNamespace(headers={}), format="full")
+        frames = response.body_iterator
+        types = [event_type(await frames.__anext__()) for _ in range(2)]
+        assert await routes.cancel_task("follower") == {"task_id": "follower", "status": "cancelling"}
+        # 리더 이벤트가 더 없어도 팔로워 스트림은 자기 cancelled 이벤트로 끝남
+        async for frame in frames:
+            types.append(event_type(frame))
+        await dispatcher.stop()
+        return types
+
+    assert asyncio.run(asyncio.wait_for(scenario(), timeout=5)) == ["connected", "token", "cancelled"]
+    assert db_chat_store.get_message("follower")["status"] == MessageStatus.CANCELLED.value
+    assert followers("leader") == []
+    assert not cancellation.requested("leader")
+    # 리더가 끝나도 취소된 팔로워는 다시 완료되지 않음
+    assert flights.complete(key, "leader", "답변") == 0
+    assert db_chat_store.get_message("follower")["status"] == MessageStatus.CANCELLED.value
+
+
+def test_sweep_fails_followers_of_lost_leader(pg, flights):
+    chat_id = add_messages("leader", "follower")
+    flights.join("leader", chat_id, "질문")
+    flights.join("follower", chat_id, "질문")
+    assert db_chat_store.claim_message("leader")
+
+    # 기한 전에는 생성 중인 리더를 건드리지 않음
+    assert flights.sweep(now=time.time() + flights.ttl - 60) == 0
+    assert flights.sweep(now=time.time() + flights.ttl + 1) == 1
+
+    for task_id in ("leader", "follower"):
+        message = db_chat_store.get_message(task_id)
+        assert (message["status"], message["error"]) == (MessageStatus.FAILED.value, LOST_LEADER_ERROR)
+    entries = redis_manager.client.xrange(stream_key("leader"))
+    assert entries[-1][1]["t"] == "error"
+    assert followers("leader") == [] and redis_manager.client.zcard(LEADERS_KEY) == 0
+
+
+def test_sweep_waits_for_queued_leader_and_settles_finished_one(pg, flights):
+    chat_id = add_messages("leader", "follower")
+    key, _ = flights.join("leader", chat_id, "질문")
+    flights.join("follower", chat_id, "질문")
+
+    # 아직 대기열에 있는 리더는 기한만 연장
+    later = time.time() + flights.ttl + 1
+    assert flights.sweep(now=later) == 0
+    assert redis_manager.client.zscore(LEADERS_KEY, f"leader|{key}") > later
+    assert db_chat_store.get_message("follower")["status"] == MessageStatus.PENDING.value
+
+    # 리더 완료 후 팔로워 처리 전에 워커가 사라진 경우: 리더의 응답으로 팔로워 완료
+    db_chat_store.update_message_status("leader", MessageStatus.COMPLETED, content="답변")
+    assert flights.sweep(now=later + flights.ttl + 1) == 1
+    follower = db_chat_store.get_message("follower")
+    assert (follower["status"], follower["content"]) == (MessageStatus.COMPLETED.value, "답변")
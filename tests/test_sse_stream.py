@@ -0,0 +1,138 @@
+"""redis.asyncio 기반 SSE 엔드포인트 (user-003)"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from src.api import routes
+from src.core.config import settings
+from src.core.dispatcher import StreamDispatcher
+from src.core.redis import async_redis_manager
+from src.core.database import Message, MessageStatus, MessageType, SessionLocal, db_chat_store
+from src.services.archive import chat_archiver
+
+
+class FakeRequest:
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+
+
+def parse_frame(frame: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\r\n"))
+    return {"id": fields.get("id"), **json.loads(fields["data"])}
+
+
+@pytest.fixture
+def dispatcher(fake_redis, monkeypatch):
+    dispatcher = StreamDispatcher(async_redis_manager)
+    monkeypatch.setattr(routes, "stream_dispatcher", dispatcher)
+    return dispatcher
+
+
+async def read_events(task_id, headers=None, format="full"):
+    response = await routes.stream_chat(task_id, FakeRequest(headers), format=format)
+    return [parse_frame(frame) async for frame in response.body_iterator]
+
+
+async def publish(task_id, *events):
+    for event in events:
+        await async_redis_manager.publish_event(task_id, event)
+
+
+def test_stream_replays_recorded_events(dispatcher):
+    async def scenario():
+        await publish("task-1", {"type": "token", "content": "a"}, {"type": "token", "content": "b"},
+                      {"type": "complete", "content": "ab"})
+        events = await read_events("task-1")
+        await dispatcher.stop()
+        return events
+
+    events = asyncio.run(scenario())
+    assert [event["type"] for event in events] == ["connected", "token", "token", "complete"]
+    assert events[0]["replay"] is True
+    assert all(event["id"] for event in events[1:])
+
+
+def test_stream_resumes_after_last_event_id(dispatcher):
+    async def scenario():
+        await publish("task-1", {"type": "token", "content": "a"}, {"type": "token", "content": "b"},
+                      {"type": "complete", "content": "ab"})
+        first = await read_events("task-1")
+        resumed = await read_events("task-1", {"last-event-id": first[1]["id"]})
+        await dispatcher.stop()
+        return first, resumed
+
+    first, resumed = asyncio.run(scenario())
+    assert resumed[0]["replay"] is False
+    assert [event["content"] for event in resumed[1:]] == ["b", "ab"]
+    assert [event["id"] for event in resumed[1:]] == [event["id"] for event in first[2:]]
+
+
+def test_stream_delivers_live_events_without_blocking(dispatcher):
+    async def scenario():
+        await publish("task-1", {"type": "token", "content": "a"})
+        reader = asyncio.create_task(read_events("task-1"))
+        await asyncio.sleep(0.2)
+        assert not reader.done()
+        await publish("task-1", {"type": "token", "content": "b"}, {"type": "complete", "content": "ab"})
+        events = await asyncio.wait_for(reader, timeout=5)
+        await dispatcher.stop()
+        return events
+
+    events = asyncio.run(scenario())
+    assert [event.get("content") for event in events[1:]] == ["a", "b", "ab"]
+
+
+def test_compact_format_forwards_encoded_payload(dispatcher):
+    async def scenario():
+        await publish("task-1", {"type": "complete", "content": "done"})
+        events = await read_events("task-1", format="compact")
+        await dispatcher.stop()
+        return events
+
+    events = asyncio.run(scenario())
+    assert events[-1]["t"] == "complete" and events[-1]["c"] == "done"
+
+
+def test_finished_task_without_stream_is_answered_from_database(pg, dispatcher):
+    chat = db_chat_store.create_chat("sse")
+    db_chat_store.add_message(str(chat.id), "task-1", MessageType.ASSISTANT, "", MessageStatus.PENDING)
+    db_chat_store.update_message_status("task-1", MessageStatus.COMPLETED, content="stored answer")
+
+    events = asyncio.run(read_events("task-1"))
+    assert [event["type"] for event in events] == ["connected", "complete"]
+    assert events[-1]["content"] == "stored answer"
+
+
+def test_unknown_task_is_rejected_before_opening_the_stream(pg, dispatcher):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(read_events("missing"))
+    assert error.value.status_code == 404
+    assert dispatcher.active_listeners == 0
+
+
+def test_archived_task_is_answered_from_cold_storage(pg, dispatcher):
+    chat_id = str(db_chat_store.create_chat("cold").id)
+    db_chat_store.add_message(chat_id, "task-1", MessageType.ASSISTANT, "", MessageStatus.PENDING)
+    db_chat_store.update_message_status("task-1", MessageStatus.COMPLETED, content="archived answer")
+    assert chat_archiver.archive_chat(chat_id, now=datetime.utcnow() + timedelta(days=60)) is True
+
+    events = asyncio.run(read_events("task-1"))
+    assert [event["type"] for event in events] == ["connected", "complete"]
+    assert events[-1]["content"] == "archived answer"
+
+    # 조회만으로는 채팅을 복원하지 않음
+    with SessionLocal() as db:
+        assert db.query(Message).filter(Message.chat_id == chat_id).count() == 0
+
+
+def test_pubsub_transport_answers_finished_task_from_database(pg, dispatcher, monkeypatch):
+    monkeypatch.setattr(settings, "stream_transport", "pubsub")
+    chat = db_chat_store.create_chat("sse")
+    db_chat_store.add_message(str(chat.id), "task-1", MessageType.ASSISTANT, "", MessageStatus.PENDING)
+    db_chat_store.update_message_status("task-1", MessageStatus.FAILED, error="boom")
+
+    events = asyncio.run(asyncio.wait_for(read_events("task-1"), timeout=5))
+    assert [event["type"] for event in events] == ["connected", "error"]
@@ -0,0 +1,68 @@
+"""스트림 이벤트 와이어 포맷 (user-013)"""
+import json
+
+from src.core.wire import (
+    WireEvent,
+    encode_compact,
+    expand,
+    merge_token_runs,
+    pubsub_payload,
+    wire_payload,
+)
+
+TOKEN = {"type": "token", "content": "안녕", "token_start": 3, "token_count": 5,
+         "progress": None, "error": None, "timestamp": 1712345678.123456}
+
+
+def token(entry_id, content, start, timestamp):
+    """token_count는 누적 토큰 수"""
+    return WireEvent.from_message({"type": "token", "content": content, "token_start": start,
+                                   "token_count": start + len(content), "timestamp": timestamp}, entry_id)
+
+
+def test_compact_encoding_drops_nulls_and_uses_short_keys():
+    data = encode_compact(TOKEN)
+    assert data == '{"t":"token","c":"안녕","s":3,"n":5,"ts":1712345678123}'
+    assert expand(json.loads(data)) == {**TOKEN, "timestamp": 1712345678.123}
+
+
+def test_pubsub_payload_round_trips_headers_without_decoding_body():
+    fields = wire_payload(TOKEN)
+    event = WireEvent.from_payload(pubsub_payload(fields, "1-0"))
+    assert (event.entry_id, event.type, event.timestamp) == ("1-0", "token", 1712345678.123)
+    assert event.data == fields["d"]
+
+    anonymous = WireEvent.from_payload(pubsub_payload(wire_payload({"type": "end"})))
+    assert anonymous.entry_id is None and anonymous.timestamp is None
+
+
+def test_frames_are_encoded_once_per_format():
+    event = WireEvent.from_fields("5-0", wire_payload(TOKEN))
+    compact = event.frame("compact")
+    assert compact == f"id: 5-0\r\nevent: message\r\ndata: {event.data}\r\n\r\n".encode()
+    assert event.frame("compact") is compact
+
+    full = event.frame("full")
+    body = json.loads(full.decode().split("data: ", 1)[1])
+    assert set(body) == {"type", "content", "token_start", "token_count", "progress", "error", "timestamp"}
+    assert body["content"] == "안녕" and body["error"] is None
+    assert event.frame() is full
+
+
+def test_frame_without_entry_id_has_no_id_field():
+    assert WireEvent.from_message({"type": "end"}).frame("compact") == b'event: message\r\ndata: {"t":"end"}\r\n\r\n'
+
+
+def test_merge_joins_content_and_keeps_resume_position():
+    merged = WireEvent.merge([token("1-0", "가", 0, 10.0), token("2-0", "나다", 1, 11.0)])
+    assert merged.entry_id == "2-0"
+    assert merged.timestamp == 10.0
+    assert json.loads(merged.data) == {"t": "token", "c": "가나다", "s": 0, "n": 3, "ts": 10000}
+
+
+def test_merge_token_runs_keeps_other_events_in_order():
+    end = WireEvent.from_message({"type": "end"}, "4-0")
+    events = merge_token_runs([token("1-0", "a", 0, 1.0), token("2-0", "b", 1, 1.0), end,
+                               token("5-0", "c", 2, 1.0)])
+    assert [event.entry_id for event in events] == ["2-0", "4-0", "5-0"]
+    assert [event.to_dict()["content"] for event in events] == ["ab", None, "c"]